@@ -1 +1,6 @@
 from .base import *
+from .cache import *
+from .lazy import *
+from .loader import *
+from .prefetch import *
+from .windowed import *
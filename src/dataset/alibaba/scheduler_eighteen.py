@@ -104,7 +104,12 @@ class BaseAlibabaSchedulerDatasetGenerator(
 
     @property
     def data(self) -> pd.DataFrame:
-        return read_dataframe(self._file)
+        return read_dataframe(self._file, cache=True)
+
+    @property
+    def view(self) -> pd.DataFrame:
+        """`data` without copying it, see `readonly_frame`."""
+        return read_dataframe(self._file, cache=True, readonly=True)
 
     def __base_call__(self, data: pd.DataFrame, shuffle: bool) -> TAccessor:
         data = self.transform(data)
@@ -166,15 +171,16 @@ class AlibabaSchedulerDatasetChunkGenerator(
     def __call__(
         self, shuffle: bool = False
     ) -> list[AlibabaSchedulerDataAccessor]:
-        size = len(self.data)
+        view = self.view
+        size = len(view)
         split_size = size // self.n_split
         subsets: list[AlibabaSchedulerDataAccessor] = []
 
         for i in range(self.n_split):
             if i == self.n_split - 1:
-                data = self.data.iloc[i * split_size :]
+                data = view.iloc[i * split_size :]
             else:
-                data = self.data.iloc[i * split_size : (i + 1) * split_size]
+                data = view.iloc[i * split_size : (i + 1) * split_size]
             subsets.append(
                 self.__base_call__(data.reset_index(drop=True), shuffle)
             )
@@ -213,7 +219,7 @@ class AlibabaSchedulerDatasetDistChunkGenerator(
         self, shuffle: bool = False
     ) -> list[AlibabaSchedulerDataAccessor]:
         subsets: list[AlibabaSchedulerDataAccessor] = []
-        grouped = self.data.groupby(self.dist_col)
+        grouped = self.view.groupby(self.dist_col)
 
         for _, data in grouped:
             subsets.append(
@@ -272,5 +278,5 @@ if __name__ == "__main__":
     data = generator.generate()
     train_dataset = data.train
     print("INPUT SIZE", train_dataset.input_size)
-    print("FEATURES", train_dataset.features.columns)
+    print("FEATURES", train_dataset.feature_names)
     print("OUTPUT", train_dataset.targets)
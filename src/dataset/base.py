@@ -2,6 +2,7 @@ from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass
 from typing import Any, Generic, Literal, TypeVar
 
+import torch
 from torch.utils.data import Dataset
 
 from avalanche.benchmarks.utils.data import AvalancheDataset
@@ -24,6 +25,37 @@ def assert_dataset_subset(subset: TDatasetSubset):
     ], "subset must be one of 'training', 'testing', 'all'"
 
 
+_NUMPY_DTYPES: dict[torch.dtype, Any] = {
+    torch.float32: np.float32,
+    torch.int64: np.int64,
+}
+
+
+def to_tensor(data: Any, dtype: torch.dtype) -> torch.Tensor:
+    """Convert `data` into a contiguous tensor of `dtype`.
+
+    DataFrames and Series are converted with a single allocation, numpy
+    arrays of the right dtype are shared instead of copied.
+    """
+    if isinstance(data, torch.Tensor):
+        return data.to(dtype).contiguous()
+    np_dtype = _NUMPY_DTYPES[dtype]
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        data = data.to_numpy(dtype=np_dtype)
+    return torch.from_numpy(np.ascontiguousarray(data, dtype=np_dtype))
+
+
+def categorical_features(
+    feature_names: list[str], cardinalities: dict[str, int]
+) -> dict[int, int]:
+    """Cardinalities of the categorical features, by feature position."""
+    return {
+        i: cardinalities[name]
+        for i, name in enumerate(feature_names)
+        if name in cardinalities
+    }
+
+
 class _BaseDataset(Dataset, metaclass=ABCMeta):
     @property
     @abstractmethod
@@ -40,38 +72,99 @@ class BaseDataset(_BaseDataset):
 
     def __init__(
         self,
-        features: pd.DataFrame,
-        targets: pd.Series,
-        tasks: pd.Series | None = None,
+        features: pd.DataFrame | np.ndarray | torch.Tensor,
+        targets: pd.Series | np.ndarray | torch.Tensor,
+        tasks: pd.Series | np.ndarray | torch.Tensor | None = None,
+        indices: np.ndarray | torch.Tensor | None = None,
+        feature_names: list[str] | None = None,
+        cardinalities: dict[str, int] | None = None,
     ):
-        self.features = features
-        self.targets = targets.values
-        self.tasks = tasks.values if tasks is not None else None
+        """
+        :param features: feature matrix, converted once to float32 tensor
+        :param targets: target labels, converted once to int64 tensor
+        :param tasks: optional task labels, converted once to int64 tensor
+        :param indices: optional rows of `features`, `targets` and `tasks`
+            that make up this dataset. Datasets built from the same feature
+            tensor and differing only by `indices` share one copy of the
+            features; only the (small) labels are gathered per dataset so
+            that `targets` and `tasks` line up with the dataset items.
+        :param feature_names: column names, defaults to the frame columns
+        :param cardinalities: number of codes of each feature (by name)
+            that holds integer category codes rather than a value, see
+            `categorical`
+        """
+        if feature_names is None and isinstance(features, pd.DataFrame):
+            feature_names = list(features.columns)
+        self.feature_names = feature_names
+        self.cardinalities = cardinalities or {}
+        self.features = to_tensor(features, torch.float32)
+        self.indices = (
+            to_tensor(indices, torch.int64) if indices is not None else None
+        )
+        self.targets = self._select(to_tensor(targets, torch.int64))
+        self.tasks = (
+            self._select(to_tensor(tasks, torch.int64))
+            if tasks is not None
+            else None
+        )
+
+    def _select(self, data: torch.Tensor) -> torch.Tensor:
+        return data if self.indices is None else data[self.indices]
 
     @property
     def input_size(self) -> int:
         if self.features is None:
             raise ValueError("Dataset not loaded yet")
-        if len(self.features) == 0:
+        if len(self) == 0:
             raise ValueError("Dataset is empty")
         return self.features.shape[1]
 
+    @property
+    def categorical(self) -> dict[int, int]:
+        """Number of codes of each categorical feature, by its position.
+
+        Models embed these features rather than taking the codes as
+        values, see `src.models.FeatureEmbedding`; the others are dense.
+        """
+        if not self.cardinalities:
+            return {}
+        if self.feature_names is None:
+            raise ValueError("Categorical features need feature names")
+        return categorical_features(self.feature_names, self.cardinalities)
+
     def __len__(self):
-        return len(self.features)
+        return len(self.targets)
 
-    def __getitem__(self, index: int):
+    def _features_at(self, index: Any) -> torch.Tensor:
+        if self.indices is None:
+            return self.features[index]
+        return self.features[self.indices[index]]
+
+    def __getitem__(self, index: int | slice):
         if self.tasks is None:
-            return (
-                self.features.iloc[index].astype(np.float32).values,
-                self.targets[index],
-            )
+            return self._features_at(index), self.targets[index]
 
         return (
-            self.features.iloc[index].astype(np.float32).values,
+            self._features_at(index),
             self.targets[index],
             self.tasks[index],
         )
 
+    def get_batch(
+        self, index: torch.Tensor | slice
+    ) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """Return the `(X, y, t)` minibatch at `index` in one slice.
+
+        Task labels default to zeros when the dataset has none, matching
+        the labels Avalanche attaches to such datasets.
+        """
+        targets = self.targets[index]
+        if self.tasks is None:
+            tasks = torch.zeros(len(targets), dtype=torch.int64)
+        else:
+            tasks = self.tasks[index]
+        return self._features_at(index), targets, tasks
+
 
 TDataset = TypeVar("TDataset", bound=BaseDataset)
 
@@ -127,6 +220,8 @@ class BaseDatasetGenerator(
 
 
 __all__ = [
+    "to_tensor",
+    "categorical_features",
     "_BaseDataset",
     "BaseDataset",
     "TDatasetSubset",
@@ -0,0 +1,111 @@
+import json
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from src.transforms.checkpoint import fitted_states, load_fitted_states
+from src.utils.fingerprint import fingerprint, fingerprint_file, hash_parts
+from src.utils.io import read_feather, write_feather, write_text
+from src.utils.logging import logging
+
+log = logging.getLogger(__name__)
+
+
+class DatasetCache:
+    """Content-addressed on-disk cache of feature-engineered frames.
+
+    Entries are keyed by the fingerprint of the raw input file, of the
+    transforms applied to it and of `context` (config fields the output
+    depends on), so every job that would compute the same frame reuses it
+    regardless of the strategy or model it trains. Frames are stored as
+    uncompressed Arrow IPC (feather) files, which are memory-mapped when
+    read back. What the transforms learned (see `fitted_states`) is kept
+    in the manifest and restored into them on a hit, so that they are as
+    if they had run. The manifest is written before the frame, both
+    atomically, so an entry whose frame exists is complete.
+    """
+
+    def __init__(
+        self, directory: str | Path, context: dict[str, Any] | None = None
+    ):
+        self.directory = Path(directory)
+        self.context = context or {}
+
+    def key(self, source: str | Path, transforms: Any) -> str:
+        return hash_parts(
+            fingerprint_file(source),
+            fingerprint(transforms),
+            fingerprint(self.context),
+        )
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.feather"
+
+    def manifest_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load_manifest(self, key: str) -> dict[str, Any] | None:
+        try:
+            return json.loads(self.manifest_path(key).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def load(self, key: str) -> tuple[pd.DataFrame, dict[str, Any]] | None:
+        """The frame cached at `key` and its manifest, None if either is
+        missing or unreadable."""
+        path = self.path(key)
+        if not path.exists():
+            return None
+        manifest = self.load_manifest(key)
+        if manifest is None:
+            log.warning("Ignoring cached dataset %s without manifest", path)
+            return None
+        log.info("Loading cached dataset %s", path)
+        return read_feather(path), manifest
+
+    def save(
+        self, key: str, data: pd.DataFrame, manifest: dict[str, Any]
+    ) -> Path:
+        # the frame appearing publishes the entry, so it is written last
+        write_text(
+            self.manifest_path(key),
+            json.dumps(manifest, indent=2, default=str),
+        )
+        path = write_feather(self.path(key), data)
+        log.info("Cached dataset at %s", path)
+        return path
+
+    def get_or_create(
+        self,
+        source: str | Path,
+        transforms: Any,
+        create: Callable[[], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """Load the frame cached for `source` and `transforms`, or create
+        and cache it."""
+        key = self.key(source, transforms)
+        cached = self.load(key)
+        if cached is not None:
+            data, manifest = cached
+            load_fitted_states(transforms or [], manifest.get("fitted", {}))
+            return data
+        data = create()
+        self.save(
+            key,
+            data,
+            manifest=dict(
+                source=str(source),
+                transforms=[str(t) for t in transforms or []],
+                context=self.context,
+                fitted=fitted_states(transforms or []),
+            ),
+        )
+        return data
+
+    def __repr__(self) -> str:
+        return f"DatasetCache(directory={self.directory})"
+
+
+__all__ = ["DatasetCache"]
@@ -1,24 +1,44 @@
-from abc import ABCMeta
+from abc import ABCMeta, abstractmethod
 from pathlib import Path
-from typing import Any, Generic
+from typing import Generic
 
+import torch
+
+import numpy as np
 import pandas as pd
 
-from src.transforms import BaseFeatureEngineering
-from src.transforms.general import add_transform_to_feature_engineering
-from src.utils.general import read_dataframe
+from src.transforms import BaseFeatureEngineering, BaseTransform
+from src.utils.general import Predicate, dataframe_columns, read_dataframe
 from src.utils.general import split_dataset as split_dataset_fn
+from src.utils.general import split_indices
 from src.utils.logging import logging
+from src.utils.sampling import Sampler
 
 from .base import (
     BaseDatasetGenerator,
     BaseDatasetPrototype,
     TAccessor,
     TDataset,
+    categorical_features,
+    to_tensor,
+)
+from .cache import DatasetCache
+from .lazy import LazyExperiences
+from .parallel import map_chunks
+from .storage import (
+    MemmapStore,
+    estimate_nbytes,
+    feature_cardinalities,
+    to_feature_array,
 )
+from .windowed import WindowedDatasetPrototype
 
 log = logging.getLogger(__name__)
 
+# shared features, targets and feature names of chunked experiences
+# features, targets, feature columns and their cardinalities
+TBase = tuple[torch.Tensor, torch.Tensor, list[str], dict[str, int]]
+
 
 def split_dataset(
     data: pd.DataFrame,
@@ -35,25 +55,99 @@ def split_dataset(
 
 
 class DataFrameGenerator(metaclass=ABCMeta):
-    def __init__(self, data: pd.DataFrame | str | Path) -> None:
-        self.data = read_dataframe(data)
+    def __init__(
+        self,
+        data: pd.DataFrame | str | Path,
+        memory_budget: int | None = None,
+        storage_dir: str | Path | None = None,
+        cache: DatasetCache | None = None,
+    ) -> None:
+        self._data = data
+        self.memory_budget = memory_budget
+        self.storage_dir = storage_dir
+        self.cache = cache
 
+    @property
+    def data(self) -> pd.DataFrame:
+        columns = self.input_columns()
+        return read_dataframe(
+            self._data,
+            columns,
+            self.input_filters(columns),
+            self.input_sampler(columns),
+            self.input_dtypes(),
+        )
 
-class SplitChunkGenerator(
+    def input_columns(self) -> list[str] | None:
+        """Columns to load from the data file, None for all of them."""
+        return None
+
+    def input_filters(self, columns: list[str] | None) -> list[Predicate]:
+        """Conditions on `columns` that the rows to load must satisfy."""
+        return []
+
+    def input_sampler(self, columns: list[str] | None) -> Sampler | None:
+        """Sampler selecting the rows to load out of those, if any."""
+        return None
+
+    def input_dtypes(self) -> dict[str, str] | None:
+        """Dtypes to load columns as, None to keep them as stored."""
+        return None
+
+    def get_store(self, n_rows: int, n_features: int) -> MemmapStore | None:
+        """Return an on-disk store if the data does not fit `memory_budget`."""
+        if self.memory_budget is None:
+            return None
+        nbytes = estimate_nbytes(n_rows, n_features)
+        if nbytes <= self.memory_budget:
+            return None
+        store = MemmapStore(self.storage_dir)
+        log.info(
+            "Estimated dataset size %d exceeds memory budget %d, using %s",
+            nbytes,
+            self.memory_budget,
+            store,
+        )
+        return store
+
+
+class ChunkedDataFrameGenerator(
     Generic[TDataset, TAccessor],
     DataFrameGenerator,
     BaseDatasetGenerator[TDataset, TAccessor],
 ):
+    """Generator of experiences made of row chunks of one frame.
+
+    The preprocessed features and targets are converted once into a single
+    base array. Each experience then only holds integer row indices into
+    it, and train/test splits are permutations of those indices. Only when
+    the feature engineering defines chunk transforms is every chunk
+    materialized as its own frame, on `chunk_workers` processes if more
+    than one, see `map_chunks`.
+
+    With `window`, each sample is the `window` consecutive rows ending at
+    its row, flattened into one vector with `flatten_window`, see
+    `WindowedDataset`. Windows span the preceding rows of the whole frame,
+    or only those of the chunk when chunks are transformed.
+    """
+
     def __init__(
         self,
         prototype: BaseDatasetPrototype[TDataset, TAccessor],
         data: pd.DataFrame | str | Path,
         target: str,
-        n_split: int,
         train_ratio: float,
         feature_engineering: BaseFeatureEngineering,
+        memory_budget: int | None = None,
+        storage_dir: str | Path | None = None,
+        cache: DatasetCache | None = None,
+        chunk_workers: int = 1,
+        window: int | None = None,
+        flatten_window: bool = True,
     ) -> None:
-        DataFrameGenerator.__init__(self, data)
+        DataFrameGenerator.__init__(
+            self, data, memory_budget, storage_dir, cache
+        )
         BaseDatasetGenerator.__init__(
             self=self,
             prototype=prototype,
@@ -61,39 +155,422 @@ class SplitChunkGenerator(
             feature_engineering=feature_engineering,
             train_ratio=train_ratio,
         )
-        self.n_split = n_split
+        self.chunk_workers = chunk_workers
+        self.window = window
+        if window is not None:
+            self._prototype = WindowedDatasetPrototype(
+                prototype, window, flatten_window
+            )
 
-    def __call__(self, shuffle: bool = True) -> list[TAccessor]:
-        data = self.feature_engineering.apply_preprocess_transform(self.data)
-        size = len(data)
-        split_size = size // self.n_split
-        subsets: list[Any] = []
+    @property
+    def non_feature_columns(self) -> list[str]:
+        return [self.target]
 
-        for i in range(self.n_split):
-            if i == self.n_split - 1:
-                chunk_data = data.iloc[i * split_size :]
-            else:
-                chunk_data = data.iloc[i * split_size : (i + 1) * split_size]
-            chunk_data = chunk_data.reset_index(drop=True)
-            chunk_data = self.feature_engineering.apply_chunk_transform(
-                chunk_data
+    def input_columns(self) -> list[str] | None:
+        if isinstance(self._data, pd.DataFrame):
+            return None
+        available = dataframe_columns(self._data)
+        columns = self.feature_engineering.input_columns(available)
+        if columns is not None:
+            log.info(
+                "Loading %d of %d columns, skipping %s",
+                len(columns),
+                len(available),
+                [column for column in available if column not in columns],
+            )
+        return columns
+
+    def input_filters(self, columns: list[str] | None) -> list[Predicate]:
+        if isinstance(self._data, pd.DataFrame):
+            return []
+        if columns is None:
+            columns = dataframe_columns(self._data)
+        filters = self.feature_engineering.input_filters(columns)
+        if filters:
+            log.info("Filtering rows while reading: %s", filters)
+        return filters
+
+    def input_sampler(self, columns: list[str] | None) -> Sampler | None:
+        if isinstance(self._data, pd.DataFrame):
+            return None
+        if columns is None:
+            columns = dataframe_columns(self._data)
+        sampler = self.feature_engineering.input_sampler(columns)
+        if sampler is not None:
+            log.info("Sampling rows while reading: %s", sampler)
+        return sampler
+
+    def input_dtypes(self) -> dict[str, str] | None:
+        return self.feature_engineering.read_dtypes
+
+    @abstractmethod
+    def get_chunks(self, data: pd.DataFrame) -> list[np.ndarray]:
+        """Row positions of `data` that make up each experience."""
+
+    def create_subsets(
+        self,
+        data: pd.DataFrame,
+        chunks: list[np.ndarray],
+        shuffle: bool,
+    ) -> list[TAccessor]:
+        if self.feature_engineering.chunk_transform_set:
+            self.fit_chunk_transform(data, chunks)
+            if self.chunk_workers > 1 and len(chunks) > 1:
+                # fixed per chunk, so splits do not depend on where chunks
+                # run; serially, the global RNG splits them as it always did
+                seeds = np.random.randint(
+                    np.iinfo(np.int32).max, size=len(chunks)
+                )
+                return [
+                    self.create_array_subset(
+                        features,
+                        targets,
+                        columns,
+                        cardinalities,
+                        shuffle,
+                        name=str(i),
+                        rng=np.random.RandomState(seeds[i]),
+                    )
+                    for i, (
+                        features,
+                        targets,
+                        columns,
+                        cardinalities,
+                    ) in enumerate(
+                        map_chunks(
+                            lambda i: self.transform_chunk(data, chunks[i], i),
+                            len(chunks),
+                            self.chunk_workers,
+                        )
+                    )
+                ]
+            return [
+                self.create_subset(
+                    self.apply_chunk_transform(data, chunk, i),
+                    shuffle,
+                    name=str(i),
+                )
+                for i, chunk in enumerate(chunks)
+            ]
+
+        base = self.create_base(data)
+        return [
+            self.create_base_subset(base, *self.split_chunk(chunk, shuffle))
+            for chunk in chunks
+        ]
+
+    def apply_chunk_transform(
+        self,
+        data: pd.DataFrame,
+        chunk: np.ndarray,
+        index: int | None = None,
+    ) -> pd.DataFrame:
+        """Transform the rows `chunk` of `data` as chunk `index`, see
+        `BaseFeatureEngineering.apply_chunk_transform`. The non-feature
+        columns other than the target (e.g. the distribution id) are
+        dropped first, so the chunk transforms do not treat them as
+        features."""
+        # a new frame, not a view of `data` to be written through, so
+        # renumbering and dropping in place saves a copy
+        chunk_data = data.take(chunk)
+        chunk_data.index = pd.RangeIndex(len(chunk_data))
+        chunk_data.drop(
+            columns=[
+                column
+                for column in self.non_feature_columns
+                if column != self.target and column in chunk_data.columns
+            ],
+            inplace=True,
+        )
+        return self.feature_engineering.apply_chunk_transform(
+            chunk_data, owned=True, index=index
+        )
+
+    def fit_chunk_transform(
+        self, data: pd.DataFrame, chunks: list[np.ndarray]
+    ) -> None:
+        """Fit the chunk transforms that `fits_once` on the first chunk.
+
+        Chunks are transformed in worker processes or on demand, in no
+        particular order, and each by copies of the transforms, so these
+        are fitted up front instead, by transforming the first chunk once
+        with the transforms themselves.
+        """
+        transforms = [
+            transform
+            for transform in self.feature_engineering.chunk_transform_set or []
+            if isinstance(transform, BaseTransform) and transform.fits_once
+        ]
+        if not transforms or not chunks:
+            return
+        for transform in transforms:
+            transform.reset_state()
+        self.apply_chunk_transform(data, chunks[0])
+
+    def transform_chunk(
+        self, data: pd.DataFrame, chunk: np.ndarray, index: int
+    ) -> tuple[pd.DataFrame, list[str], str]:
+        data = self.apply_chunk_transform(data, chunk, index)
+        return data, self.feature_columns(data), self.target
+
+    def split_chunk(
+        self,
+        chunk: np.ndarray,
+        shuffle: bool,
+        rng: np.random.RandomState | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        train_idx, test_idx = split_indices(
+            len(chunk), self.train_ratio, shuffle, rng
+        )
+        return chunk[train_idx], chunk[test_idx]
+
+    def create_base(self, data: pd.DataFrame) -> TBase:
+        """Convert `data` once into the features/targets shared by chunks."""
+        columns = self.feature_columns(data)
+        store = self.get_store(len(data), len(columns))
+        features = to_tensor(
+            to_feature_array(data, columns, store), torch.float32
+        )
+        targets = to_tensor(data[self.target], torch.int64)
+        return (
+            features,
+            targets,
+            columns,
+            feature_cardinalities(data, columns),
+        )
+
+    def create_base_subset(
+        self,
+        base: TBase,
+        train_rows: np.ndarray,
+        test_rows: np.ndarray,
+    ) -> TAccessor:
+        features, targets, columns, cardinalities = base
+        return self.prototype.create_accessor(
+            *(
+                self.prototype.create_dataset(
+                    features,
+                    targets,
+                    indices=rows,
+                    feature_names=columns,
+                    cardinalities=cardinalities,
+                )
+                for rows in (train_rows, test_rows)
             )
-            X_train, X_test, y_train, y_test = split_dataset(
-                chunk_data, self.target, self.train_ratio, shuffle
+        )
+
+    def create_subset(
+        self,
+        data: pd.DataFrame,
+        shuffle: bool,
+        name: str = "features",
+        rng: np.random.RandomState | None = None,
+    ) -> TAccessor:
+        """Materialize one experience out of a whole chunk frame."""
+        columns = self.feature_columns(data)
+        cardinalities = feature_cardinalities(data, columns)
+        if self.window is not None:
+            # windows are taken over the rows of the chunk in order
+            return self.create_array_subset(
+                to_feature_array(data, columns),
+                data[self.target].to_numpy(),
+                columns,
+                cardinalities,
+                shuffle,
+                name,
+                rng,
             )
-            subsets.append(
-                self.prototype.create_accessor(
-                    self.prototype.create_dataset(X_train, y_train),
-                    self.prototype.create_dataset(X_test, y_test),
+        store = self.get_store(len(data), len(columns))
+        datasets = []
+        for subset, idx in zip(
+            ["train", "test"],
+            split_indices(len(data), self.train_ratio, shuffle, rng),
+        ):
+            subset_data = data.iloc[idx]
+            datasets.append(
+                self.prototype.create_dataset(
+                    to_feature_array(
+                        subset_data, columns, store, f"{name}-{subset}"
+                    ),
+                    subset_data[self.target],
+                    feature_names=columns,
+                    cardinalities=cardinalities,
                 )
             )
-        return subsets
+        return self.prototype.create_accessor(*datasets)
+
+    def create_array_subset(
+        self,
+        features: np.ndarray,
+        targets: np.ndarray,
+        columns: list[str],
+        cardinalities: dict[str, int],
+        shuffle: bool,
+        name: str = "features",
+        rng: np.random.RandomState | None = None,
+    ) -> TAccessor:
+        """Like `create_subset`, for a chunk already converted to arrays.
+
+        The train and test datasets share the features of the chunk.
+        """
+        store = self.get_store(len(features), len(columns))
+        if store is not None:
+            features = store.save(name, pd.DataFrame(features, copy=False))
+        return self.create_base_subset(
+            (
+                to_tensor(features, torch.float32),
+                to_tensor(targets, torch.int64),
+                columns,
+                cardinalities,
+            ),
+            *split_indices(len(features), self.train_ratio, shuffle, rng),
+        )
+
+    def feature_columns(self, data: pd.DataFrame) -> list[str]:
+        return [
+            column
+            for column in data.columns
+            if column not in self.non_feature_columns
+        ]
+
+    def preprocess(self) -> pd.DataFrame:
+        """Read and preprocess the data, through `cache` when given."""
+        if self.cache is None or isinstance(self._data, pd.DataFrame):
+            return self.read_preprocessed()
+        return self.cache.get_or_create(
+            self._data,
+            self.feature_engineering.preprocess_transform_set,
+            self.read_preprocessed,
+        )
+
+    def read_preprocessed(self) -> pd.DataFrame:
+        """Read and preprocess the data.
+
+        With a `ParallelExecutor` on the feature engineering (and neither
+        checkpoints nor sampling while reading), the leading row-local
+        preprocess transforms run on the batches of the file as they are
+        read, see `ParallelExecutor.apply_file`.
+        """
+        feature_engineering = self.feature_engineering
+        executor = feature_engineering.executor
+        if (
+            executor is not None
+            and feature_engineering.checkpoint is None
+            and not isinstance(self._data, pd.DataFrame)
+        ):
+            columns = self.input_columns()
+            if self.input_sampler(columns) is None:
+                transforms = feature_engineering.plan_preprocess_transform_set(
+                    columns or dataframe_columns(self._data)
+                )
+                return executor.apply_file(
+                    self._data,
+                    transforms or [],
+                    columns,
+                    self.input_filters(columns),
+                    self.input_dtypes(),
+                )
+        return feature_engineering.apply_preprocess_transform(
+            self.data, owned=True
+        )
+
+    def __call__(self, shuffle: bool = True) -> list[TAccessor]:
+        data = self.preprocess()
+        return self.create_subsets(data, self.get_chunks(data), shuffle)
+
+    def generate_lazy(
+        self, shuffle: bool = True, prefetch: int = 0
+    ) -> LazyExperiences[TAccessor]:
+        """Like `__call__`, but build each experience only when requested.
+
+        Up front only the chunk row indices are computed (and the shared
+        base tensors, which experiences merely index). With chunk
+        transforms, the transform and split of a chunk run on demand, with
+        a split seed fixed per experience so that its train and test halves
+        can be materialized independently and still agree. `prefetch`
+        experiences are prepared ahead in the background, see
+        `LazyExperiences`.
+        """
+        data = self.preprocess()
+        chunks = self.get_chunks(data)
+
+        if not self.feature_engineering.chunk_transform_set:
+            base = self.create_base(data)
+            splits = [self.split_chunk(chunk, shuffle) for chunk in chunks]
+            return LazyExperiences(
+                lambda i: self.create_base_subset(base, *splits[i]),
+                num_experiences=len(chunks),
+                # windows change the inputs, left to the datasets then
+                input_size=len(base[2]) if self.window is None else None,
+                categorical=(
+                    categorical_features(base[2], base[3])
+                    if self.window is None
+                    else None
+                ),
+                prefetch=prefetch,
+            )
+
+        self.fit_chunk_transform(data, chunks)
+        seeds = np.random.randint(np.iinfo(np.int32).max, size=len(chunks))
+        return LazyExperiences(
+            lambda i: self.create_subset(
+                self.apply_chunk_transform(data, chunks[i], i),
+                shuffle,
+                name=str(i),
+                rng=np.random.RandomState(seeds[i]),
+            ),
+            num_experiences=len(chunks),
+            prefetch=prefetch,
+        )
+
+
+class SplitChunkGenerator(
+    Generic[TDataset, TAccessor],
+    ChunkedDataFrameGenerator[TDataset, TAccessor],
+):
+    def __init__(
+        self,
+        prototype: BaseDatasetPrototype[TDataset, TAccessor],
+        data: pd.DataFrame | str | Path,
+        target: str,
+        n_split: int,
+        train_ratio: float,
+        feature_engineering: BaseFeatureEngineering,
+        memory_budget: int | None = None,
+        storage_dir: str | Path | None = None,
+        cache: DatasetCache | None = None,
+        chunk_workers: int = 1,
+        window: int | None = None,
+        flatten_window: bool = True,
+    ) -> None:
+        super().__init__(
+            prototype=prototype,
+            data=data,
+            target=target,
+            train_ratio=train_ratio,
+            feature_engineering=feature_engineering,
+            memory_budget=memory_budget,
+            storage_dir=storage_dir,
+            cache=cache,
+            chunk_workers=chunk_workers,
+            window=window,
+            flatten_window=flatten_window,
+        )
+        self.n_split = n_split
+
+    def get_chunks(self, data: pd.DataFrame) -> list[np.ndarray]:
+        size = len(data)
+        split_size = size // self.n_split
+        chunks: list[np.ndarray] = []
+        for i in range(self.n_split):
+            end = size if i == self.n_split - 1 else (i + 1) * split_size
+            chunks.append(np.arange(i * split_size, end))
+        return chunks
 
 
 class DistributionColumnBasedGenerator(
     Generic[TDataset, TAccessor],
-    DataFrameGenerator,
-    BaseDatasetGenerator[TDataset, TAccessor],
+    ChunkedDataFrameGenerator[TDataset, TAccessor],
 ):
     def __init__(
         self,
@@ -103,52 +580,46 @@ class DistributionColumnBasedGenerator(
         target: str,
         feature_engineering: BaseFeatureEngineering,
         dist_col: str = "dist_id",
+        memory_budget: int | None = None,
+        storage_dir: str | Path | None = None,
+        cache: DatasetCache | None = None,
+        chunk_workers: int = 1,
+        window: int | None = None,
+        flatten_window: bool = True,
     ) -> None:
-        DataFrameGenerator.__init__(self, data)
-        BaseDatasetGenerator.__init__(
-            self=self,
+        super().__init__(
             prototype=prototype,
+            data=data,
             target=target,
-            feature_engineering=feature_engineering,
             train_ratio=train_ratio,
+            feature_engineering=feature_engineering,
+            memory_budget=memory_budget,
+            storage_dir=storage_dir,
+            cache=cache,
+            chunk_workers=chunk_workers,
+            window=window,
+            flatten_window=flatten_window,
         )
         self.dist_col = dist_col
-        self.feature_engineering = add_transform_to_feature_engineering(
-            self.feature_engineering,
-            transform=lambda data: data.drop(
-                columns=[self.dist_col]
-            ).reset_index(drop=True),
-            pos=0,
-            sections=["chunk"],
-        )
 
-    def __call__(self, shuffle: bool = True) -> list[TAccessor]:
-        subsets: list[TAccessor] = []
-        data = self.feature_engineering.apply_preprocess_transform(self.data)
-        grouped = data.groupby(self.dist_col)
-
-        log.info(f"Number of groups: {len(grouped)}")
-
-        for _, group_data in grouped:
-            chunk_data = group_data.copy()
-            chunk_data = self.feature_engineering.apply_chunk_transform(
-                chunk_data
-            )
-            X_train, X_test, y_train, y_test = split_dataset(
-                chunk_data, self.target, self.train_ratio, shuffle
-            )
-            subsets.append(
-                self.prototype.create_accessor(
-                    self.prototype.create_dataset(X_train, y_train),
-                    self.prototype.create_dataset(X_test, y_test),
-                )
-            )
+    @property
+    def non_feature_columns(self) -> list[str]:
+        return [self.target, self.dist_col]
 
-        return subsets
+    def get_chunks(self, data: pd.DataFrame) -> list[np.ndarray]:
+        # same groups, in the same order, as `data.groupby(self.dist_col)`
+        codes, uniques = pd.factorize(data[self.dist_col], sort=True)
+        order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        # rows with a missing distribution (code -1) sort first, skip them
+        order = order[len(codes) - counts.sum() :]
+        log.info(f"Number of groups: {len(uniques)}")
+        return np.split(order, np.cumsum(counts)[:-1])
 
 
 __all__ = [
     "DataFrameGenerator",
+    "ChunkedDataFrameGenerator",
     "SplitChunkGenerator",
     "DistributionColumnBasedGenerator",
 ]
@@ -19,7 +19,7 @@ from sklearn.preprocessing import (
     minmax_scale,
 )
 
-from src.utils.general import split_dataset
+from src.utils.general import group_history_ratios, split_dataset
 
 from .base import GoogleDataset
 
@@ -61,40 +61,11 @@ def append_history_time(df, colname):
     long_duration_name = str(colname) + "_history_duration_long"
     short_duration_name = str(colname) + "_history_duration_short"
 
-    df[long_duration_name] = 0
-    df[short_duration_name] = 0
-
-    histogram_map = {}
-
-    for index, row in df.iterrows():
-        group_name = row[colname]
-        duration_classification = (
-            1 if row["duration"] >= 412000000 else 0
-        )
-
-        group_hist = histogram_map.get(
-            group_name, {"long": 0, "short": 0}
-        )
-
-        total_rows = max(
-            group_hist["long"] + group_hist["short"],
-            1,
-        )
-
-        df.at[index, long_duration_name] = (
-            group_hist["long"] / total_rows
-        )
-        df.at[index, short_duration_name] = (
-            group_hist["short"] / total_rows
-        )
-
-        if duration_classification == 1:
-            group_hist["long"] += 1
-        else:
-            group_hist["short"] += 1
-
-        # Update the dictionary with the modified histogram for the collection_logical_name
-        histogram_map[group_name] = group_hist
+    [(long_ratio, short_ratio)], _ = group_history_ratios(
+        df[colname], [df["duration"] >= 412000000]
+    )
+    df[long_duration_name] = long_ratio
+    df[short_duration_name] = short_ratio
 
 
 def append_history(df, colname):
@@ -104,38 +75,11 @@ def append_history(df, colname):
     throttle_name = str(colname) + "_history_throttle"
     non_throttle_name = str(colname) + "_history_non_throttle"
 
-    df[throttle_name] = 0
-    df[non_throttle_name] = 0
-
-    histogram_map = {}
-
-    for index, row in df.iterrows():
-        collection_name = row[colname]
-        cpu_classification = 1 if row["util_cpu"] > 1 else 0
-
-        collection_hist = histogram_map.get(
-            collection_name, {"throttle": 0, "non_throttle": 0}
-        )
-
-        total_rows = max(
-            collection_hist["throttle"]
-            + collection_hist["non_throttle"],
-            1,
-        )
-        df.at[index, throttle_name] = (
-            collection_hist["throttle"] / total_rows
-        )
-        df.at[index, non_throttle_name] = (
-            collection_hist["non_throttle"] / total_rows
-        )
-
-        if cpu_classification == 1:
-            collection_hist["throttle"] += 1
-        else:
-            collection_hist["non_throttle"] += 1
-
-        # Update the dictionary with the modified histogram for the collection_logical_name
-        histogram_map[collection_name] = collection_hist
+    [(throttle_ratio, non_throttle_ratio)], _ = group_history_ratios(
+        df[colname], [df["util_cpu"] > 1]
+    )
+    df[throttle_name] = throttle_ratio
+    df[non_throttle_name] = non_throttle_ratio
 
 
 class GoogleSchedulerDataset(GoogleDataset):
@@ -0,0 +1,150 @@
+"""Rewrite raw traces into time-sorted parquet for the training pipelines.
+
+The output is sorted by the time column (stably, missing times last), is
+split into row groups of about `row_group_mb` MiB with min/max statistics,
+and records the sort order in its parquet metadata. Downstream sorts by
+that column then find the data already in order, and scans filtering on it
+skip every row group outside the requested time range. A small json
+manifest next to the output summarizes the row groups.
+
+Usage:
+
+    python -m src.dataset.ingest raw_data/google/raw.parquet \\
+        raw_data/google/sorted.parquet --time-column start_time
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+from src.utils.fingerprint import fingerprint_file
+from src.utils.io import write_parquet
+from src.utils.logging import logging
+
+log = logging.getLogger(__name__)
+
+DEFAULT_ROW_GROUP_MB = 64
+
+
+def manifest_path(path: str | Path) -> Path:
+    """Path of the manifest that `ingest` writes next to `path`."""
+    return Path(path).with_suffix(".manifest.json")
+
+
+def read_table(source: str | Path) -> Any:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    source = Path(source)
+    if source.suffix == ".parquet":
+        return pq.read_table(source)
+    elif source.suffix == ".csv":
+        import pandas as pd
+
+        return pa.Table.from_pandas(pd.read_csv(source), preserve_index=False)
+    else:
+        raise ValueError("File must be either a parquet or a csv file")
+
+
+def row_group_rows(table: Any, row_group_mb: float) -> int:
+    """Rows per row group so that a group holds about `row_group_mb` MiB."""
+    row_bytes = table.nbytes / max(table.num_rows, 1)
+    return max(int(row_group_mb * (1 << 20) / max(row_bytes, 1)), 1)
+
+
+def ingest(
+    source: str | Path,
+    destination: str | Path,
+    time_column: str,
+    row_group_mb: float = DEFAULT_ROW_GROUP_MB,
+) -> dict[str, Any]:
+    """Write `source` sorted by `time_column` to `destination`.
+
+    Returns the manifest, which is also written to
+    `manifest_path(destination)`.
+    """
+    import pyarrow.parquet as pq
+
+    table = read_table(source)
+    if time_column not in table.column_names:
+        raise ValueError(f"{source} has no column {time_column}")
+    # a stable sort, like `SortValuesTransform`, with missing values last
+    table = table.sort_by(time_column)
+    rows = row_group_rows(table, row_group_mb)
+    write_parquet(
+        destination,
+        table,
+        row_group_size=rows,
+        write_statistics=True,
+        sorting_columns=[
+            pq.SortingColumn(table.column_names.index(time_column))
+        ],
+    )
+
+    metadata = pq.ParquetFile(destination).metadata
+    time_index = table.column_names.index(time_column)
+    row_groups = []
+    for i in range(metadata.num_row_groups):
+        group = metadata.row_group(i)
+        statistics = group.column(time_index).statistics
+        has_min_max = statistics is not None and statistics.has_min_max
+        row_groups.append(
+            dict(
+                num_rows=group.num_rows,
+                min=statistics.min if has_min_max else None,
+                max=statistics.max if has_min_max else None,
+            )
+        )
+    manifest = dict(
+        source=str(source),
+        source_fingerprint=fingerprint_file(source),
+        time_column=time_column,
+        sorted_by=[time_column],
+        num_rows=table.num_rows,
+        columns=table.column_names,
+        row_group_rows=rows,
+        row_groups=row_groups,
+    )
+    manifest_path(destination).write_text(
+        json.dumps(manifest, indent=2, default=str)
+    )
+    log.info(
+        "Wrote %d rows in %d row groups sorted by %s to %s",
+        table.num_rows,
+        len(row_groups),
+        time_column,
+        destination,
+    )
+    return manifest
+
+
+def main(args: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Rewrite a raw trace into time-sorted parquet."
+    )
+    parser.add_argument("source", type=Path, help="raw parquet or csv file")
+    parser.add_argument("destination", type=Path, help="output parquet")
+    parser.add_argument(
+        "--time-column", required=True, help="column to sort by"
+    )
+    parser.add_argument(
+        "--row-group-mb",
+        type=float,
+        default=DEFAULT_ROW_GROUP_MB,
+        help="approximate uncompressed size of a row group",
+    )
+    parsed = parser.parse_args(args)
+    logging.basicConfig(level=logging.INFO)
+    ingest(
+        parsed.source,
+        parsed.destination,
+        parsed.time_column,
+        parsed.row_group_mb,
+    )
+
+
+__all__ = ["DEFAULT_ROW_GROUP_MB", "manifest_path", "ingest"]
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import threading
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from typing import Any, Generic
+
+from .base import TAccessor
+from .prefetch import PrefetchIterator, PrefetchStats
+
+
+@dataclass
+class _PendingExperience:
+    """Halves of an experience materialized but not taken yet."""
+
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    halves: dict[str, Any] = field(default_factory=dict)
+    taken: set[str] = field(default_factory=set)
+
+
+class LazyExperiences(Generic[TAccessor]):
+    """Sequence of experiences materialized on demand.
+
+    Only light metadata (number of experiences, input size) is known up
+    front; `materialize(i)` builds the `i`-th accessor when it is needed.
+    The dataset streams share each experience: when one of them takes its
+    train or test half, only the other half is kept, until the other
+    stream takes it, so it is materialized once. A half taken again (e.g.
+    the test half, by the next evaluation) is materialized again, so the
+    consumer can release what it took. With `prefetch > 0`,
+    the dataset streams prepare that many upcoming experiences in the
+    background while the current one is consumed.
+    """
+
+    def __init__(
+        self,
+        materialize: Callable[[int], TAccessor],
+        num_experiences: int,
+        input_size: int | None = None,
+        prefetch: int = 0,
+        categorical: dict[int, int] | None = None,
+    ):
+        self._materialize = materialize
+        self._num_experiences = num_experiences
+        self._input_size = input_size
+        self._categorical = categorical
+        self.prefetch = prefetch
+        self.prefetch_stats: dict[str, PrefetchStats] = {}
+        self._pending: dict[int, _PendingExperience] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def input_size(self) -> int:
+        if self._input_size is None:
+            self._input_size = self[0].train.input_size
+        return self._input_size
+
+    @property
+    def categorical(self) -> dict[int, int]:
+        """See `BaseDataset.categorical`."""
+        if self._categorical is None:
+            self._categorical = self[0].train.categorical
+        return self._categorical
+
+    def __len__(self) -> int:
+        return self._num_experiences
+
+    def __getitem__(self, index: int) -> TAccessor:
+        if not 0 <= index < len(self):
+            raise IndexError(f"Experience {index} out of range")
+        return self._materialize(index)
+
+    def __iter__(self) -> Iterator[TAccessor]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def _take(self, index: int, subset: str) -> Any:
+        """The `subset` half of experience `index`, keeping the other half
+        for the other stream if it did not take it yet."""
+        with self._lock:
+            pending = self._pending.setdefault(index, _PendingExperience())
+        with pending.lock:
+            pending.taken.add(subset)
+            if subset in pending.halves:
+                return pending.halves.pop(subset)
+            accessor = self[index]
+            for other in ("train", "test"):
+                if other not in pending.taken:
+                    pending.halves.setdefault(other, getattr(accessor, other))
+            return getattr(accessor, subset)
+
+    def _datasets(self, subset: str) -> Iterator[Any]:
+        def prepare(index: int) -> Any:
+            return self._take(index, subset)
+
+        if self.prefetch <= 0:
+            for index in range(len(self)):
+                yield prepare(index)
+            return
+
+        iterator = PrefetchIterator(
+            prepare, len(self), lookahead=self.prefetch, name=subset
+        )
+        self.prefetch_stats[subset] = iterator.stats
+        yield from iterator
+
+    def train_datasets(self) -> Iterator[Any]:
+        return self._datasets("train")
+
+    def test_datasets(self) -> Iterator[Any]:
+        return self._datasets("test")
+
+    def __repr__(self) -> str:
+        return f"LazyExperiences(num_experiences={len(self)})"
+
+
+__all__ = ["LazyExperiences"]
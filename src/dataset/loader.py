@@ -0,0 +1,85 @@
+from collections.abc import Iterator
+
+import torch
+from torch.utils.data import Sampler
+
+from .base import BaseDataset
+
+
+class BlockBatchSampler(Sampler[torch.Tensor | slice]):
+    """Yield whole minibatches of indices instead of single indices.
+
+    Without shuffling the blocks are plain slices, so a batch is served as
+    a view of the underlying tensors.
+    """
+
+    def __init__(
+        self,
+        num_samples: int,
+        batch_size: int,
+        shuffle: bool = False,
+        drop_last: bool = False,
+        generator: torch.Generator | None = None,
+    ):
+        self.num_samples = num_samples
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.generator = generator
+
+    def __iter__(self) -> Iterator[torch.Tensor | slice]:
+        order = (
+            torch.randperm(self.num_samples, generator=self.generator)
+            if self.shuffle
+            else None
+        )
+        for start in range(0, len(self) * self.batch_size, self.batch_size):
+            end = min(start + self.batch_size, self.num_samples)
+            yield slice(start, end) if order is None else order[start:end]
+
+    def __len__(self) -> int:
+        if self.drop_last:
+            return self.num_samples // self.batch_size
+        return (self.num_samples + self.batch_size - 1) // self.batch_size
+
+
+class BatchDataLoader:
+    """Minibatch loader that bypasses per-sample `__getitem__` and collation.
+
+    Each minibatch is fetched with `BaseDataset.get_batch`, i.e. one slice
+    of the pre-materialized tensors per batch. `indices` optionally maps the
+    loader positions to rows of `dataset` (e.g. the subset seen by an
+    Avalanche experience).
+    """
+
+    def __init__(
+        self,
+        dataset: BaseDataset,
+        batch_size: int,
+        shuffle: bool = False,
+        drop_last: bool = False,
+        indices: torch.Tensor | None = None,
+        generator: torch.Generator | None = None,
+    ):
+        self.dataset = dataset
+        self.indices = indices
+        self.sampler = BlockBatchSampler(
+            len(dataset) if indices is None else len(indices),
+            batch_size=batch_size,
+            shuffle=shuffle,
+            drop_last=drop_last,
+            generator=generator,
+        )
+
+    def __iter__(
+        self,
+    ) -> Iterator[tuple[torch.Tensor, torch.Tensor, torch.Tensor]]:
+        for block in self.sampler:
+            index = block if self.indices is None else self.indices[block]
+            yield self.dataset.get_batch(index)
+
+    def __len__(self) -> int:
+        return len(self.sampler)
+
+
+__all__ = ["BlockBatchSampler", "BatchDataLoader"]
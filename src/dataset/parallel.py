@@ -0,0 +1,117 @@
+import multiprocessing
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from .storage import (
+    FEATURE_DTYPE,
+    TARGET_DTYPE,
+    feature_cardinalities,
+    fill_array,
+)
+
+# (frame, feature columns, target column) of a chunk
+ChunkSource = Callable[[int], tuple[pd.DataFrame, list[str], str]]
+
+_source: ChunkSource | None = None
+
+
+def _set_source(source: ChunkSource) -> None:
+    global _source
+    _source = source
+
+
+def _share_chunk(i: int) -> tuple[str, int, list[str], dict[str, int]]:
+    """Write the features and targets of chunk `i` to shared memory."""
+    assert _source is not None
+    data, columns, target = _source(i)
+    n_rows = len(data)
+    features_nbytes = n_rows * len(columns) * FEATURE_DTYPE().itemsize
+    shm = SharedMemory(
+        create=True,
+        size=max(features_nbytes + n_rows * TARGET_DTYPE().itemsize, 1),
+    )
+    features: np.ndarray = np.ndarray(
+        (n_rows, len(columns)), dtype=FEATURE_DTYPE, buffer=shm.buf
+    )
+    fill_array(features, data, columns)
+    targets: np.ndarray = np.ndarray(
+        n_rows, dtype=TARGET_DTYPE, buffer=shm.buf, offset=features_nbytes
+    )
+    targets[:] = data[target].to_numpy()
+    # views must be gone before the buffer can be closed
+    del features, targets
+    shm.close()
+    return shm.name, n_rows, columns, feature_cardinalities(data, columns)
+
+
+class _SharedBlock:
+    """Array interface onto `shm` from `offset`, so that arrays made of it
+    keep the block mapped, and unmap it once they are all gone."""
+
+    def __init__(
+        self, shm: SharedMemory, shape: tuple[int, ...], dtype, offset: int
+    ):
+        self.shm = shm
+        block: np.ndarray = np.ndarray(shm.size, np.uint8, buffer=shm.buf)
+        address = block.ctypes.data + offset
+        # no buffer left exported, for `shm` to close once unreferenced
+        del block
+        self.__array_interface__ = {
+            "shape": shape,
+            "typestr": np.dtype(dtype).str,
+            "data": (address, False),
+            "version": 3,
+        }
+
+
+def _receive_chunk(
+    name: str, n_rows: int, columns: list[str]
+) -> tuple[np.ndarray, np.ndarray]:
+    """The features and targets of a chunk, in place in its shared memory
+    block, which is released when they are."""
+    shm = SharedMemory(name=name)
+    # the memory lives on while mapped
+    shm.unlink()
+    features_nbytes = n_rows * len(columns) * FEATURE_DTYPE().itemsize
+    features = np.asarray(
+        _SharedBlock(shm, (n_rows, len(columns)), FEATURE_DTYPE, 0)
+    )
+    targets = np.asarray(
+        _SharedBlock(shm, (n_rows,), TARGET_DTYPE, features_nbytes)
+    )
+    return features, targets
+
+
+def map_chunks(
+    source: ChunkSource, num_chunks: int, workers: int
+) -> Iterator[tuple[np.ndarray, np.ndarray, list[str], dict[str, int]]]:
+    """Features, targets, feature columns and their cardinalities (see
+    `feature_cardinalities`) of each chunk, in order.
+
+    `source(i)` builds chunk `i` on a pool of `workers` forked processes.
+    They inherit `source` and whatever it refers to (e.g. the frame the
+    chunks are taken from) instead of receiving it pickled, and hand back
+    the float32 features and int64 targets through shared memory.
+    """
+    # workers then share the tracker of this process, which sees blocks
+    # created there being unlinked here
+    resource_tracker.ensure_running()
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_set_source,
+        initargs=(source,),
+    ) as pool:
+        for name, n_rows, columns, cardinalities in pool.map(
+            _share_chunk, range(num_chunks)
+        ):
+            features, targets = _receive_chunk(name, n_rows, columns)
+            yield features, targets, columns, cardinalities
+
+
+__all__ = ["ChunkSource", "map_chunks"]
@@ -0,0 +1,92 @@
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from src.utils.logging import logging
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class PrefetchStats:
+    """Time spent preparing items vs. time the consumer waited for them."""
+
+    items: int = 0
+    prepare_time: float = 0.0
+    stall_time: float = 0.0
+
+    @property
+    def saved_time(self) -> float:
+        """Preparation time hidden behind the consumer's own work."""
+        return max(self.prepare_time - self.stall_time, 0.0)
+
+
+class PrefetchIterator(Generic[T]):
+    """Iterate over `prepare(0), ..., prepare(n - 1)` with look-ahead.
+
+    While the consumer works on item `i`, items up to `i + lookahead` are
+    prepared on a thread pool, so the consumer only stalls when preparing
+    an item takes longer than consuming the previous one. `stats` records
+    how much preparation time was hidden that way.
+    """
+
+    def __init__(
+        self,
+        prepare: Callable[[int], T],
+        num_items: int,
+        lookahead: int = 1,
+        name: str = "prefetch",
+    ):
+        if lookahead < 1:
+            raise ValueError("lookahead must be at least 1")
+        self.prepare = prepare
+        self.num_items = num_items
+        self.lookahead = lookahead
+        self.name = name
+        self.stats = PrefetchStats()
+
+    def _timed_prepare(self, index: int) -> tuple[T, float]:
+        start = time.perf_counter()
+        item = self.prepare(index)
+        return item, time.perf_counter() - start
+
+    def __iter__(self) -> Iterator[T]:
+        pool = ThreadPoolExecutor(
+            max_workers=self.lookahead, thread_name_prefix=self.name
+        )
+        pending: deque[Future[tuple[T, float]]] = deque()
+        submitted = 0
+        try:
+            for index in range(self.num_items):
+                while (
+                    submitted < self.num_items
+                    and submitted <= index + self.lookahead
+                ):
+                    pending.append(pool.submit(self._timed_prepare, submitted))
+                    submitted += 1
+
+                start = time.perf_counter()
+                item, prepare_time = pending.popleft().result()
+                self.stats.items += 1
+                self.stats.prepare_time += prepare_time
+                self.stats.stall_time += time.perf_counter() - start
+                yield item
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            log.info(
+                "[%s] prepared %d items in %.2fs, waited %.2fs, "
+                "removed %.2fs of stall time",
+                self.name,
+                self.stats.items,
+                self.stats.prepare_time,
+                self.stats.stall_time,
+                self.stats.saved_time,
+            )
+
+
+__all__ = ["PrefetchStats", "PrefetchIterator"]
@@ -0,0 +1,136 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logging import logging
+
+log = logging.getLogger(__name__)
+
+FEATURE_DTYPE = np.float32
+TARGET_DTYPE = np.int64
+WRITE_BLOCK_ROWS = 1 << 16
+
+
+def estimate_nbytes(n_rows: int, n_features: int) -> int:
+    """Estimate the size of a dataset once converted to tensors."""
+    return n_rows * (
+        n_features * np.dtype(FEATURE_DTYPE).itemsize
+        + np.dtype(TARGET_DTYPE).itemsize
+    )
+
+
+def feature_cardinalities(
+    data: pd.DataFrame, columns: list[str]
+) -> dict[str, int]:
+    """Number of codes of each categorical column out of `columns`.
+
+    Categoricals are stored as their codes plus one, 0 standing for a
+    missing value, see `fill_array`.
+    """
+    return {
+        column: len(data[column].cat.categories) + 1
+        for column in columns
+        if isinstance(data[column].dtype, pd.CategoricalDtype)
+    }
+
+
+def fill_array(
+    out: np.ndarray, data: pd.DataFrame, columns: list[str]
+) -> np.ndarray:
+    """Copy `data[columns]` into `out` one block of rows at a time.
+
+    Only one block is converted at a time, so the selected columns never
+    exist as a second full-size frame. Categorical columns are written as
+    their codes plus one (0 for missing values), to be embedded by the
+    model, see `feature_cardinalities`.
+    """
+    positions = data.columns.get_indexer(columns)
+    categorical = [
+        i
+        for i, position in enumerate(positions)
+        if isinstance(data.dtypes.iloc[position], pd.CategoricalDtype)
+    ]
+    if not categorical:
+        for start in range(0, len(data), WRITE_BLOCK_ROWS):
+            end = start + WRITE_BLOCK_ROWS
+            out[start:end] = data.iloc[start:end, positions].to_numpy(
+                dtype=out.dtype
+            )
+        return out
+
+    dense = [i for i in range(len(positions)) if i not in categorical]
+    for start in range(0, len(data), WRITE_BLOCK_ROWS):
+        end = start + WRITE_BLOCK_ROWS
+        block = data.iloc[start:end]
+        out[start:end, dense] = block.iloc[:, positions[dense]].to_numpy(
+            dtype=out.dtype
+        )
+        for i in categorical:
+            codes = block.iloc[:, positions[i]].cat.codes.to_numpy()
+            out[start:end, i] = codes + 1
+    return out
+
+
+class MemmapStore:
+    """On-disk storage for feature matrices served through `np.memmap`.
+
+    Each array is written once as a `.npy` file and reopened in
+    copy-on-write mode, so the resulting arrays behave like regular
+    writable arrays while their pages are loaded from disk on demand.
+    The files live in a private temporary directory (under `directory` if
+    given) that is removed together with the store; already opened maps
+    stay valid after that.
+    """
+
+    def __init__(self, directory: str | Path | None = None):
+        if directory is not None:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+        self._tmpdir = tempfile.TemporaryDirectory(
+            prefix="dataset-", dir=directory
+        )
+        self.directory = Path(self._tmpdir.name)
+
+    def save(
+        self,
+        name: str,
+        data: pd.DataFrame,
+        columns: list[str] | None = None,
+        dtype: type = FEATURE_DTYPE,
+    ) -> np.ndarray:
+        columns = list(data.columns) if columns is None else columns
+        path = self.directory / f"{name}.npy"
+        array = np.lib.format.open_memmap(
+            path, mode="w+", dtype=dtype, shape=(len(data), len(columns))
+        )
+        fill_array(array, data, columns)
+        array.flush()
+        del array
+        log.debug("Saved %s to %s", name, path)
+        return np.load(path, mmap_mode="c")
+
+    def __repr__(self) -> str:
+        return f"MemmapStore(directory={self.directory})"
+
+
+def to_feature_array(
+    data: pd.DataFrame,
+    columns: list[str],
+    store: MemmapStore | None = None,
+    name: str = "features",
+) -> np.ndarray:
+    """Convert `data[columns]` into a float32 matrix, on disk if `store`."""
+    if store is not None:
+        return store.save(name, data, columns)
+    out = np.empty((len(data), len(columns)), dtype=FEATURE_DTYPE)
+    return fill_array(out, data, columns)
+
+
+__all__ = [
+    "estimate_nbytes",
+    "feature_cardinalities",
+    "fill_array",
+    "to_feature_array",
+    "MemmapStore",
+]
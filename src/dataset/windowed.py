@@ -0,0 +1,110 @@
+from typing import Any, Generic
+
+import torch
+
+import numpy as np
+
+from .base import (
+    BaseDataset,
+    BaseDatasetPrototype,
+    TAccessor,
+    TDataset,
+    to_tensor,
+)
+
+
+class WindowedDataset(BaseDataset):
+    """Samples of the `window` consecutive rows of `features` ending at the
+    row of their target.
+
+    Windows are strided views of the features (`Tensor.unfold`, like
+    `np.lib.stride_tricks.sliding_window_view`), so the features are
+    stored once whatever the window, and a sample is only gathered when
+    read. Samples are `(window, n_features)` sequences, e.g. for
+    `src.models.LSTM`, or with `flatten` vectors of `window * n_features`
+    values, the lag features of an MLP, oldest row first. Rows with fewer
+    than `window - 1` rows before them have no sample.
+    """
+
+    def __init__(
+        self,
+        features: Any,
+        targets: Any,
+        window: int,
+        flatten: bool = False,
+        tasks: Any = None,
+        indices: np.ndarray | torch.Tensor | None = None,
+        **kwargs,
+    ):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        if indices is None:
+            indices = np.arange(len(features))
+        indices = to_tensor(indices, torch.int64)
+        super().__init__(
+            features,
+            targets,
+            tasks,
+            indices=indices[indices >= window - 1],
+            **kwargs,
+        )
+        self.window = window
+        self.flatten = flatten
+        n_rows, n_features = self.features.shape
+        if n_rows < window:
+            self.windows = self.features.new_empty((0, window, n_features))
+        else:
+            self.windows = self.features.unfold(0, window, 1).transpose(1, 2)
+
+    @property
+    def input_size(self) -> int:
+        n_features = super().input_size
+        return n_features * self.window if self.flatten else n_features
+
+    @property
+    def categorical(self) -> dict[int, int]:
+        """See `BaseDataset.categorical`, per row of a window, or for each
+        of them in turn if `flatten`."""
+        categorical = super().categorical
+        if not self.flatten:
+            return categorical
+        n_features = self.features.shape[1]
+        return {
+            step * n_features + i: cardinality
+            for step in range(self.window)
+            for i, cardinality in categorical.items()
+        }
+
+    def _features_at(self, index: Any) -> torch.Tensor:
+        assert self.indices is not None
+        windows = self.windows[self.indices[index] - (self.window - 1)]
+        if self.flatten:
+            return windows.flatten(-2)
+        return windows
+
+
+class WindowedDatasetPrototype(
+    Generic[TDataset, TAccessor], BaseDatasetPrototype[TDataset, TAccessor]
+):
+    """Creates `WindowedDataset`s in the accessors of `prototype`."""
+
+    def __init__(
+        self,
+        prototype: BaseDatasetPrototype[TDataset, TAccessor],
+        window: int,
+        flatten: bool = False,
+    ):
+        self.prototype = prototype
+        self.window = window
+        self.flatten = flatten
+
+    def create_accessor(self, train: Any, test: Any, **kwargs) -> TAccessor:
+        return self.prototype.create_accessor(train, test, **kwargs)
+
+    def create_dataset(self, X: Any, y: Any, **kwargs) -> Any:
+        return WindowedDataset(
+            X, y, window=self.window, flatten=self.flatten, **kwargs
+        )
+
+
+__all__ = ["WindowedDataset", "WindowedDatasetPrototype"]
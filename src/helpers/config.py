@@ -9,6 +9,8 @@ from .definitions import (
     DriftDetector,
     Model,
     Optimizer,
+    SamplingMethod,
+    ScalerFit,
     Scenario,
     Strategy,
     Training,
@@ -24,6 +26,8 @@ class ModelConfig(DynamicConfig):
     hidden_layers: int = 3
     hidden_size: int = 512
     drop_rate: float = 0.2
+    # size of the embedding of each categorical feature
+    embedding_dim: int = 4
 
 
 class ScenarioConfig(DynamicConfig):
@@ -53,6 +57,20 @@ class DriftDetectionConfig(DynamicConfig):
     name: DriftDetector
 
 
+class SamplingConfig(DynamicConfig):
+    method: SamplingMethod
+    # rows kept ("first", "uniform") or rows kept per stratum ("stratified")
+    n: int | None = None
+    # defaults to the time column ("first", "range") or target ("stratified")
+    column: str | None = None
+    # window of `column` values, `start` <= value < `end` ("range")
+    start: float | None = None
+    end: float | None = None
+    # stratum bin edges, distinct values if not set ("stratified")
+    edges: list[float] | None = None
+    seed: int = 0
+
+
 class TuneConfig(DynamicConfig):
     learning_rate: list[float] = [1e-3]
 
@@ -71,6 +89,34 @@ class GeneralConfig(DynamicConfig):
     wandb: str | None = None
     online: bool = False
     train_ratio: float = 0.8
+    # serve minibatches as tensor slices instead of collated samples, which
+    # samples them with another RNG than Avalanche, so runs differ
+    batch_loader: bool = False
+    # datasets estimated above this size (in MB) are served from disk
+    memory_budget_mb: int | None = None
+    storage_dir: str | None = None
+    # materialize experiences only while the benchmark streams are walked
+    lazy_experiences: bool = False
+    # number of lazy experiences prepared in the background
+    prefetch_experiences: int = 0
+    # reuse feature-engineered datasets across jobs through this directory
+    cache_dir: str | None = None
+    # save intermediate results of the preprocess transforms here
+    checkpoint_dir: str | None = None
+    # processes running the row-local preprocess transforms, 1 for none
+    preprocess_workers: int = 1
+    # processes applying the chunk transforms of experiences, 1 for none
+    chunk_workers: int = 1
+    # keep categorical columns as codes embedded by the model, rather than
+    # one-hot encoding them
+    categorical_embeddings: bool = False
+    # samples of this many consecutive rows, see `WindowedDataset`
+    window: int | None = None
+    # what the feature scaling is fitted on, see `ScalerFit`
+    scaler_fit: ScalerFit = ScalerFit.ALL
+    # save the fitted scaling statistics here, next to the model if unset,
+    # with the experience index appended when fitted on each experience
+    scaler_path: str | None = None
 
 
 class Config(GeneralConfig):
@@ -80,6 +126,12 @@ class Config(GeneralConfig):
     strategy: StrategyConfig
     tune: TuneConfig = TuneConfig()
     drift_detection: DriftDetectionConfig | None = None
+    # rows of the raw data to work with, see `sampling_transform`
+    sampling: SamplingConfig | None = None
+
+    def __fingerprint__(self) -> dict[str, Any]:
+        """Fields the engineered dataset depends on, see `fingerprint`."""
+        return self.model_dump(include={"dataset", "scenario", "num_classes"})
 
 
 def assert_config_params(config: Config, params: Any):
@@ -1,5 +1,5 @@
-from collections.abc import Sequence
-from typing import TypeVar
+from collections.abc import Iterator, Sequence
+from typing import Any, TypeVar
 
 from avalanche.benchmarks.utils import (
     AvalancheDataset,
@@ -7,8 +7,13 @@ from avalanche.benchmarks.utils import (
 )
 
 from src.dataset.base import BaseDatasetAccessor
+from src.dataset.cache import DatasetCache
+from src.dataset.lazy import LazyExperiences
 from src.transforms.base import BaseFeatureEngineering
 
+from .config import Config
+from .definitions import Model
+
 TFeatureEngineering = TypeVar(
     "TFeatureEngineering", bound=BaseFeatureEngineering
 )
@@ -20,18 +25,19 @@ class AvalancheClassificationDatasetAccessor(
     pass
 
 
+def _make_classification_dataset(dataset: Any) -> AvalancheDataset:
+    return make_classification_dataset(
+        dataset,
+        task_labels=getattr(dataset, "tasks", None),
+    )
+
+
 def create_avalanche_classification_dataset(
     dataset: BaseDatasetAccessor,
 ) -> AvalancheClassificationDatasetAccessor:
     return AvalancheClassificationDatasetAccessor(
-        train=make_classification_dataset(
-            dataset.train,
-            task_labels=getattr(dataset.train, "tasks", None),
-        ),
-        test=make_classification_dataset(
-            dataset.test,
-            task_labels=getattr(dataset.test, "tasks", None),
-        ),
+        train=_make_classification_dataset(dataset.train),
+        test=_make_classification_dataset(dataset.test),
     )
 
 
@@ -41,7 +47,89 @@ def create_avalanche_classification_datasets(
     return [create_avalanche_classification_dataset(d) for d in datasets]
 
 
+def generate_classification_datasets(
+    generator: Any, config: Config
+) -> tuple[Any, int, dict[int, int]]:
+    """Run a dataset generator and return the datasets, input size and
+    categorical inputs (see `BaseDataset.categorical`).
+
+    With `config.lazy_experiences`, the experiences are returned as
+    `LazyExperiences` and only materialized while the benchmark streams
+    are walked, `config.prefetch_experiences` of them ahead of time.
+    """
+    if config.lazy_experiences:
+        experiences = generator.generate_lazy(
+            prefetch=config.prefetch_experiences
+        )
+        if len(experiences) == 0:
+            raise ValueError("Dataset is empty")
+        return experiences, experiences.input_size, experiences.categorical
+
+    dataset = generator()
+    if len(dataset) == 0:
+        raise ValueError("Dataset is empty")
+    return (
+        create_avalanche_classification_datasets(dataset),
+        dataset[0].train.input_size,
+        dataset[0].train.categorical,
+    )
+
+
+def create_classification_benchmark(
+    dataset: Sequence[AvalancheClassificationDatasetAccessor] | LazyExperiences,
+):
+    if isinstance(dataset, LazyExperiences):
+        from avalanche.benchmarks.generators import (
+            create_lazy_generic_benchmark,
+        )
+        from avalanche.benchmarks.scenarios.generic_benchmark_creation import (
+            LazyStreamDefinition,
+        )
+
+        def stream_definition(datasets: Iterator[Any]) -> LazyStreamDefinition:
+            return LazyStreamDefinition(
+                (_make_classification_dataset(d) for d in datasets),
+                len(dataset),
+                [0] * len(dataset),
+            )
+
+        return create_lazy_generic_benchmark(
+            train_generator=stream_definition(dataset.train_datasets()),
+            test_generator=stream_definition(dataset.test_datasets()),
+        )
+
+    from avalanche.benchmarks.generators import dataset_benchmark
+
+    train_subsets: list[Any] = [subset.train for subset in dataset]
+    test_subsets: list[Any] = [subset.test for subset in dataset]
+    return dataset_benchmark(train_subsets, test_subsets)
+
+
+def get_generator_kwargs(config: Config) -> dict[str, Any]:
+    """Dataset generator options shared by every pipeline."""
+    return dict(
+        memory_budget=(
+            config.memory_budget_mb * 2**20
+            if config.memory_budget_mb is not None
+            else None
+        ),
+        storage_dir=config.storage_dir,
+        cache=(
+            DatasetCache(config.cache_dir, context=config.__fingerprint__())
+            if config.cache_dir is not None
+            else None
+        ),
+        chunk_workers=config.chunk_workers,
+        window=config.window,
+        # sequences for the LSTM, lag features for the other models
+        flatten_window=config.model.name != Model.LSTM,
+    )
+
+
 __all__ = [
+    "generate_classification_datasets",
+    "create_classification_benchmark",
+    "get_generator_kwargs",
     "AvalancheClassificationDatasetAccessor",
     "create_avalanche_classification_dataset",
     "create_avalanche_classification_datasets",
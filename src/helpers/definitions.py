@@ -50,14 +50,34 @@ class Task(StrEnum):
 class Model(StrEnum):
     A = "model-a"
     B = "model-b"
+    LSTM = "model-lstm"
     # MLP = "mlp"
 
 
+class ScalerFit(StrEnum):
+    """Data the feature scaling is fitted on."""
+
+    # the whole dataset, before it is split into experiences
+    ALL = "all"
+    # each experience on its own
+    EXPERIENCE = "experience"
+    # the first experience, scaling later ones as seen from it
+    FIRST = "first"
+
+
 class Training(StrEnum):
     ONLINE = "online"
     BATCH = "batch"
 
 
+class SamplingMethod(StrEnum):
+    ALL = "all"
+    FIRST = "first"
+    RANGE = "range"
+    UNIFORM = "uniform"
+    STRATIFIED = "stratified"
+
+
 class DriftDetector(StrEnum):
     VOTING = "voting"
     RUPTURES = "ruptures"
@@ -81,8 +101,10 @@ __all__ = [
     "Strategy",
     "Task",
     "Model",
+    "ScalerFit",
     "Training",
     "DriftDetector",
+    "SamplingMethod",
     "Snakemake",
     "DD_ID",
     "DD_DIST_COLUMN",
@@ -2,11 +2,26 @@
 from src.helpers.config import Config
 from src.helpers.definitions import Dataset
 from src.transforms.base import BaseFeatureEngineering
+from src.transforms.checkpoint import TransformCheckpoint
+from src.transforms.parallel import ParallelExecutor
 
 NO_FEATS = "no-feature"
 
 
 def get_features(config: Config) -> BaseFeatureEngineering:
+    feature_engineering = _get_features(config)
+    if config.checkpoint_dir is not None:
+        feature_engineering.checkpoint = TransformCheckpoint(
+            config.checkpoint_dir
+        )
+    if config.preprocess_workers > 1:
+        feature_engineering.executor = ParallelExecutor(
+            config.preprocess_workers
+        )
+    return feature_engineering
+
+
+def _get_features(config: Config) -> BaseFeatureEngineering:
     feature = config.dataset.feature
     dataset_name = config.dataset.name
 
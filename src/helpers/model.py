@@ -1,6 +1,7 @@
 import torch.nn as nn
 
 from src.models.mlp import MLP
+from src.models.sequence import LSTM
 
 from .config import Config
 from .definitions import Model
@@ -9,12 +10,28 @@ from .definitions import Model
 class Model_A(MLP):
     pass
 
+
 class Model_B(MLP):
-    def __init__(self, num_classes=10, input_size=28 * 28, hidden_size=512, hidden_layers=1, drop_rate=0.5):
-        super().__init__(num_classes, input_size, hidden_size, hidden_layers, drop_rate)
+    def __init__(
+        self,
+        num_classes=10,
+        input_size=28 * 28,
+        hidden_size=512,
+        hidden_layers=1,
+        drop_rate=0.5,
+        **kwargs,
+    ):
+        super().__init__(
+            num_classes,
+            input_size,
+            hidden_size,
+            hidden_layers,
+            drop_rate,
+            **kwargs,
+        )
         self.features = nn.Sequential(
             *(
-                nn.Linear(input_size, hidden_size),
+                nn.Linear(self._features_size, hidden_size),
                 # nn.BatchNorm1d(hidden_size),
                 nn.InstanceNorm1d(hidden_size),
                 # nn.BatchNorm2d(hidden_size),
@@ -23,6 +40,29 @@ class Model_B(MLP):
         )
 
 
+class Model_LSTM(LSTM):
+    """`LSTM` over the windows of a `WindowedDataset` (see `Config.window`)."""
+
+    def __init__(
+        self,
+        num_classes=10,
+        input_size=28 * 28,
+        hidden_size=512,
+        hidden_layers=1,
+        drop_rate=0.5,
+        categorical=None,
+        embedding_dim=4,
+    ):
+        if categorical:
+            raise ValueError("Model_LSTM does not embed categorical inputs")
+        super().__init__(
+            input_size,
+            hidden_size,
+            num_classes,
+            rnn_layers=hidden_layers,
+            drop_rate=drop_rate,
+        )
+
 
 def _get_model(model: Model):
     match model:
@@ -30,6 +70,8 @@ def _get_model(model: Model):
             return Model_A
         case Model.B:
             return Model_B
+        case Model.LSTM:
+            return Model_LSTM
         case _:
             raise ValueError("Unknown model")
         
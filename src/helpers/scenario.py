@@ -25,7 +25,7 @@ from .optimizer import get_optimizer
 from .strategy import get_strategy
 from .trainer import get_trainer, save_train_results
 
-GetDatasetFn = Callable[[Config, Path], Tuple[Any, int]]
+GetDatasetFn = Callable[[Config, Path], Tuple[Any, int, dict[int, int]]]
 GetBenchmarkFn = Callable[[Any], GenericCLScenario | OnlineCLScenario]
 
 
@@ -53,11 +53,17 @@ def train_classification_scenario(
 
     log.info(f"Current time: %s", current_time)
 
+    if config.scaler_path is None:
+        # scoring scales with these, see `StandardScalerTransform.load`
+        config.scaler_path = str(output_folder / "scaler.json")
+
     device = get_device()
     log.info("Device: %s", device)
 
-    dataset, input_size = get_dataset(config, input_path)
+    dataset, input_size, categorical = get_dataset(config, input_path)
     log.info(f"Input size: {input_size}")
+    if categorical:
+        log.info("Embedded categorical inputs: %s", categorical)
 
     # Evaluation ====
     loggers = [TextLogger(sys.stderr)]
@@ -88,6 +94,7 @@ def train_classification_scenario(
     model = Model(
         input_size=input_size,
         num_classes=config.num_classes,
+        categorical=categorical,
         **config.model.dict(exclude={"name"}),
     )
 
@@ -101,6 +108,12 @@ def train_classification_scenario(
     if config.strategy.name == StrategyEnum.GSS:
         additional_strategy_params["input_size"] = [input_size]
 
+    plugins = []
+    if config.batch_loader:
+        from src.plugins import BatchLoaderPlugin
+
+        plugins.append(BatchLoaderPlugin())
+
     strategy = Strategy(
         model,
         optimizer,
@@ -110,12 +123,24 @@ def train_classification_scenario(
         eval_mb_size=config.test_batch,
         evaluator=eval_plugin,
         device=device,
+        plugins=plugins,
         **additional_strategy_params,
     )
 
     benchmark = get_benchmark(dataset)
     Trainer = get_trainer(config)
-    trainer = Trainer(strategy, benchmark, num_workers=config.num_workers)
+    trainer = Trainer(
+        strategy,
+        benchmark,
+        num_workers=config.num_workers,
+        release_experiences=config.lazy_experiences,
+        # materialize the lazy test experiences again for every evaluation
+        test_stream=(
+            (lambda: get_benchmark(dataset).test_stream)
+            if config.lazy_experiences
+            else None
+        ),
+    )
     log.info("Starting training")
     results = trainer.train()
     log.info("Training finished")
@@ -1,2 +1,3 @@
+from .embedding import *
 from .mlp import *
 from .sequence import *
@@ -0,0 +1,58 @@
+from collections.abc import Mapping
+
+import torch
+import torch.nn as nn
+
+
+class FeatureEmbedding(nn.Module):
+    """Replaces the categorical features of an input by their embeddings.
+
+    `categorical` maps the position of each feature holding category codes
+    (0 to its cardinality - 1) to that cardinality, see
+    `BaseDataset.categorical`. All categorical features share a single
+    table, indexed by their codes shifted by per-feature offsets, so the
+    lookup is one gather. The output is the dense features followed by
+    the `embedding_dim` values of each categorical feature, of width
+    `output_size`.
+    """
+
+    dense: torch.Tensor
+    codes: torch.Tensor
+    offsets: torch.Tensor
+
+    def __init__(
+        self,
+        input_size: int,
+        categorical: Mapping[int, int],
+        embedding_dim: int = 4,
+    ):
+        super().__init__()
+        positions = sorted(categorical)
+        cardinalities = [categorical[i] for i in positions]
+        dense = [i for i in range(input_size) if i not in categorical]
+        offsets = [0]
+        for cardinality in cardinalities[:-1]:
+            offsets.append(offsets[-1] + cardinality)
+        self.register_buffer(
+            "dense", torch.tensor(dense, dtype=torch.int64), persistent=False
+        )
+        self.register_buffer(
+            "codes",
+            torch.tensor(positions, dtype=torch.int64),
+            persistent=False,
+        )
+        self.register_buffer(
+            "offsets",
+            torch.tensor(offsets, dtype=torch.int64),
+            persistent=False,
+        )
+        self.embedding = nn.Embedding(sum(cardinalities), embedding_dim)
+        self.output_size = len(dense) + len(positions) * embedding_dim
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        codes = x.index_select(1, self.codes).long() + self.offsets
+        embedded = self.embedding(codes).flatten(1)
+        return torch.cat([x.index_select(1, self.dense), embedded], dim=1)
+
+
+__all__ = ["FeatureEmbedding"]
@@ -1,8 +1,12 @@
+from collections.abc import Mapping
+
 import torch
 import torch.nn as nn
 
 from avalanche.models.base_model import BaseModel
 
+from .embedding import FeatureEmbedding
+
 
 class MLP(torch.nn.Module, BaseModel):
     """
@@ -19,6 +23,8 @@ class MLP(torch.nn.Module, BaseModel):
         hidden_size=512,
         hidden_layers=1,
         drop_rate=0.5,
+        categorical: Mapping[int, int] | None = None,
+        embedding_dim=4,
     ):
         """
         :param num_classes: output size
@@ -26,12 +32,27 @@ class MLP(torch.nn.Module, BaseModel):
         :param hidden_size: hidden layer size
         :param hidden_layers: number of hidden layers
         :param drop_rate: dropout rate. 0 to disable
+        :param categorical: cardinality of each input holding category
+            codes, by position, embedded rather than taken as values
+        :param embedding_dim: size of the embedding of each such input
         """
         super().__init__()
 
+        self.embedding = (
+            FeatureEmbedding(input_size, categorical, embedding_dim)
+            if categorical
+            else None
+        )
+        # width of the input of the first layer
+        self._features_size = (
+            self.embedding.output_size
+            if self.embedding is not None
+            else input_size
+        )
+
         layers = nn.Sequential(
             *(
-                nn.Linear(input_size, hidden_size),
+                nn.Linear(self._features_size, hidden_size),
                 nn.ReLU(inplace=True),
                 nn.Dropout(p=drop_rate),
             )
@@ -52,18 +73,20 @@ class MLP(torch.nn.Module, BaseModel):
         self.classifier = nn.Linear(hidden_size, num_classes)
         self._input_size = input_size
 
-    def forward(self, x):
+    def embed(self, x):
         x = x.contiguous()
         x = x.view(x.size(0), self._input_size)
-        x = self.features(x)
+        if self.embedding is not None:
+            x = self.embedding(x)
+        return x
+
+    def forward(self, x):
+        x = self.features(self.embed(x))
         x = self.classifier(x)
         return x
 
     def get_features(self, x):
-        x = x.contiguous()
-        x = x.view(x.size(0), self._input_size)
-        x = self.features(x)
-        return x
+        return self.features(self.embed(x))
 
 
 __all__ = ["MLP"]
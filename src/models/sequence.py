@@ -11,6 +11,7 @@ class LSTM(torch.nn.Module, BaseModel):
         num_classes,
         rnn_layers=1,
         batch_first=True,
+        drop_rate=0.0,
     ):
         super().__init__()
         self.batch_first = batch_first
@@ -19,6 +20,8 @@ class LSTM(torch.nn.Module, BaseModel):
             hidden_size,
             num_layers=rnn_layers,
             batch_first=batch_first,
+            # between layers only
+            dropout=drop_rate if rnn_layers > 1 else 0.0,
         )
         self.classifier = torch.nn.Linear(hidden_size, num_classes)
         self._input_size = input_size
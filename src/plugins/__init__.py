@@ -0,0 +1 @@
+from .batch_loader import *
@@ -0,0 +1,118 @@
+from typing import Any
+
+import torch
+
+from avalanche.core import SupervisedPlugin
+from avalanche.training.templates import SupervisedTemplate
+
+from src.dataset.base import BaseDataset
+from src.dataset.loader import BatchDataLoader
+from src.utils.logging import logging
+
+log = logging.getLogger(__name__)
+
+# `resolve_base_dataset` reads private attributes of the Avalanche datasets
+# (`_flat_data`, `_datasets`, `_indices`) as laid out at this commit, the one
+# pinned in env.yaml, env-cpu.yaml and env-pinned.yaml.
+AVALANCHE_COMMIT = "2b7fa26f0ca98603b057a2eee992a4dc3a55abe1"
+
+
+def resolve_base_dataset(
+    dataset: Any,
+) -> tuple[BaseDataset, torch.Tensor | None] | None:
+    """Find the `BaseDataset` behind an Avalanche dataset.
+
+    Returns the dataset together with the row indices selected by the
+    Avalanche wrappers (`None` meaning all rows in order), or `None` when
+    the dataset is a concatenation of several sources (e.g. a replay
+    buffer) and cannot be served from a single set of tensors. Relies on
+    the Avalanche internals of `AVALANCHE_COMMIT`.
+    """
+    if isinstance(dataset, BaseDataset):
+        return dataset, None
+
+    flat_data = getattr(dataset, "_flat_data", dataset)
+    datasets = getattr(flat_data, "_datasets", None)
+    if datasets is None or len(datasets) != 1:
+        return None
+
+    resolved = resolve_base_dataset(datasets[0])
+    if resolved is None:
+        return None
+
+    base_dataset, inner_indices = resolved
+    indices = getattr(flat_data, "_indices", None)
+    if indices is None:
+        return base_dataset, inner_indices
+
+    indices = torch.as_tensor(list(indices), dtype=torch.int64)
+    if inner_indices is not None:
+        indices = inner_indices[indices]
+    return base_dataset, indices
+
+
+class BatchLoaderPlugin(SupervisedPlugin):
+    """Replace the strategy dataloaders with `BatchDataLoader`.
+
+    The default Avalanche dataloaders build every minibatch one sample at a
+    time and collate it afterwards. When the experience data resolves to a
+    single `BaseDataset`, this plugin swaps them for a loader that slices
+    whole minibatches out of the dataset tensors. Other datasets (replay
+    buffers, concatenations) keep the default dataloader.
+    """
+
+    def _make_loader(
+        self, dataset: Any, batch_size: int, shuffle: bool
+    ) -> BatchDataLoader | None:
+        resolved = resolve_base_dataset(dataset)
+        if resolved is None:
+            log.warning(
+                "%s does not resolve to a single dataset, falling back to "
+                "the default dataloader",
+                type(dataset).__name__,
+            )
+            return None
+        base_dataset, indices = resolved
+        if indices is None:
+            valid = len(base_dataset) == len(dataset)
+        else:
+            valid = len(indices) == len(dataset) and (
+                len(indices) == 0
+                or 0 <= int(indices.min())
+                and int(indices.max()) < len(base_dataset)
+            )
+        if not valid:
+            log.warning(
+                "%s resolved to rows not matching its own (Avalanche differs "
+                "from commit %s?), falling back to the default dataloader",
+                type(dataset).__name__,
+                AVALANCHE_COMMIT[:8],
+            )
+            return None
+        return BatchDataLoader(
+            base_dataset,
+            batch_size=batch_size,
+            shuffle=shuffle,
+            indices=indices,
+        )
+
+    def before_training_exp(self, strategy: SupervisedTemplate, **kwargs):
+        loader = self._make_loader(
+            strategy.adapted_dataset,
+            batch_size=strategy.train_mb_size,
+            shuffle=True,
+        )
+        if loader is not None:
+            strategy.dataloader = loader
+
+    def before_eval_exp(self, strategy: SupervisedTemplate, **kwargs):
+        loader = self._make_loader(
+            strategy.adapted_dataset,
+            batch_size=strategy.eval_mb_size,
+            shuffle=False,
+        )
+        if loader is not None:
+            strategy.dataloader = loader
+
+
+__all__ = ["AVALANCHE_COMMIT", "resolve_base_dataset", "BatchLoaderPlugin"]
@@ -1,4 +1,4 @@
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 from avalanche.benchmarks.scenarios import GenericCLScenario
 from avalanche.training.templates import SupervisedTemplate
@@ -12,10 +12,36 @@ class BatchNoRetrainTrainer(BaseTrainer):
         strategy: SupervisedTemplate,
         benchmark: GenericCLScenario,
         num_workers: int = 4,
+        release_experiences: bool = False,
+        test_stream: Callable[[], Any] | None = None,
     ):
         self.strategy = strategy
         self.benchmark = benchmark
         self.num_workers = num_workers
+        self.release_experiences = release_experiences
+        self.test_stream = test_stream
+
+    def evaluation_stream(self) -> Any:
+        """The stream to evaluate on.
+
+        With `test_stream`, a new stream is built for every evaluation, so
+        a lazy stream does not keep every test experience it materialized.
+        """
+        if self.test_stream is None:
+            return self.benchmark.test_stream
+        return self.test_stream()
+
+    def release_experience(self, experience: Any):
+        """Drop the stream references to an already trained experience.
+
+        Only lazy streams can materialize an experience again, so this is
+        a no-op unless `release_experiences` is set.
+        """
+        if not self.release_experiences:
+            return
+        self.benchmark.train_stream.drop_previous_experiences(
+            experience.current_experience
+        )
 
     def train(self) -> Dict[int, Dict[str, float]]:
         assert (
@@ -28,7 +54,7 @@ class BatchNoRetrainTrainer(BaseTrainer):
             first_experience,
             num_workers=self.num_workers,
         )
-        result = self.strategy.eval(self.benchmark.test_stream)
+        result = self.strategy.eval(self.evaluation_stream())
         results[0] = result
         return results
 
@@ -41,8 +67,9 @@ class BatchSimpleRetrainTrainer(BatchNoRetrainTrainer):
                 experience,
                 num_workers=self.num_workers,
             )
-            result = self.strategy.eval(self.benchmark.test_stream)
+            result = self.strategy.eval(self.evaluation_stream())
             results[experience.current_experience] = result
+            self.release_experience(experience)
         return results
 
 
@@ -1,2 +1,8 @@
 from .base import *
+from .binning import *
+from .checkpoint import *
+from .copies import *
 from .general import *
+from .lineage import *
+from .parallel import *
+from .scaling import *
@@ -1,9 +1,15 @@
+from collections.abc import Sequence
+
 import pandas as pd
 
 from .base import BaseTransform
+from .general import SortValuesTransform
+from .lineage import Lineage
 
 
 class CleanDataTransform(BaseTransform):
+    copy_mode = "view"
+
     NON_FEATURE_COLUMNS = [
         "name",
         # "task_type",
@@ -41,10 +47,21 @@ class CleanDataTransform(BaseTransform):
         data = data.reset_index(drop=True)
         # data = data.fillna(0)
         data = data[(data.plan_cpu > 0) & (data.plan_mem > 0)]
-        data = data.sort_values(by=["start_time"])
+        data = SortValuesTransform("start_time")(data)
         data = data.drop(columns=non_feature_columns)
         return data
 
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        # `dropna` reads every column
+        return Lineage(
+            reads=frozenset(columns),
+            drops=frozenset(
+                column
+                for column in self.NON_FEATURE_COLUMNS
+                if column in columns and column not in self.excludes
+            ),
+        )
+
     def __repr__(self) -> str:
         return "CleanDataTransform()"
 
@@ -1,12 +1,22 @@
+from collections.abc import Sequence
+
 import pandas as pd
 
 from src.helpers.config import Config
+from src.utils.general import Predicate
 
 from .base import BaseFeatureEngineering, BaseTransform, Transform
-from .general import ColumnsDropTransform, DiscretizeColumnTransform
+from .general import (
+    ColumnsDropTransform,
+    DiscretizeColumnTransform,
+    SortValuesTransform,
+)
+from .lineage import Lineage
 
 
 class CleanDataTransform(BaseTransform):
+    copy_mode = "view"
+
     def __init__(self, exclude: str | list[str] = []):
         if isinstance(exclude, str):
             exclude = [exclude]
@@ -26,16 +36,31 @@ class CleanDataTransform(BaseTransform):
         ]
         data = data.dropna()
         # data = data[(data.plan_cpu > 0) & (data.plan_mem > 0)]
-        data = data.sort_values(by=["time_stamp"])
+        data = SortValuesTransform("time_stamp")(data)
         data = data.drop(columns=self.excludes)
         data = data.reset_index(drop=True)
         return data
 
+    def row_filter(self, columns: Sequence[str]) -> list[Predicate]:
+        return [(column, "notna", None) for column in columns] + [
+            ("cpu_util_percent", ">", 0),
+            ("cpu_util_percent", "<=", 100),
+        ]
+
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        # `dropna` reads every column
+        return Lineage(
+            reads=frozenset(columns),
+            drops=frozenset(self.excludes).intersection(columns),
+        )
+
     def __repr__(self) -> str:
         return "CleanDataTransform()"
 
 
 class StrCountTransform(BaseTransform):
+    row_local = True
+
     def __init__(
         self,
         column: str,
@@ -54,6 +79,11 @@ class StrCountTransform(BaseTransform):
         )
         return data
 
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        return Lineage(
+            reads=frozenset([self.column]), writes=frozenset([self.new_column])
+        )
+
     def __repr__(self) -> str:
         return (
             f"StrCountTransform(column={self.column}"
@@ -114,6 +144,11 @@ class FeatureEngineering_A(BaseFeatureEngineering):
     def target_name(self) -> str:
         return self._target_name
 
+    @property
+    def read_dtypes(self) -> dict[str, str]:
+        # only checked for missing values, then dropped
+        return {"cpu_set": "category"}
+
 
 __all__ = [
     "CleanDataTransform",
@@ -1,77 +1,193 @@
+from collections.abc import Sequence
+
 import numpy as np
+import numpy.typing as npt
 import pandas as pd
 
 from src.helpers.config import Config
 from src.helpers.definitions import DD_ID
 from src.transforms.base import Transform
 from src.utils.logging import logging
+from src.utils.sampling import FirstSampler
 
 from .base import BaseFeatureEngineering, BaseTransform, Transform
 from .general import (
+    CategoricalColumnsTransform,
     ColumnsDropTransform,
     DiscretizeColumnTransform,
     NamedInjectTransform,
     OneHotColumnsTransform,
     PrintColumnsTransform,
 )
+from .lineage import Lineage
+from .sampling import SampleTransform, sampling_transform
 
 log = logging.getLogger(__name__)
 
 
 class BucketSubscriptionCPUPercentTransform(BaseTransform):
+    """Per-subscription cumulative counts of the CPU percent buckets.
+
+    Adds one column per bucket (`{target_name}_percent_{i}`, the target
+    rounded up), counting the rows of the same subscription up to and
+    including the current one that fall into that bucket. Rows without a
+    subscription only count themselves.
+
+    Counts are computed one bucket at a time from the subscription and
+    bucket codes, so besides the output only a few row-sized vectors are
+    allocated. The output is `dtype` (`uint32` by default), or sparse with
+    `sparse=True`, which suits subscriptions that stay in a few buckets.
+    """
+
+    copy_mode = "view"
+
     def __init__(
         self,
         target_name: str,
         drop_percent: bool = True,
         n_bins: int | None = 100,
         drop_first: bool = False,
+        dtype: npt.DTypeLike = np.uint32,
+        sparse: bool = False,
     ):
         self.target_name = target_name
         self.drop_percent = drop_percent
         self.n_bins = n_bins if n_bins is not None else 100
         self.drop_first = drop_first
+        self.dtype = np.dtype(dtype)
+        self.sparse = sparse
+        self._counts: pd.DataFrame | None = None
+
+    @property
+    def buckets(self) -> range:
+        return range(1 if self.drop_first else 0, self.n_bins + 1)
+
+    def reset_state(self) -> None:
+        self._counts = None
 
     def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
-        """Convert an iterable of indices to one-hot encoded labels."""
+        return self._apply(data, None)[0]
 
-        df = data.copy()
+    def lineage(self, columns: Sequence[str]) -> Lineage:
         temp_column = f"{self.target_name}_percent"
-        df[temp_column] = df[self.target_name].apply(np.ceil)
-        df = df.astype({temp_column: int})
-
-        # one hot encoding but with number of class
-        targets = np.array(df[temp_column].values).reshape(-1)
-        ohe = np.eye(self.n_bins + 1)[targets]
-        percent_columns = [
-            f"{temp_column}_{i}" for i in range(0, self.n_bins + 1)
-        ]
-        percent_df = pd.DataFrame(
-            ohe,
-            columns=percent_columns,
+        writes = [f"{temp_column}_{bucket}" for bucket in self.buckets]
+        if not self.drop_percent:
+            writes.append(temp_column)
+        return Lineage(
+            reads=frozenset([self.target_name, "subscriptionid"]),
+            writes=frozenset(writes),
         )
-        if self.drop_first:
-            percent_df = percent_df.drop(columns=[f"{temp_column}_0"])
-
-        # percent_df = pd.get_dummies(
-        #     df[temp_column], prefix="percent", dtype=int
-        # )
-        df = pd.concat([df, percent_df], axis=1)
-        df[percent_columns] = df.groupby(by=["subscriptionid"])[
-            percent_columns
-        ].transform(lambda x: x.cumsum())
-        if self.drop_percent:
-            df = df.drop(columns=[temp_column])
+
+    def partial_transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Cumulative counts continuing those of the previous batches."""
+        df, counts = self._apply(data, self._counts)
+        if self._counts is not None:
+            counts = counts.combine_first(self._counts).astype(np.int64)
+        self._counts = counts
         return df
 
+    def _apply(
+        self, data: pd.DataFrame, counts: pd.DataFrame | None
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        temp_column = f"{self.target_name}_percent"
+        percent = np.ceil(data[self.target_name].to_numpy()).astype(np.int64)
+        if len(percent) and (percent.min() < 0 or percent.max() > self.n_bins):
+            raise ValueError(
+                f"{temp_column} must be between 0 and {self.n_bins}"
+            )
+
+        n_rows = len(data)
+        codes, uniques = pd.factorize(data["subscriptionid"])
+        # rows of a subscription become contiguous segments, in their
+        # original order; rows without one (code -1) come first
+        order = np.argsort(codes, kind="stable")
+        inverse = np.empty_like(order)
+        inverse[order] = np.arange(n_rows)
+        sorted_codes = codes[order]
+        sorted_percent = percent[order]
+        first = np.flatnonzero(np.diff(sorted_codes, prepend=-2))
+        sizes = np.diff(np.r_[first, n_rows])
+        last = first + sizes - 1
+        segment_codes = sorted_codes[first]
+        n_alone = int(np.count_nonzero(sorted_codes < 0))
+        valid = segment_codes >= 0
+
+        prior = np.zeros((len(first), len(self.buckets)), dtype=np.int64)
+        if counts is not None and len(counts) > 0:
+            position = counts.index.get_indexer(uniques[segment_codes[valid]])
+            prior[valid] = np.where(
+                position[:, None] >= 0,
+                counts.to_numpy(dtype=np.int64)[position],
+                0,
+            )
+
+        names = [f"{temp_column}_{bucket}" for bucket in self.buckets]
+        totals = np.zeros((len(uniques), len(names)), dtype=np.int64)
+        if self.sparse:
+            column = np.zeros(n_rows, self.dtype)
+            sparse_columns = {}
+        else:
+            dense = np.zeros((n_rows, len(names)), self.dtype, order="F")
+        for j, bucket in enumerate(self.buckets):
+            hits = sorted_percent == bucket
+            cumulative = np.cumsum(hits, dtype=np.int64)
+            if n_rows:
+                # restart the count at every segment, from the prior count
+                cumulative -= np.repeat(
+                    cumulative[first] - hits[first] - prior[:, j], sizes
+                )
+            cumulative[:n_alone] = hits[:n_alone]
+            totals[segment_codes[valid], j] = cumulative[last[valid]]
+
+            target = column if self.sparse else dense[:, j]
+            np.take(cumulative.astype(self.dtype), inverse, out=target)
+            if self.sparse:
+                sparse_columns[names[j]] = pd.arrays.SparseArray(
+                    column, fill_value=0
+                )
+
+        parts = [data]
+        if not self.drop_percent:
+            parts.append(pd.DataFrame({temp_column: percent}, data.index))
+        parts.append(
+            pd.DataFrame(sparse_columns, index=data.index)
+            if self.sparse
+            else pd.DataFrame(
+                dense, index=data.index, columns=names, copy=False
+            )
+        )
+        return (
+            pd.concat(parts, axis=1, copy=False),
+            pd.DataFrame(totals, index=uniques, columns=names),
+        )
+
     def __repr__(self) -> str:
         return f"""BucketSubscriptionCPUPercentTransform(
                 target_name="{self.target_name}",
                 drop_percent={self.drop_percent},
                 n_bins={self.n_bins},
-                drop_first={self.drop_first}
+                drop_first={self.drop_first},
+                dtype={self.dtype},
+                sparse={self.sparse}
             )"""
 
 
+# rows of the trace used unless the config sets `sampling`
+N_ROWS = 10_000
+
+# the strings of the trace are only one-hot encoded (or embedded) or
+# grouped by
+DTYPES = {
+    "subscriptionid": "category",
+    "deploymentid": "category",
+    "vmcategory": "category",
+    "vmcorecountbucket": "category",
+    "vmmemorybucket": "category",
+}
+
+# one-hot encoded, or embedded with `config.categorical_embeddings`
+CATEGORICAL_COLUMNS = ["vmcategory", "vmcorecountbucket", "vmmemorybucket"]
+
 NON_FEATURE_COLUMNS = [
     "vmid",
     "subscriptionid",
@@ -113,6 +229,14 @@ class NoFeats(BaseFeatureEngineering):
     def target_name(self) -> str:
         return self._target_name
 
+    @property
+    def read_columns(self) -> set[str]:
+        return {self._config.dataset.target}
+
+    @property
+    def read_dtypes(self) -> dict[str, str]:
+        return DTYPES
+
     def __repr__(self) -> str:
         return "NoFeats()"
 
@@ -122,10 +246,12 @@ class FeatureEngineering_A(BaseFeatureEngineering):
         super().__init__()
         self._config = config
         self._target_name = f"bucket_{config.dataset.target}"
+        self._embed = config.categorical_embeddings
         self._non_feature_columns = list(
             filter(
                 # lambda x: x != config.dataset.target and x != "DIST_COL",
-                lambda x: x != config.dataset.target,
+                lambda x: x != config.dataset.target
+                and not (self._embed and x in CATEGORICAL_COLUMNS),
                 NON_FEATURE_COLUMNS,
             )
         )
@@ -134,19 +260,15 @@ class FeatureEngineering_A(BaseFeatureEngineering):
     def preprocess_transform_set(self) -> list[Transform] | None:
         return [
             PrintColumnsTransform("Original Columns"),
-            lambda data: data.copy(),
-            lambda data: data.sort_values(by=["vmdeleted"]).reset_index(
-                drop=True
+            sampling_transform(
+                self._config, SampleTransform(FirstSampler("vmdeleted", N_ROWS))
             ),
-            lambda data: data.iloc[0:10_000],
             NamedInjectTransform(DD_ID),
             BucketSubscriptionCPUPercentTransform(self._config.dataset.target),
-            OneHotColumnsTransform(
-                columns=[
-                    "vmcategory",
-                    "vmcorecountbucket",
-                    "vmmemorybucket",
-                ],
+            (
+                CategoricalColumnsTransform(CATEGORICAL_COLUMNS)
+                if self._embed
+                else OneHotColumnsTransform(columns=CATEGORICAL_COLUMNS)
             ),
             ColumnsDropTransform(columns=self._non_feature_columns),
             DiscretizeColumnTransform(
@@ -162,5 +284,20 @@ class FeatureEngineering_A(BaseFeatureEngineering):
     def target_name(self) -> str:
         return self._target_name
 
+    @property
+    def read_columns(self) -> set[str]:
+        return {
+            self._config.dataset.target,
+            "vmdeleted",
+            "subscriptionid",
+            "vmcategory",
+            "vmcorecountbucket",
+            "vmmemorybucket",
+        }
+
+    @property
+    def read_dtypes(self) -> dict[str, str]:
+        return DTYPES
+
 
 __all__ = ["BucketSubscriptionCPUPercentTransform", "FeatureEngineering_A"]
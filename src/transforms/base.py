@@ -1,8 +1,20 @@
+import copy
 from abc import ABCMeta, abstractmethod
-from typing import Any, Protocol
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import TYPE_CHECKING, Any, Protocol
 
 import pandas as pd
 
+from src.utils.general import Predicate
+from src.utils.sampling import Sampler
+
+from .checkpoint import TransformCheckpoint
+from .copies import CopyMode, CopyReport, run_transforms
+from .lineage import Lineage, dead_columns, drop_dead_columns
+
+if TYPE_CHECKING:
+    from .parallel import ParallelExecutor
+
 
 # https://github.com/ContinualAI/avalanche/blob/2b7fa26f0ca98603b057a2eee992a4dc3a55abe1/avalanche/benchmarks/utils/transform_groups.py#L57
 class ComposedTransformDef(Protocol):
@@ -19,6 +31,36 @@ Transform = TransformDef | ComposedTransformDef
 
 
 class BaseTransform(metaclass=ABCMeta):
+    """Transform of a whole frame, optionally of a stream of row batches.
+
+    To stream, a transform either is `row_local` (each row's output only
+    depends on that row, so batches can be transformed independently, also
+    in parallel, see `ParallelExecutor`), or
+    overrides `partial_transform` to carry the state it needs from one
+    batch to the next. Transforms that must see all data before
+    transforming any of it set `requires_fit` and implement `partial_fit`.
+
+    A transform that drops rows by conditions on single columns can also
+    describe them as a `row_filter`, so that the reader can skip those
+    rows instead, see `BaseFeatureEngineering.input_filters`.
+
+    Its `copy_mode` tells `apply_transforms` whether it writes to the
+    frame it is given, so that copies are only made where needed, and its
+    `lineage` which columns it reads, writes and drops, so that columns
+    can be dropped as soon as nothing needs them anymore, see
+    `BaseFeatureEngineering.plan_preprocess_transform_set`.
+    """
+
+    # the output of each row only depends on that row
+    row_local: bool = False
+    # see `CopyMode`
+    copy_mode: CopyMode = "inplace"
+    # `partial_fit` must see the whole stream before `partial_transform`
+    requires_fit: bool = False
+    # fitted on the first frame transformed after `reset_state` only, so
+    # the same instance must be returned for every transform set access
+    fits_once: bool = False
+
     @abstractmethod
     def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
         pass
@@ -26,6 +68,57 @@ class BaseTransform(metaclass=ABCMeta):
     def transform(self, data: pd.DataFrame) -> pd.DataFrame:
         return self(data)
 
+    def supports_streaming(self) -> bool:
+        return (
+            self.row_local
+            or type(self).partial_transform
+            is not BaseTransform.partial_transform
+        )
+
+    def row_filter(self, columns: Sequence[str]) -> list[Predicate] | None:
+        """Predicates on its input that the rows this transform keeps meet.
+
+        Apart from dropping the rows that fail them, the transform must not
+        depend on which rows it is given: it keeps the same rows, in the
+        same order, of input that was already filtered. `columns` are the
+        columns read. None when the transform does not filter rows.
+        """
+        return None
+
+    def lineage(self, columns: Sequence[str]) -> Lineage | None:
+        """Columns this transform reads, writes and drops, given the
+        `columns` of its input. None when unknown, i.e. it may read all.
+        """
+        return None
+
+    def reset_state(self) -> None:
+        """Forget everything learned from previous batches."""
+
+    def fitted_state(self) -> Any | None:
+        """What this transform learned from the data, as JSON, for caches
+        that skip running it to restore with `load_fitted_state`. None when
+        it learned nothing."""
+        return None
+
+    def load_fitted_state(self, state: Any) -> None:
+        """Restore what `fitted_state` returned, as if fitted again."""
+
+    def for_chunk(self, index: int) -> "BaseTransform":
+        """This transform as applied to chunk `index` alone, with state of
+        its own, see `BaseFeatureEngineering.chunk_transforms`."""
+        return copy.deepcopy(self)
+
+    def partial_fit(self, data: pd.DataFrame) -> None:
+        """Update the fitted statistics with the next batch."""
+
+    def partial_transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Transform the next batch as part of the batches before it."""
+        if not self.row_local:
+            raise NotImplementedError(
+                f"{self} cannot transform a stream of batches"
+            )
+        return self(data)
+
     def __repr__(self):
         return f"{self.__class__.__name__}()"
 
@@ -36,19 +129,74 @@ class BaseTransform(metaclass=ABCMeta):
 def apply_transforms(
     data: Any,
     transforms: list[Transform] | Transform | None = None,
+    checkpoint: TransformCheckpoint | None = None,
+    executor: "ParallelExecutor | None" = None,
+    report: CopyReport | None = None,
+    owned: bool = False,
 ) -> Any:
-    """Apply a list of transforms to a data object."""
+    """Apply a list of transforms to a data object.
+
+    A list applied to a frame runs in pandas copy-on-write mode, copying
+    only where the `copy_mode` of the transforms requires it, and leaves
+    the frame passed in unmodified unless `owned`, see `run_transforms`.
+    `report` collects the bytes copied.
+
+    With `checkpoint`, the result after each transform of a list applied
+    to a frame is saved, and a later call resumes from the longest prefix
+    of transforms already saved for the same input. With `executor`, the
+    row-local transforms of a list applied to a frame run in parallel.
+    """
     if transforms is None:
         return data
 
     if isinstance(transforms, list):
-        for transform in transforms:
-            data = transform(data)
-        return data
+        if checkpoint is not None and isinstance(data, pd.DataFrame):
+            return checkpoint.apply(data, transforms, executor, report, owned)
+        if executor is not None and isinstance(data, pd.DataFrame):
+            return executor.apply(data, transforms, report, owned)
+        return run_transforms(data, transforms, report, owned)
 
     return transforms(data)
 
 
+def stream_transforms(
+    batches: Callable[[], Iterable[pd.DataFrame]],
+    transforms: list[Transform] | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Push row batches through `transforms`, yielding transformed batches.
+
+    The concatenated output equals applying `transforms` to the
+    concatenated batches (up to the row index labels), while only one
+    batch is in memory at a time. `batches` is called once per pass: one
+    pass for every transform that `requires_fit`, fitting it on the output
+    of the transforms before it, and a final pass yielding the output.
+    """
+    streaming: list[BaseTransform] = []
+    for transform in transforms or []:
+        if not (
+            isinstance(transform, BaseTransform)
+            and transform.supports_streaming()
+        ):
+            raise ValueError(f"{transform} does not support streaming")
+        streaming.append(transform)
+
+    def run(stop: int) -> Iterator[pd.DataFrame]:
+        for transform in streaming[:stop]:
+            if not transform.requires_fit:
+                transform.reset_state()
+        for batch in batches():
+            for transform in streaming[:stop]:
+                batch = transform.partial_transform(batch)
+            yield batch
+
+    for i, transform in enumerate(streaming):
+        if transform.requires_fit:
+            transform.reset_state()
+            for batch in run(i):
+                transform.partial_fit(batch)
+    yield from run(len(streaming))
+
+
 # @overload
 # def apply_transforms(
 #     data: pd.DataFrame,
@@ -69,8 +217,15 @@ class BaseFeatureEngineering(metaclass=ABCMeta):
             -> chunk_transform
         -> postprocess_transform
     -> final data
+
+    Setting `checkpoint` saves the intermediate results of the preprocess
+    transforms (reading every column, unplanned), and setting `executor` runs their row-local transforms in
+    parallel, see `apply_transforms`.
     """
 
+    checkpoint: TransformCheckpoint | None = None
+    executor: "ParallelExecutor | None" = None
+
     @property
     @abstractmethod
     def target_name(self) -> str:
@@ -82,8 +237,131 @@ class BaseFeatureEngineering(metaclass=ABCMeta):
     ) -> list[Transform] | None:
         return None
 
-    def apply_preprocess_transform(self, data: pd.DataFrame) -> pd.DataFrame:
-        return apply_transforms(data, self.preprocess_transform_set)
+    @property
+    def read_columns(self) -> set[str] | None:
+        """Raw columns the preprocess transforms read before dropping them.
+
+        None when unknown, in which case every raw column is loaded.
+        """
+        return None
+
+    @property
+    def read_dtypes(self) -> dict[str, str] | None:
+        """Dtypes ("float32", "category", ...) to read raw columns as.
+
+        See `read_dataframe`; None reads every column as stored.
+        """
+        return None
+
+    def input_columns(self, available: Sequence[str]) -> list[str] | None:
+        """Raw columns out of `available` that the transforms need.
+
+        These are all columns except those that, per the `lineage` of the
+        preprocess transforms, are dropped before anything needs them, and
+        those dropped by a `ColumnsDropTransform` that, per `read_columns`,
+        nothing reads first. None means all columns.
+
+        With `checkpoint`, all columns are loaded: the saved frames then do
+        not depend on the columns the later transforms need, so feature
+        engineerings sharing a prefix of transforms share its checkpoints.
+        """
+        from .general import ColumnsDropTransform
+
+        if self.checkpoint is not None:
+            return None
+        transforms = self.preprocess_transform_set or []
+        unused: set[str] = set()
+        if transforms:
+            unused.update(dead_columns(transforms, available)[0])
+        read_columns = self.read_columns
+        if read_columns is not None:
+            for transform in transforms:
+                if isinstance(transform, ColumnsDropTransform):
+                    unused.update(set(transform.columns) - read_columns)
+        if not unused:
+            return None
+        # columns that pushed down filters and sampling select rows by
+        for column, _, _ in self.input_filters(available):
+            unused.discard(column)
+        sampler = self.input_sampler(available)
+        if sampler is not None:
+            unused.difference_update(sampler.columns)
+        return [column for column in available if column not in unused]
+
+    def input_filters(self, columns: Sequence[str]) -> list[Predicate]:
+        """Row filters of the preprocess transforms to apply while reading.
+
+        These are the `row_filter`s of the leading preprocess transforms
+        that declare one; the first transform that does not ends the run,
+        as it might depend on the rows filtered out. The transforms still
+        run, so filtering at read time merely saves loading those rows.
+        """
+        filters: list[Predicate] = []
+        for transform in self.preprocess_transform_set or []:
+            if not isinstance(transform, BaseTransform):
+                break
+            row_filter = transform.row_filter(columns)
+            if row_filter is None:
+                break
+            filters.extend(row_filter)
+        return filters
+
+    def input_sampler(self, columns: Sequence[str]) -> Sampler | None:
+        """Sampler of a `SampleTransform` to run while reading, if any.
+
+        That is the sampler of a preprocess transform preceded only by
+        row-local transforms with a `row_filter`: these neither reorder
+        rows nor depend on the rows filtered out, and their filters are
+        applied while reading too, before sampling.
+        """
+        from .sampling import SampleTransform
+
+        for transform in self.preprocess_transform_set or []:
+            if isinstance(transform, SampleTransform):
+                return transform.sampler
+            if not (
+                isinstance(transform, BaseTransform)
+                and transform.row_local
+                and transform.row_filter(columns) is not None
+            ):
+                return None
+        return None
+
+    def plan_preprocess_transform_set(
+        self, columns: Sequence[str]
+    ) -> list[Transform] | None:
+        """The preprocess transforms of input `columns`, dropping each column
+        right after its last use rather than where the transforms do, see
+        `drop_dead_columns`. The result is the same, only with narrower
+        frames in between. With `checkpoint`, the transforms are left as
+        they are, see `input_columns`.
+        """
+        transforms = self.preprocess_transform_set
+        if transforms is None or self.checkpoint is not None:
+            return transforms
+        return drop_dead_columns(transforms, columns)
+
+    def apply_preprocess_transform(
+        self, data: pd.DataFrame, owned: bool = False
+    ) -> pd.DataFrame:
+        """Preprocess `data`, see `apply_transforms` for `owned`."""
+        report = CopyReport()
+        data = apply_transforms(
+            data,
+            self.plan_preprocess_transform_set(list(data.columns)),
+            self.checkpoint,
+            self.executor,
+            report,
+            owned,
+        )
+        report.log(f"{self.__class__.__name__} preprocessing")
+        return data
+
+    def stream_preprocess_transform(
+        self, batches: Callable[[], Iterable[pd.DataFrame]]
+    ) -> Iterator[pd.DataFrame]:
+        """Preprocess a stream of row batches, see `stream_transforms`."""
+        return stream_transforms(batches, self.preprocess_transform_set)
 
     @property
     def chunk_transform_set(
@@ -91,8 +369,42 @@ class BaseFeatureEngineering(metaclass=ABCMeta):
     ) -> list[Transform] | None:
         return None
 
-    def apply_chunk_transform(self, data: pd.DataFrame) -> pd.DataFrame:
-        return apply_transforms(data, self.chunk_transform_set)
+    def chunk_transforms(self, index: int) -> list[Transform] | None:
+        """The chunk transforms to apply to chunk `index`.
+
+        These are copies with state of their own (see `for_chunk`), so
+        that chunks transformed at the same time, e.g. prefetched on
+        threads, do not share what stateful transforms fit.
+        """
+        transforms = self.chunk_transform_set
+        if transforms is None:
+            return None
+        return [
+            (
+                transform.for_chunk(index)
+                if isinstance(transform, BaseTransform)
+                else transform
+            )
+            for transform in transforms
+        ]
+
+    def apply_chunk_transform(
+        self,
+        data: pd.DataFrame,
+        owned: bool = False,
+        index: int | None = None,
+    ) -> pd.DataFrame:
+        """Transform a chunk, see `apply_transforms` for `owned`.
+
+        Given the `index` of the chunk, through `chunk_transforms`,
+        otherwise through the `chunk_transform_set` itself.
+        """
+        transforms = (
+            self.chunk_transform_set
+            if index is None
+            else self.chunk_transforms(index)
+        )
+        return apply_transforms(data, transforms, owned=owned)
 
     @property
     def postprocess_transform_set(
@@ -140,6 +452,7 @@ class BaseFeatureEngineering(metaclass=ABCMeta):
 
 __all__ = [
     "apply_transforms",
+    "stream_transforms",
     "ComposedTransformDef",
     "TransformDef",
     "Transform",
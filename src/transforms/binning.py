@@ -0,0 +1,158 @@
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+# label of values outside of all bins, and of missing values
+MISSING_BIN = -1
+
+
+@dataclass(frozen=True)
+class Bins:
+    """Bins between sorted `edges`, right-closed as `pd.cut`'s: bin `i`
+    holds the values in `(edges[i], edges[i + 1]]`, and with
+    `include_lowest` the first bin also holds `edges[0]`.
+
+    `labels` gives the same labels as `pd.cut(..., labels=False)`, with
+    `MISSING_BIN` instead of NaN, through one `np.searchsorted` into the
+    smallest integer dtype that fits.
+    """
+
+    edges: tuple[float, ...]
+    include_lowest: bool = False
+
+    def __post_init__(self):
+        if len(self.edges) < 2:
+            raise ValueError(f"Bins need at least 2 edges, got {self.edges}")
+
+    @classmethod
+    def uniform(cls, low: float, high: float, n_bins: int) -> "Bins":
+        """`n_bins` bins of equal width over `[low, high]`, widened as by
+        `pd.cut(..., bins=n_bins)` so that `low` falls into the first."""
+        if not (np.isfinite(low) and np.isfinite(high)):
+            raise ValueError(f"Cannot bin the range [{low}, {high}]")
+        if low == high:
+            low -= 0.001 * abs(low) if low != 0 else 0.001
+            high += 0.001 * abs(high) if high != 0 else 0.001
+            edges = np.linspace(low, high, n_bins + 1)
+        else:
+            edges = np.linspace(low, high, n_bins + 1)
+            edges[0] -= (high - low) * 0.001
+        return cls(tuple(edges.tolist()))
+
+    @classmethod
+    def quantile(cls, values: Any, n_bins: int) -> "Bins":
+        """Bins holding about as many of `values` each, as by `pd.qcut`
+        (dropping duplicate edges)."""
+        edges = np.nanquantile(
+            np.asarray(values, dtype=np.float64),
+            np.linspace(0, 1, n_bins + 1),
+        )
+        return cls(tuple(np.unique(edges).tolist()), include_lowest=True)
+
+    @property
+    def n_bins(self) -> int:
+        return len(self.edges) - 1
+
+    def labels(self, values: Any) -> np.ndarray:
+        edges = np.asarray(self.edges, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        ids = np.searchsorted(edges, values, side="left")
+        if self.include_lowest:
+            ids[values == edges[0]] = 1
+        # NaN sorts after every edge
+        ids[ids == len(edges)] = 0
+        dtype = np.int8 if self.n_bins <= np.iinfo(np.int8).max else np.int32
+        return (ids - 1).astype(dtype)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "edges": list(self.edges),
+            "include_lowest": self.include_lowest,
+        }
+
+    @classmethod
+    def from_dict(cls, spec: dict[str, Any]) -> "Bins":
+        return cls(tuple(spec["edges"]), spec.get("include_lowest", False))
+
+    def save(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict()))
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Bins":
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+
+class QuantileSketch:
+    """Mergeable summary of a stream of values for approximate quantiles.
+
+    The sketch keeps at most `size` weighted points: whenever merging a
+    batch (or another sketch) exceeds that, the points are replaced by
+    `size` evenly spaced weighted quantiles of them. The minimum and
+    maximum are kept exactly. Each compression shifts quantiles by at
+    most about `1 / size`.
+    """
+
+    def __init__(self, size: int = 2048):
+        self.size = size
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: Any) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self._merge(values, np.ones(len(values)))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if len(other.values) == 0:
+            return
+        self._merge(other.values, other.weights)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _merge(self, values: np.ndarray, weights: np.ndarray) -> None:
+        values = np.concatenate([self.values, values])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(values, kind="stable")
+        self.values, self.weights = values[order], weights[order]
+        if len(self.values) > self.size:
+            total = self.weights.sum()
+            ranks = (np.arange(self.size) + 0.5) / self.size * total
+            self.values = self._at(ranks)
+            self.weights = np.full(self.size, total / self.size)
+
+    def _at(self, ranks: np.ndarray) -> np.ndarray:
+        """Values at cumulative weights `ranks`, each point standing for
+        the middle of its weight."""
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return np.interp(ranks, centers, self.values)
+
+    def quantiles(self, qs: Sequence[float] | np.ndarray) -> np.ndarray:
+        if len(self.values) == 0:
+            raise ValueError("Empty sketch")
+        qs = np.asarray(qs, dtype=np.float64)
+        result = self._at(qs * self.count)
+        result[qs <= 0] = self.min
+        result[qs >= 1] = self.max
+        return np.clip(result, self.min, self.max)
+
+    def bins(self, n_bins: int) -> Bins:
+        """Approximately `Bins.quantile` of the values seen."""
+        edges = self.quantiles(np.linspace(0, 1, n_bins + 1))
+        return Bins(tuple(np.unique(edges).tolist()), include_lowest=True)
+
+
+__all__ = ["MISSING_BIN", "Bins", "QuantileSketch"]
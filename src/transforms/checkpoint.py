@@ -0,0 +1,152 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from src.utils.fingerprint import fingerprint, hash_parts
+from src.utils.io import read_feather, write_feather, write_text
+from src.utils.logging import logging
+
+from .copies import CopyReport, apply_in_pipeline, copy_on_write, detach
+
+log = logging.getLogger(__name__)
+
+
+def fingerprint_frame(data: pd.DataFrame) -> str:
+    """Content fingerprint of a frame, including its columns and index."""
+    return hash_parts(
+        "frame",
+        list(data.columns),
+        [str(dtype) for dtype in data.dtypes],
+        pd.util.hash_pandas_object(data, index=True).values.tobytes(),
+    )
+
+
+def fitted_states(transforms: list[Any]) -> dict[str, Any]:
+    """What each of `transforms` learned from the data, by position, see
+    `BaseTransform.fitted_state`."""
+    states = {}
+    for i, transform in enumerate(transforms):
+        state = getattr(transform, "fitted_state", lambda: None)()
+        if state is not None:
+            states[str(i)] = state
+    return states
+
+
+def load_fitted_states(transforms: list[Any], states: dict[str, Any]) -> None:
+    """Restore into `transforms` what `fitted_states` returned for them."""
+    for i, state in states.items():
+        transforms[int(i)].load_fitted_state(state)
+
+
+class TransformCheckpoint:
+    """On-disk checkpoints of the intermediate results of a transform list.
+
+    The result after the `i`-th transform is keyed by the fingerprint of
+    the input frame chained with the fingerprints of transforms `0..i`.
+    Pipelines sharing a prefix of transforms therefore share checkpoints,
+    and a run resumes from the longest prefix already on disk. What the
+    transforms of a prefix learned is saved next to it (see
+    `fitted_states`), and restored when resuming after them. Both files
+    are written atomically, the states first, and a prefix is only resumed
+    from when both exist.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.feather"
+
+    def states_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load_states(self, key: str) -> dict[str, Any] | None:
+        """The fitted states saved at `key`, None if missing or unreadable."""
+        try:
+            return json.loads(self.states_path(key).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def prefix_keys(
+        self, data: pd.DataFrame, transforms: list[Any]
+    ) -> list[str]:
+        keys: list[str] = []
+        key = fingerprint_frame(data)
+        for transform in transforms:
+            key = hash_parts(key, fingerprint(transform))
+            keys.append(key)
+        return keys
+
+    def apply(
+        self,
+        data: pd.DataFrame,
+        transforms: list[Any],
+        executor: Any | None = None,
+        report: CopyReport | None = None,
+        owned: bool = False,
+    ) -> Any:
+        """Apply `transforms`, with a `ParallelExecutor` if given.
+
+        The executor runs each run of row-local transforms at once, so
+        only the results after such a run are saved. See `run_transforms`
+        for `report` and `owned`.
+        """
+        source = None if owned else data
+        keys = self.prefix_keys(data, transforms)
+
+        start = 0
+        for i in reversed(range(len(keys))):
+            if not self.path(keys[i]).exists():
+                continue
+            states = self.load_states(keys[i])
+            if states is None:
+                continue
+            log.info(
+                "Resuming after %d/%d transforms from %s",
+                i + 1,
+                len(keys),
+                self.path(keys[i]),
+            )
+            data = read_feather(self.path(keys[i]))
+            load_fitted_states(transforms, states)
+            start = i + 1
+            break
+        if executor is None:
+            segments = [[transform] for transform in transforms[start:]]
+        else:
+            from .parallel import segment_transforms
+
+            segments = segment_transforms(transforms[start:])
+        with copy_on_write():
+            for segment in segments:
+                if executor is None:
+                    data = apply_in_pipeline(segment, data, source, report)
+                else:
+                    data = executor.run(data, segment, source, report)
+                start += len(segment)
+                if isinstance(data, pd.DataFrame):
+                    # the frame appearing publishes the checkpoint, so it
+                    # is written last
+                    write_text(
+                        self.states_path(keys[start - 1]),
+                        json.dumps(fitted_states(transforms[:start])),
+                    )
+                    write_feather(self.path(keys[start - 1]), data)
+            return detach(data, source, report)
+
+    def __fingerprint__(self) -> None:
+        # where results are saved does not change them
+        return None
+
+    def __repr__(self) -> str:
+        return f"TransformCheckpoint(directory={self.directory})"
+
+
+__all__ = [
+    "fingerprint_frame",
+    "fitted_states",
+    "load_fitted_states",
+    "TransformCheckpoint",
+]
@@ -0,0 +1,213 @@
+import threading
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logging import logging
+
+log = logging.getLogger(__name__)
+
+# How a transform treats the frame it is given, see `run_transforms`:
+# "inplace" may add or overwrite its columns, "view" never writes to it
+# (but may return frames sharing its values), and "copy" writes through
+# to values other frames may share, so it needs a private deep copy.
+CopyMode = Literal["inplace", "view", "copy"]
+
+
+def copy_mode(transform: Any) -> CopyMode:
+    """The `copy_mode` of `transform`, "inplace" for plain functions."""
+    return getattr(transform, "copy_mode", "inplace")
+
+
+def column_buffers(data: pd.DataFrame) -> list[np.ndarray | None]:
+    """The array holding the values of each column, None if unknown."""
+    buffers: list[np.ndarray | None] = []
+    for i in range(data.shape[1]):
+        values = data.iloc[:, i]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            buffers.append(values.cat.codes.to_numpy())
+        elif isinstance(values.dtype, np.dtype):
+            buffers.append(values.to_numpy())
+        else:
+            buffers.append(None)
+    return buffers
+
+
+def shares_memory(buffer: np.ndarray | None, others: Sequence[Any]) -> bool:
+    return buffer is not None and any(
+        other is not None and np.may_share_memory(buffer, other)
+        for other in others
+    )
+
+
+def copied_nbytes(before: pd.DataFrame, after: pd.DataFrame) -> int:
+    """Bytes of the columns of `after`, also in `before`, that no longer
+    share memory with it: copied, or rewritten, by a transform."""
+    if not isinstance(after, pd.DataFrame):
+        return 0
+    names = set(before.columns)
+    previous = column_buffers(before)
+    return sum(
+        buffer.nbytes
+        for name, buffer in zip(after.columns, column_buffers(after))
+        if name in names
+        and buffer is not None
+        and not shares_memory(buffer, previous)
+    )
+
+
+@dataclass
+class CopyReport:
+    """Bytes copied by (or for) each transform of a pipeline."""
+
+    nbytes: dict[str, int] = field(default_factory=dict)
+
+    def add(self, name: str, nbytes: int) -> None:
+        self.nbytes[name] = self.nbytes.get(name, 0) + nbytes
+
+    @property
+    def total(self) -> int:
+        return sum(self.nbytes.values())
+
+    def log(self, name: str = "pipeline") -> None:
+        log.info(
+            "%s copied %.1f MiB: %s",
+            name,
+            self.total / 2**20,
+            {
+                transform: f"{nbytes / 2**20:.1f} MiB"
+                for transform, nbytes in self.nbytes.items()
+                if nbytes > 0
+            },
+        )
+
+
+def detach(
+    data: Any, source: pd.DataFrame | None, report: CopyReport | None = None
+) -> Any:
+    """Copy the columns of `data` that share memory with `source`.
+
+    Frames leaving copy-on-write mode no longer copy before writing, so a
+    result must not share values with the frame the caller passed in.
+    """
+    if not isinstance(data, pd.DataFrame) or source is None:
+        return data
+    if data is source:
+        return data.copy()
+    sources = column_buffers(source)
+    shared = [
+        i
+        for i, buffer in enumerate(column_buffers(data))
+        if shares_memory(buffer, sources)
+    ]
+    if not shared:
+        return data
+    data = data.copy(deep=False)
+    nbytes = 0
+    for i in shared:
+        column = data.iloc[:, i].copy()
+        nbytes += column.memory_usage(index=False)
+        data.isetitem(i, column)
+    if report is not None:
+        report.add("detach", nbytes)
+    return data
+
+
+# `mode.copy_on_write` is global to the process, while pipelines run on
+# several threads at once (e.g. prefetched experiences): the mode is only
+# reset once the last of them leaves `copy_on_write`.
+_cow_lock = threading.Lock()
+_cow_users = 0
+_cow_previous: Any = None
+
+
+@contextmanager
+def copy_on_write() -> Iterator[None]:
+    """Context in which pandas copies shared values only when written.
+
+    Safe to enter from several threads at once: copy-on-write stays
+    enabled until every thread left the context, then the previous mode is
+    restored.
+    """
+    global _cow_users, _cow_previous
+    with _cow_lock:
+        if _cow_users == 0:
+            _cow_previous = pd.get_option("mode.copy_on_write")
+            pd.set_option("mode.copy_on_write", True)
+        _cow_users += 1
+    try:
+        yield
+    finally:
+        with _cow_lock:
+            _cow_users -= 1
+            if _cow_users == 0:
+                pd.set_option("mode.copy_on_write", _cow_previous)
+
+
+def apply_in_pipeline(
+    transforms: Sequence[Any],
+    data: Any,
+    source: Any,
+    report: CopyReport | None = None,
+) -> Any:
+    """Apply `transforms` to `data`, a frame of a pipeline run on `source`
+    in `copy_on_write` mode, leaving `source` itself unmodified (if not
+    None)."""
+    for transform in transforms:
+        mode = copy_mode(transform)
+        before = data
+        if mode == "copy" and isinstance(data, pd.DataFrame):
+            data = data.copy()
+            if report is not None:
+                report.add(str(transform), copied_nbytes(before, data))
+        elif mode == "inplace" and source is not None and data is source:
+            # costs nothing: values are only copied once written to
+            data = data.copy(deep=False)
+        result = transform(data)
+        if report is not None and mode != "copy":
+            report.add(str(transform), copied_nbytes(before, result))
+        data = result
+    return data
+
+
+def run_transforms(
+    data: Any,
+    transforms: Sequence[Any],
+    report: CopyReport | None = None,
+    owned: bool = False,
+) -> Any:
+    """Apply `transforms` to a frame under pandas copy-on-write.
+
+    Rather than every transform copying its input to be safe, values are
+    shared between the frames of the pipeline and only copied when one of
+    them is written to. A "copy" transform gets a deep copy of its input.
+    Unless the caller hands the frame over (`owned`), it is not modified:
+    an "inplace" transform given that very frame gets a shallow copy,
+    which costs nothing, and the result does not share values with it,
+    see `detach`. `report` collects the bytes each transform copied.
+    """
+    if not isinstance(data, pd.DataFrame):
+        for transform in transforms:
+            data = transform(data)
+        return data
+
+    source = None if owned else data
+    with copy_on_write():
+        result = apply_in_pipeline(transforms, data, source, report)
+        return detach(result, source, report)
+
+
+__all__ = [
+    "CopyMode",
+    "copy_mode",
+    "copied_nbytes",
+    "CopyReport",
+    "detach",
+    "copy_on_write",
+    "apply_in_pipeline",
+    "run_transforms",
+]
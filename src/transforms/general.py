@@ -1,5 +1,10 @@
-from typing import Callable, Literal
+import copy
+from abc import ABCMeta, abstractmethod
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Callable, Literal
 
+import numpy as np
 import numpy.typing as npt
 import pandas as pd
 
@@ -8,49 +13,227 @@ from src.transforms.base import (
     Transform,
     apply_transforms,
 )
-from src.utils.general import append_prev_feature, discretize_column
+from src.utils.general import (
+    Predicate,
+    append_prev_feature,
+    filter_mask,
+    group_history_ratios,
+)
 from src.utils.logging import logging
 
 from .base import BaseTransform
+from .binning import Bins, QuantileSketch
+from .lineage import Lineage
+from .scaling import RunningMoments
 
 log = logging.getLogger(__name__)
 
 
 class ColumnsDropTransform(BaseTransform):
-    def __init__(self, columns: list[str]):
+    row_local = True
+    copy_mode = "view"
+
+    def __init__(self, columns: list[str], reset_index: bool = True):
         self.columns = columns
+        self.reset_index = reset_index
 
     def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
         data = data.drop(columns=self.columns, errors="ignore")
-        data = data.reset_index(drop=True)
+        if self.reset_index:
+            data = data.reset_index(drop=True)
         return data
 
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        return Lineage(drops=frozenset(self.columns).intersection(columns))
+
     def __repr__(self) -> str:
+        if not self.reset_index:
+            return (
+                f"ColumnsDropTransform(columns={self.columns}, "
+                "reset_index=False)"
+            )
         return f"ColumnsDropTransform(columns={self.columns})"
 
 
+class SortValuesTransform(BaseTransform):
+    """Stable sort by `by`, skipped when the data is already in order.
+
+    Data ingested with `src.dataset.ingest` is already sorted by its time
+    column, so checking the order (one linear pass) saves the full sort.
+    """
+
+    copy_mode = "view"
+
+    def __init__(self, by: str | list[str], reset_index: bool = False):
+        if isinstance(by, str):
+            by = [by]
+        self.by = by
+        self.reset_index = reset_index
+
+    def is_sorted(self, data: pd.DataFrame) -> bool:
+        if len(self.by) == 1:
+            return data[self.by[0]].is_monotonic_increasing
+        index = pd.MultiIndex.from_frame(data[self.by])
+        return index.is_monotonic_increasing
+
+    def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
+        if not self.is_sorted(data):
+            data = data.sort_values(by=self.by, kind="stable")
+        if self.reset_index:
+            data = data.reset_index(drop=True)
+        return data
+
+    def row_filter(self, columns: Sequence[str]) -> list[Predicate]:
+        # a stable sort commutes with dropping rows
+        return []
+
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        return Lineage(reads=frozenset(self.by))
+
+    def __repr__(self) -> str:
+        return (
+            f"SortValuesTransform(by={self.by}, "
+            f"reset_index={self.reset_index})"
+        )
+
+
+class RowFilterTransform(BaseTransform):
+    """Keep the rows that satisfy all `predicates`, see `read_dataframe`.
+
+    As its `row_filter`, the predicates are applied while reading when this
+    transform leads the preprocess transforms.
+    """
+
+    row_local = True
+    copy_mode = "view"
+
+    def __init__(self, predicates: list[Predicate]):
+        self.predicates = predicates
+
+    def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
+        data = data[filter_mask(data, self.predicates)]
+        return data.reset_index(drop=True)
+
+    def row_filter(self, columns: Sequence[str]) -> list[Predicate]:
+        return list(self.predicates)
+
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        return Lineage(
+            reads=frozenset(column for column, _, _ in self.predicates)
+        )
+
+    def __repr__(self) -> str:
+        return f"RowFilterTransform(predicates={self.predicates})"
+
+
 class DiscretizeColumnTransform(BaseTransform):
+    """Bin `column` into `n_bins` bins of equal width over its range, or of
+    about equal counts with `strategy="quantile"`, or into fixed `bins`
+    (or the bins between fixed `edges`), which makes it row-local.
+
+    Labels are those of `pd.cut(..., labels=False)` (see `Bins`), as small
+    integers with `MISSING_BIN` for missing values. Fitted bins are
+    learned from the whole frame, or from all batches when streaming
+    (`requires_fit`, quantiles through a `QuantileSketch`), and kept in
+    `bins`, so that they can be saved and passed back as fixed bins to
+    label other data, or other batches of it, the same way. With
+    `fit_once`, they are learned from the first frame only after
+    `reset_state`, like `StandardScalerTransform`.
+    """
+
     def __init__(
         self,
         column: str,
         new_column: str | None = None,
         n_bins: int = 4,
         drop_original: bool = True,
+        edges: Sequence[float] | None = None,
+        strategy: Literal["uniform", "quantile"] = "uniform",
+        bins: Bins | None = None,
+        fit_once: bool = False,
     ):
         self.column = column
         self.n_bins = n_bins
         self.new_column = column if new_column is None else new_column
         self.drop_original = drop_original
+        self.strategy = strategy
+        self.fits_once = fit_once
+        if edges is not None:
+            bins = Bins(tuple(edges))
+        self._fixed = bins
+        self.bins = bins
+        self.row_local = bins is not None
+        self.requires_fit = bins is None
+        self._min = np.inf
+        self._max = -np.inf
+        self._sketch: QuantileSketch | None = None
+
+    def fit(self, data: pd.DataFrame) -> None:
+        """Learn the bins from the whole of `data`."""
+        values = data[self.column].to_numpy(np.float64, na_value=np.nan)
+        if self.strategy == "quantile":
+            self.bins = Bins.quantile(values, self.n_bins)
+        else:
+            self.bins = Bins.uniform(
+                np.nanmin(values), np.nanmax(values), self.n_bins
+            )
 
-    def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
-        column_data = data[self.column]
-        data[self.new_column] = discretize_column(column_data, self.n_bins)
+    def reset_state(self) -> None:
+        self.bins = self._fixed
+        self._min = np.inf
+        self._max = -np.inf
+        self._sketch = None
+
+    def partial_fit(self, data: pd.DataFrame) -> None:
+        values = data[self.column].to_numpy(np.float64, na_value=np.nan)
+        if self.strategy == "quantile":
+            if self._sketch is None:
+                self._sketch = QuantileSketch()
+            self._sketch.update(values)
+        elif not np.isnan(values).all():
+            self._min = min(self._min, np.nanmin(values))
+            self._max = max(self._max, np.nanmax(values))
+
+    def partial_transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        if self.bins is None:
+            if self._sketch is not None:
+                self.bins = self._sketch.bins(self.n_bins)
+            elif self._min <= self._max:
+                self.bins = Bins.uniform(self._min, self._max, self.n_bins)
+            else:
+                raise RuntimeError(f"{self} is not fitted")
+        data[self.new_column] = self.bins.labels(
+            data[self.column].to_numpy(np.float64, na_value=np.nan)
+        )
         if self.drop_original and self.new_column != self.column:
             data = data.drop(columns=[self.column], errors="ignore")
         return data
 
+    def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
+        if self._fixed is None and not (
+            self.fits_once and self.bins is not None
+        ):
+            self.fit(data)
+        return self.partial_transform(data)
+
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        drops: frozenset[str] = frozenset()
+        if self.drop_original and self.new_column != self.column:
+            drops = frozenset([self.column])
+        return Lineage(
+            reads=frozenset([self.column]),
+            writes=frozenset([self.new_column]),
+            drops=drops,
+        )
+
     def __repr__(self) -> str:
-        return f"DiscretizeColumnTransform(n_bins={self.n_bins})"
+        if self._fixed is not None:
+            edges = list(self._fixed.edges)
+            return f"DiscretizeColumnTransform(edges={edges})"
+        return (
+            f"DiscretizeColumnTransform(n_bins={self.n_bins}, "
+            f"strategy={self.strategy})"
+        )
 
 
 class EnumColumnTransform(BaseTransform):
@@ -62,18 +245,31 @@ class EnumColumnTransform(BaseTransform):
         data[self.new_column] = data[self.column].astype("category").cat.codes
         return data
 
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        return Lineage(
+            reads=frozenset([self.column]), writes=frozenset([self.new_column])
+        )
+
 
 class ApplyFnOnColumnTransform(BaseTransform):
+    """Set each of `columns` (or its `prefix`ed copy) to `fn` of it.
+
+    Pass `row_local=True` when `fn` is elementwise.
+    """
+
     def __init__(
         self,
         fn: Callable[[pd.Series | npt.ArrayLike], pd.Series],
         columns: list[str],
         prefix: str | None = None,
+        *,
+        row_local: bool = False,
         **kwargs,
     ):
         self.fn = fn
         self.columns = columns
         self.prefix = prefix
+        self.row_local = row_local
         self.kwargs = kwargs
 
     def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
@@ -85,11 +281,21 @@ class ApplyFnOnColumnTransform(BaseTransform):
             data[column_name] = self.fn(column_data, **self.kwargs)
         return data
 
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        writes = self.columns
+        if self.prefix is not None:
+            writes = [f"{self.prefix}_{column}" for column in self.columns]
+        return Lineage(reads=frozenset(self.columns), writes=frozenset(writes))
+
     def __repr__(self) -> str:
         return "ApplyFnOnColumnTransform()"
 
 
 class AppendPrevFeatureTransform(BaseTransform):
+    """Adds the values of `columns` in the `n_historical` previous rows as
+    columns. `WindowedDataset` serves such lags without materializing
+    them, for all features, see `Config.window`."""
+
     def __init__(self, columns: list[str], n_historical: int = 4):
         self.n_historical = n_historical
         self.columns = columns
@@ -101,11 +307,253 @@ class AppendPrevFeatureTransform(BaseTransform):
         data = data.reset_index(drop=True)
         return data
 
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        # `dropna` reads every column
+        return Lineage(
+            reads=frozenset(columns),
+            writes=frozenset(
+                f"prev_{column}_{i}"
+                for column in self.columns
+                for i in range(1, self.n_historical + 1)
+            ),
+        )
+
     def __repr__(self) -> str:
         return f"AppendPrevFeatureTransform(n_historical={self.n_historical})"
 
 
+class HistoryEvent(metaclass=ABCMeta):
+    """Binary per-row event tracked by `GroupHistoryTransform`."""
+
+    # suffixes of the features for rows where the event did / did not occur
+    positive: str
+    negative: str
+    # columns the event is computed from, None if unknown
+    reads: list[str] | None = None
+
+    @abstractmethod
+    def __call__(self, data: pd.DataFrame) -> npt.ArrayLike:
+        """Boolean array, true where the event occurred."""
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+class GroupHistoryTransform(BaseTransform):
+    """Expanding per-group history ratios of several events at once.
+
+    For every event and then every group column, adds the columns
+    `{column}_history_{event.positive}` and
+    `{column}_history_{event.negative}`: the share of earlier rows of the
+    same group in which the event did / did not occur. Counts are grouped
+    cumulative sums shifted by one row, so no row is visited in Python.
+    When streaming, the per-group counts are carried between batches.
+    """
+
+    def __init__(self, events: list[HistoryEvent], columns: list[str]):
+        self.events = events
+        self.columns = columns
+        self._counts: dict[str, pd.DataFrame] = {}
+
+    def reset_state(self) -> None:
+        self._counts = {}
+
+    def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
+        return self._apply(data, {})
+
+    def partial_transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        return self._apply(data, self._counts)
+
+    def _apply(
+        self, data: pd.DataFrame, counts: dict[str, pd.DataFrame]
+    ) -> pd.DataFrame:
+        occurred = [
+            np.asarray(event(data), dtype=bool) for event in self.events
+        ]
+        ratios = {}
+        for column in self.columns:
+            ratios[column], counts[column] = group_history_ratios(
+                data[column], occurred, counts.get(column)
+            )
+        for i, event in enumerate(self.events):
+            for column in self.columns:
+                positive, negative = ratios[column][i]
+                data[f"{column}_history_{event.positive}"] = positive
+                data[f"{column}_history_{event.negative}"] = negative
+        return data
+
+    def lineage(self, columns: Sequence[str]) -> Lineage | None:
+        reads = set(self.columns)
+        for event in self.events:
+            if event.reads is None:
+                return None
+            reads.update(event.reads)
+        return Lineage(
+            reads=frozenset(reads),
+            writes=frozenset(
+                f"{column}_history_{suffix}"
+                for event in self.events
+                for column in self.columns
+                for suffix in (event.positive, event.negative)
+            ),
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"GroupHistoryTransform(events={self.events}, "
+            f"columns={self.columns})"
+        )
+
+
+class StandardScalerTransform(BaseTransform):
+    """Standardize every column except `exclude` (and categoricals, see
+    `CategoricalColumnsTransform`) to zero mean, unit variance.
+
+    The mean and variance are gathered in one pass over row batches of
+    `batch_size` (see `RunningMoments`), and the columns are then scaled
+    one at a time in float32, so no float64 copy of the frame is made.
+    When streaming, they are fitted over all batches (`requires_fit`)
+    before any batch is scaled.
+
+    With `fit_once`, the scaler is only fitted on the first frame it
+    transforms after `reset_state`, e.g. the first experience as a chunk
+    transform, and later frames are scaled with those statistics. With
+    `path`, the statistics are saved there after each fit (or, for the
+    copies of a scaler fitted on each chunk, next to it with the chunk
+    index appended, see `for_chunk`), and `load`
+    recreates a scaler that scales with them without fitting. Neither the
+    path nor what was fitted identifies the scaler (see `fingerprint`),
+    the statistics are restored by caches through `load_fitted_state`.
+    """
+
+    requires_fit = True
+
+    def __init__(
+        self,
+        exclude: list[str] | None = None,
+        fit_once: bool = False,
+        path: str | Path | None = None,
+        batch_size: int = 65_536,
+    ):
+        self.exclude = exclude or []
+        self.fits_once = fit_once
+        self.path = path
+        self.batch_size = batch_size
+        self._moments: RunningMoments | None = None
+        # statistics `load`ed rather than fitted
+        self._loaded: RunningMoments | None = None
+
+    @classmethod
+    def load(
+        cls, path: str | Path, exclude: list[str] | None = None
+    ) -> "StandardScalerTransform":
+        """A scaler using the statistics saved to `path`, never refitted."""
+        scaler = cls(exclude, fit_once=True)
+        scaler._loaded = scaler._moments = RunningMoments.load(path)
+        scaler.requires_fit = False
+        return scaler
+
+    def columns(self, data: pd.DataFrame) -> list[str]:
+        return [
+            col
+            for col in data.columns
+            if col not in self.exclude
+            and not isinstance(data[col].dtype, pd.CategoricalDtype)
+        ]
+
+    def reset_state(self) -> None:
+        self._moments = self._loaded
+
+    def for_chunk(self, index: int) -> "StandardScalerTransform":
+        scaler = copy.deepcopy(self)
+        if self.path is not None and not self.fits_once:
+            # fitted on this chunk alone, e.g. scaler.json -> scaler-2.json
+            path = Path(self.path)
+            scaler.path = path.with_name(f"{path.stem}-{index}{path.suffix}")
+        return scaler
+
+    def fitted_state(self) -> dict[str, Any] | None:
+        if self._moments is None or self._moments is self._loaded:
+            return None
+        return self._moments.to_dict()
+
+    def load_fitted_state(self, state: dict[str, Any]) -> None:
+        self._moments = RunningMoments.from_dict(state)
+        self.save()
+
+    def partial_fit(self, data: pd.DataFrame) -> None:
+        columns = self.columns(data)
+        if self._moments is None:
+            self._moments = RunningMoments(columns)
+        self._moments.update(
+            data[columns].to_numpy(np.float64, na_value=np.nan)
+        )
+
+    def fit(self, data: pd.DataFrame) -> None:
+        """Fit the statistics on the whole of `data`, batch by batch."""
+        moments = RunningMoments(self.columns(data))
+        for start in range(0, len(data), self.batch_size):
+            batch = data.iloc[start : start + self.batch_size]
+            moments.update(
+                batch[moments.columns].to_numpy(np.float64, na_value=np.nan)
+            )
+        self._moments = moments
+        self.save()
+
+    def save(self) -> None:
+        """Save the fitted statistics to `path`, if set."""
+        if self.path is not None and self._moments is not None:
+            self._moments.save(self.path)
+
+    def partial_transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        if self._moments is None:
+            raise RuntimeError(f"{self} is not fitted")
+        moments = self._moments
+        columns = self.columns(data)
+        if columns != moments.columns:
+            raise ValueError(
+                f"{self} was fitted on {moments.columns}, not {columns}"
+            )
+        for column, mean, scale in zip(columns, moments.mean, moments.scale):
+            # float32 columns are scaled as such, others in float64 first
+            dtype = np.float32 if data[column].dtype == np.float32 else None
+            values = data[column].to_numpy(dtype or np.float64, na_value=np.nan)
+            values = (values - values.dtype.type(mean)) / scale
+            # replaces the column, without the chained assignment checks
+            data.isetitem(
+                data.columns.get_loc(column),
+                values.astype(np.float32, copy=False),
+            )
+        return data
+
+    def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
+        if not self.fits_once or self._moments is None:
+            self.fit(data)
+        return self.partial_transform(data)
+
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        scaled = frozenset(col for col in columns if col not in self.exclude)
+        return Lineage(reads=scaled, writes=scaled)
+
+    def __fingerprint__(self) -> dict[str, Any]:
+        return {
+            "exclude": self.exclude,
+            "fit_once": self.fits_once,
+            "batch_size": self.batch_size,
+            # statistics it scales with but never fits
+            "loaded": self._loaded and self._loaded.to_dict(),
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"StandardScalerTransform(exclude={self.exclude}, "
+            f"fit_once={self.fits_once})"
+        )
+
+
 class OneHotColumnTransform(BaseTransform):
+    copy_mode = "view"
+
     def __init__(
         self,
         column: str,
@@ -127,17 +575,22 @@ class OneHotColumnTransform(BaseTransform):
         data = data.reset_index(drop=True)
         return data
 
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        # the dummy columns are named after the values
+        return Lineage(reads=frozenset([self.column]))
+
     def __repr__(self) -> str:
         return f'OneHotColumnTransform(column="{self.column}")'
 
 
 class OneHotColumnsTransform(BaseTransform):
+    copy_mode = "view"
+
     def __init__(self, columns: list[str], drop_first: bool = True):
         self.columns = columns
         self.drop_first = drop_first
 
     def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
-        data = data.copy()
         for column in self.columns:
             transform = OneHotColumnTransform(
                 column, prefix=column, drop_first=self.drop_first
@@ -145,22 +598,64 @@ class OneHotColumnsTransform(BaseTransform):
             data = transform(data)
         return data
 
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        return Lineage(reads=frozenset(self.columns))
+
     def __repr__(self) -> str:
         return f"OneHotColumnsTransform(columns={self.columns})"
 
 
+class CategoricalColumnsTransform(BaseTransform):
+    """Keep `columns` as categoricals, the alternative to one-hot encoding
+    them for models that embed categorical inputs.
+
+    The features of a categorical are its codes, one column instead of one
+    per category, see `src.dataset.storage.fill_array`. Categories are
+    those of the whole frame, so all chunks of it share the same codes.
+    """
+
+    def __init__(self, columns: list[str]):
+        self.columns = columns
+
+    def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
+        for column in self.columns:
+            if not isinstance(data[column].dtype, pd.CategoricalDtype):
+                data[column] = data[column].astype("category")
+        return data
+
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        return Lineage(
+            reads=frozenset(self.columns), writes=frozenset(self.columns)
+        )
+
+    def __repr__(self) -> str:
+        return f"CategoricalColumnsTransform(columns={self.columns})"
+
+
 class PassThroughTransform(BaseTransform):
+    row_local = True
+    copy_mode = "view"
+
     def __init__(self):
         super().__init__()
 
     def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
         return data
 
+    def row_filter(self, columns: Sequence[str]) -> list[Predicate]:
+        return []
+
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        return Lineage()
+
     def __repr__(self) -> str:
         return "PassThroughTransform()"
 
 
 class PrintColumnsTransform(BaseTransform):
+    row_local = True
+    copy_mode = "view"
+
     def __init__(self, identifier: str = ""):
         super().__init__()
         self.identifier = identifier
@@ -172,6 +667,13 @@ class PrintColumnsTransform(BaseTransform):
             log.info("%s", list(data.columns))
         return data
 
+    def row_filter(self, columns: Sequence[str]) -> list[Predicate]:
+        return []
+
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        # only the column names, of whichever columns are left
+        return Lineage()
+
     def __repr__(self) -> str:
         return f'PrintColumnsTransform(identifier="{self.identifier}")'
 
@@ -188,6 +690,13 @@ class NamedInjectTransform(BaseTransform):
     def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
         return apply_transforms(data, self._transform_fn)
 
+    def lineage(self, columns: Sequence[str]) -> Lineage | None:
+        if self._transform_fn is None:
+            return Lineage()
+        if isinstance(self._transform_fn, BaseTransform):
+            return self._transform_fn.lineage(columns)
+        return None
+
     def __repr__(self) -> str:
         return f'NamedInjectTransform(identifier="{self.identifier}")'
 
@@ -197,7 +706,13 @@ def add_transform_to_feature_engineering(
     transform: Transform,
     pos: int | Literal["start", "end"] | str = 0,
     sections: list[Literal["preprocess", "chunk"]] = [],
+    reads: list[str] | None = None,
 ):
+    """Wrap `feature_engineering` with `transform` added to `sections`.
+
+    `reads` lists the raw columns `transform` reads, so that they are
+    loaded even if the wrapped feature engineering would skip them.
+    """
     if len(sections) == 0:
         raise ValueError("sections must be a non-empty list")
 
@@ -206,11 +721,24 @@ def add_transform_to_feature_engineering(
             self,
         ):
             super().__init__()
+            self.checkpoint = feature_engineering.checkpoint
+            self.executor = feature_engineering.executor
 
         @property
         def target_name(self) -> str:
             return feature_engineering.target_name
 
+        @property
+        def read_columns(self) -> set[str] | None:
+            read_columns = feature_engineering.read_columns
+            if read_columns is None:
+                return None
+            return read_columns | set(reads or [])
+
+        @property
+        def read_dtypes(self) -> dict[str, str] | None:
+            return feature_engineering.read_dtypes
+
         @property
         def preprocess_transform_set(self) -> list[Transform] | None:
             preprocess_set = feature_engineering.preprocess_transform_set
@@ -280,12 +808,18 @@ def add_transform_to_feature_engineering(
 
 __all__ = [
     "ColumnsDropTransform",
+    "SortValuesTransform",
+    "RowFilterTransform",
     "DiscretizeColumnTransform",
     "EnumColumnTransform",
     "AppendPrevFeatureTransform",
     "ApplyFnOnColumnTransform",
+    "HistoryEvent",
+    "GroupHistoryTransform",
+    "StandardScalerTransform",
     "OneHotColumnTransform",
     "OneHotColumnsTransform",
+    "CategoricalColumnsTransform",
     "add_transform_to_feature_engineering",
     "PassThroughTransform",
     "PrintColumnsTransform",
@@ -1,15 +1,30 @@
-from typing import Any
+from collections.abc import Sequence
+from typing import Literal
 
+import numpy as np
 import pandas as pd
-from sklearn.discriminant_analysis import StandardScaler
 
 from src.helpers.config import Config
+from src.helpers.definitions import ScalerFit
+from src.utils.general import Predicate
+from src.utils.sampling import FirstSampler
 
 from .base import BaseFeatureEngineering, BaseTransform, Transform
-from .general import ColumnsDropTransform
+from .binning import Bins
+from .general import (
+    ColumnsDropTransform,
+    GroupHistoryTransform,
+    HistoryEvent,
+    SortValuesTransform,
+    StandardScalerTransform,
+)
+from .lineage import Lineage
+from .sampling import SampleTransform, sampling_transform
 
 
 class CleanDataTransform(BaseTransform):
+    copy_mode = "view"
+
     def __init__(self, exclude: str | list[str] = []):
         if isinstance(exclude, str):
             exclude = [exclude]
@@ -17,16 +32,31 @@ class CleanDataTransform(BaseTransform):
 
     def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
         data = data.dropna(subset=["util_cpu", "cpu_95"])
-        data = data.sort_values(by=["start_time"])
+        data = SortValuesTransform("start_time")(data)
         data = data.drop(columns=self.excludes)
         data = data.reset_index(drop=True)
         return data
 
+    def row_filter(self, columns: Sequence[str]) -> list[Predicate]:
+        return [("util_cpu", "notna", None), ("cpu_95", "notna", None)]
+
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        return Lineage(
+            reads=frozenset(["util_cpu", "cpu_95", "start_time"]),
+            drops=frozenset(self.excludes).intersection(columns),
+        )
+
     def __repr__(self) -> str:
         return "CleanDataTransform()"
 
 
+# throttled (1) when using more than the requested CPU
+THROTTLE_BINS = Bins((-float("inf"), 1, float("inf")))
+
+
 class ClassifyThrottleTransform(BaseTransform):
+    row_local = True
+
     def __init__(
         self, exclude: str | list[str] = [], new_column: str = "bucket_util_cpu"
     ):
@@ -36,140 +66,100 @@ class ClassifyThrottleTransform(BaseTransform):
         self.target_name_new = new_column
 
     def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
-        print(len(data))
-        bin_edges = [
-            -float("inf"),
-            1,
-            float("inf"),
-        ]
-        data[self.target_name_new] = pd.cut(
-            data["util_cpu"], bins=bin_edges, labels=False
+        data[self.target_name_new] = THROTTLE_BINS.labels(
+            data["util_cpu"].to_numpy(np.float64, na_value=np.nan)
         )
         return data
 
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        return Lineage(
+            reads=frozenset(["util_cpu"]),
+            writes=frozenset([self.target_name_new]),
+        )
+
     def __repr__(self) -> str:
         return "ClassifyThrottleTransform()"
 
 
-class DurationHistoryTransform(BaseTransform):
+class ThrottleEvent(HistoryEvent):
+    """Job used more CPU than `threshold` (the throttle target is > 1)."""
+
+    positive = "throttle"
+    negative = "non_throttle"
+    reads = ["util_cpu"]
+
+    def __init__(self, threshold: float = 1):
+        self.threshold = threshold
+
+    def __call__(self, data: pd.DataFrame) -> pd.Series:
+        return data["util_cpu"] > self.threshold
+
+    def __repr__(self) -> str:
+        return f"ThrottleEvent(threshold={self.threshold})"
+
+
+class LongDurationEvent(HistoryEvent):
+    """Job ran for at least `dur_cutoff` (~6 minutes by default)."""
+
+    positive = "duration_long"
+    negative = "duration_short"
+    reads = ["start_time", "end_time"]
+
+    def __init__(self, dur_cutoff: int = 412000000):
+        self.dur_cutoff = dur_cutoff
+
+    def __call__(self, data: pd.DataFrame) -> pd.Series:
+        return (data["end_time"] - data["start_time"]) >= self.dur_cutoff
+
+    def __repr__(self) -> str:
+        return f"LongDurationEvent(dur_cutoff={self.dur_cutoff})"
+
+
+class DurationHistoryTransform(GroupHistoryTransform):
+    """colname = column to group the history on
+    This will map jobs with
+        duration >= ~6 minutes as 1, otherwise 0.
+    Used to add duration information to a
+        job indirectly through historical data.
+    """
+
     def __init__(
         self,
         exclude: str | list[str] = [],
         colname: str = "",
         dur_cutoff: int = 412000000,
     ):
+        super().__init__([LongDurationEvent(dur_cutoff)], [colname])
         if isinstance(exclude, str):
             exclude = [exclude]
         self.colname = colname
         self.dur_cutoff = dur_cutoff
         self.excludes = exclude
 
-    def __call__(
-        self,
-        data: pd.DataFrame,
-    ) -> pd.DataFrame:
-        """colname = column to group the history on
-        This function will map jobs with
-            duration >= ~6 minutes as 1, otherwise 0.
-        Used to add duration information to a
-            job indirectly through historical data.
-        """
-
-        long_duration_name = str(self.colname) + "_history_duration_long"
-        short_duration_name = str(self.colname) + "_history_duration_short"
-        data[long_duration_name] = 0
-        data[short_duration_name] = 0
-
-        histogram_map: dict[str, Any] = {}
-
-        for index, row in data.iterrows():
-            group_name = row[self.colname]
-            duration_classification = (
-                1
-                if (row["end_time"] - row["start_time"]) >= self.dur_cutoff
-                else 0
-            )
-
-            group_hist = histogram_map.get(group_name, {"long": 0, "short": 0})
-
-            total_rows = max(
-                group_hist["long"] + group_hist["short"],
-                1,
-            )
-
-            data.at[index, long_duration_name] = group_hist["long"] / total_rows
-            data.at[index, short_duration_name] = (
-                group_hist["short"] / total_rows
-            )
-
-            if duration_classification == 1:
-                group_hist["long"] += 1
-            else:
-                group_hist["short"] += 1
-
-            # Update the dictionary with the modified histogram
-            # for the collection_logical_name
-            histogram_map[group_name] = group_hist
-        return data
-
     def __repr__(self) -> str:
         return "DurationHistoryTransform()"
 
 
-class ThrottleHistoryTransform(BaseTransform):
+class ThrottleHistoryTransform(GroupHistoryTransform):
+    """
+    colname = column name to group on
+    Will make a history of throttled/non-throttled jobs based on colname
+    """
+
     def __init__(self, exclude: str | list[str] = [], colname: str = ""):
+        super().__init__([ThrottleEvent()], [colname])
         if isinstance(exclude, str):
             exclude = [exclude]
         self.excludes = exclude
         self.colname = colname
 
-    def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
-        """
-        colname = column name to group on
-        Will make a history of throttled/non-throttled jobs based on colname
-        """
-        throttle_name = str(self.colname) + "_history_throttle"
-        non_throttle_name = str(self.colname) + "_history_non_throttle"
-        print(len(data))
-
-        data[throttle_name] = 0
-        data[non_throttle_name] = 0
-
-        histogram_map: dict[str, Any] = {}
-
-        for index, row in data.iterrows():
-            collection_name = row[self.colname]
-            cpu_classification = 1 if row["util_cpu"] > 1 else 0
-
-            collection_hist = histogram_map.get(
-                collection_name, {"throttle": 0, "non_throttle": 0}
-            )
-
-            total_rows = max(
-                collection_hist["throttle"] + collection_hist["non_throttle"],
-                1,
-            )
-            data.at[index, throttle_name] = (
-                collection_hist["throttle"] / total_rows
-            )
-            data.at[index, non_throttle_name] = (
-                collection_hist["non_throttle"] / total_rows
-            )
-
-            if cpu_classification == 1:
-                collection_hist["throttle"] += 1
-            else:
-                collection_hist["non_throttle"] += 1
-
-            # Update the dictionary with the modified histogram
-            # for the collection_logical_name
-            histogram_map[collection_name] = collection_hist
-        return data
-
     def __repr__(self) -> str:
         return "ThrottleHistoryTransform()"
 
 
+HISTORY_COLUMNS = ["collection_logical_name_mapped", "constraint_mapped"]
+
+
 FEATURE_COLUMNS = [
     "sched_class",
     # "collection_max_per_machine",
@@ -217,15 +207,53 @@ ALL_FEATURE_COLUMNS = [
     "constraint_mapped",
 ]
 
+# rows of the trace used unless the config sets `sampling`
+N_ROWS = 200_000
+
+# strings are only mapped or dropped, and requests are scaled features
+DTYPES = {
+    "collection_logical_name": "category",
+    "constraint_str": "category",
+    "req_constraint": "category",
+    "req_cpu": "float32",
+    "req_mem": "float32",
+}
+
 # GOOGLE_BASE_TRANSFORMS = [
 #     lambda data: data.sort_values(by=["start_time"]),
 #     lambda data: data.head(200000),
 # ]
 
 
+def scaler_transform(config: Config, target: str) -> StandardScalerTransform:
+    """Scaler of every feature, fitted on the data `config.scaler_fit`
+    says and saved to `config.scaler_path`, or per experience next to it
+    (see `StandardScalerTransform.for_chunk`)."""
+    return StandardScalerTransform(
+        exclude=[target],
+        fit_once=config.scaler_fit == ScalerFit.FIRST,
+        path=config.scaler_path,
+    )
+
+
+def scaling_transform_set(
+    config: Config,
+    scaler: StandardScalerTransform,
+    section: Literal["preprocess", "chunk"],
+) -> list[Transform]:
+    """`scaler`, then filling missing values, as preprocess transforms when
+    fitted on all data, otherwise as chunk transforms of each experience.
+    Empty for the other `section`."""
+    in_chunks = config.scaler_fit != ScalerFit.ALL
+    if in_chunks != (section == "chunk"):
+        return []
+    return [scaler, lambda data: data.fillna(-1)]
+
+
 class FeatureEngineering_Baseline(BaseFeatureEngineering):
     def __init__(self, config: Config) -> None:
         super().__init__()
+        self._config = config
         self._target_name = f"bucket_{config.dataset.target}"
         self._non_feature_columns = [
             feature
@@ -236,8 +264,10 @@ class FeatureEngineering_Baseline(BaseFeatureEngineering):
     @property
     def preprocess_transform_set(self) -> list[Transform] | None:
         return [
-            lambda data: data.sort_values(by=["start_time"]),
-            lambda data: data.head(200000),
+            sampling_transform(
+                self._config,
+                SampleTransform(FirstSampler("start_time", N_ROWS)),
+            ),
             CleanDataTransform(),
             ClassifyThrottleTransform(new_column=self._target_name),
             ColumnsDropTransform(columns=self._non_feature_columns),
@@ -248,97 +278,119 @@ class FeatureEngineering_Baseline(BaseFeatureEngineering):
     def target_name(self) -> str:
         return self._target_name
 
+    @property
+    def read_columns(self) -> set[str]:
+        return {"start_time", "util_cpu", "cpu_95"}
+
+    @property
+    def read_dtypes(self) -> dict[str, str]:
+        return DTYPES
+
 
 class FeatureEngineering_A(BaseFeatureEngineering):
     def __init__(self, config: Config) -> None:
         super().__init__()
+        self._config = config
         self._target_name = f"bucket_{config.dataset.target}"
         self._non_feature_columns = [
             feature
             for feature in ALL_FEATURE_COLUMNS
             if feature not in FEATURE_COLUMNS
         ]
+        # one instance, so that fitting it once holds for every chunk
+        self._scaler = scaler_transform(config, self._target_name)
 
     @property
     def preprocess_transform_set(self) -> list[Transform] | None:
-        def scaler_transform(data: pd.DataFrame) -> pd.DataFrame:
-            scaler = StandardScaler()
-            # Select the columns to be scaled (excluding "bucket_util_cpu")
-            columns_to_scale = [
-                col for col in data.columns if col != self._target_name
-            ]
-
-            # Scale the selected columns
-            data[columns_to_scale] = scaler.fit_transform(
-                data[columns_to_scale]
-            )
-            return data
-
         return [
-            lambda data: data.sort_values(by=["start_time"]),
-            lambda data: data.head(200000),
+            sampling_transform(
+                self._config,
+                SampleTransform(FirstSampler("start_time", N_ROWS)),
+            ),
             CleanDataTransform(),
             ClassifyThrottleTransform(new_column=self._target_name),
-            ThrottleHistoryTransform(colname="collection_logical_name_mapped"),
-            ThrottleHistoryTransform(colname="constraint_mapped"),
+            GroupHistoryTransform([ThrottleEvent()], HISTORY_COLUMNS),
             ColumnsDropTransform(columns=self._non_feature_columns),
-            scaler_transform,
-            lambda data: data.fillna(-1),
+            *scaling_transform_set(self._config, self._scaler, "preprocess"),
         ]
 
+    @property
+    def chunk_transform_set(self) -> list[Transform] | None:
+        return (
+            scaling_transform_set(self._config, self._scaler, "chunk") or None
+        )
+
     @property
     def target_name(self) -> str:
         return self._target_name
 
+    @property
+    def read_columns(self) -> set[str]:
+        return {"start_time", "util_cpu", "cpu_95"}
+
+    @property
+    def read_dtypes(self) -> dict[str, str]:
+        return DTYPES
+
 
 class FeatureEngineering_B(BaseFeatureEngineering):
     def __init__(self, config: Config) -> None:
         super().__init__()
+        self._config = config
         self._target_name = f"bucket_{config.dataset.target}"
         self._non_feature_columns = [
             feature
             for feature in ALL_FEATURE_COLUMNS
             if feature not in FEATURE_COLUMNS
         ]
+        # one instance, so that fitting it once holds for every chunk
+        self._scaler = scaler_transform(config, self._target_name)
 
     @property
     def preprocess_transform_set(self) -> list[Transform] | None:
-        def scaler_transform(data: pd.DataFrame) -> pd.DataFrame:
-            scaler = StandardScaler()
-            # Select the columns to be scaled (excluding "bucket_util_cpu")
-            columns_to_scale = [
-                col for col in data.columns if col != self._target_name
-            ]
-
-            # Scale the selected columns
-            data[columns_to_scale] = scaler.fit_transform(
-                data[columns_to_scale]
-            )
-            return data
         return [
-            lambda data: data.sort_values(by=["start_time"]),
-            lambda data: data.head(200000),
+            sampling_transform(
+                self._config,
+                SampleTransform(FirstSampler("start_time", N_ROWS)),
+            ),
             CleanDataTransform(),
             ClassifyThrottleTransform(new_column=self._target_name),
-            ThrottleHistoryTransform(colname="collection_logical_name_mapped"),
-            ThrottleHistoryTransform(colname="constraint_mapped"),
-            DurationHistoryTransform(colname="collection_logical_name_mapped"),
-            DurationHistoryTransform(colname="constraint_mapped"),
+            # A's transforms followed by the duration history, so that its
+            # pipeline is A's with extra steps
+            GroupHistoryTransform([ThrottleEvent()], HISTORY_COLUMNS),
+            GroupHistoryTransform([LongDurationEvent()], HISTORY_COLUMNS),
             ColumnsDropTransform(columns=self._non_feature_columns),
-            scaler_transform,
-            lambda data: data.fillna(-1),
+            *scaling_transform_set(self._config, self._scaler, "preprocess"),
         ]
 
+    @property
+    def chunk_transform_set(self) -> list[Transform] | None:
+        return (
+            scaling_transform_set(self._config, self._scaler, "chunk") or None
+        )
+
     @property
     def target_name(self) -> str:
         return self._target_name
 
+    @property
+    def read_columns(self) -> set[str]:
+        return {"start_time", "end_time", "util_cpu", "cpu_95"}
+
+    @property
+    def read_dtypes(self) -> dict[str, str]:
+        return DTYPES
+
 
 __all__ = [
     "ClassifyThrottleTransform",
     "CleanDataTransform",
     "DurationHistoryTransform",
     "ThrottleHistoryTransform",
+    "ThrottleEvent",
+    "LongDurationEvent",
+    "scaler_transform",
+    "scaling_transform_set",
     "FeatureEngineering_Baseline",
     "FeatureEngineering_A",
     "FeatureEngineering_B",
@@ -0,0 +1,115 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from src.utils.logging import logging
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Lineage:
+    """Columns of its input a transform reads and drops, and those it
+    writes (adds or overwrites).
+
+    Reads include columns whose values decide which rows are kept (e.g.
+    by `dropna`). Added columns whose names depend on the data, like
+    one-hot encodings, may be left out of `writes`.
+    """
+
+    reads: frozenset[str] = frozenset()
+    writes: frozenset[str] = frozenset()
+    drops: frozenset[str] = frozenset()
+
+
+def column_lineage(transform: Any, columns: Sequence[str]) -> Lineage:
+    """The `lineage` of `transform` on input `columns`.
+
+    A transform that does not declare one (e.g. a plain function) is taken
+    to read every column, writing and dropping none that are known.
+    """
+    lineage = getattr(transform, "lineage", None)
+    result = lineage(columns) if callable(lineage) else None
+    if result is None:
+        return Lineage(reads=frozenset(columns))
+    return result
+
+
+def _trace(
+    transforms: Sequence[Any], columns: Sequence[str]
+) -> tuple[list[tuple[list[str], Lineage]], list[str]]:
+    """The input columns and lineage of each transform, and the output
+    columns, as far as the lineages tell."""
+    trace: list[tuple[list[str], Lineage]] = []
+    current = list(columns)
+    for transform in transforms:
+        lineage = column_lineage(transform, current)
+        trace.append((current, lineage))
+        current = [
+            column for column in current if column not in lineage.drops
+        ] + sorted(lineage.writes.difference(current))
+    return trace, current
+
+
+def _dead_columns(
+    trace: list[tuple[list[str], Lineage]], output: list[str]
+) -> list[list[str]]:
+    needed = set(output)
+    dead: list[list[str]] = []
+    for before, lineage in reversed(trace):
+        needed = needed | lineage.reads | lineage.writes
+        needed.intersection_update(before)
+        dead.append([column for column in before if column not in needed])
+    return dead[::-1]
+
+
+def dead_columns(
+    transforms: Sequence[Any], columns: Sequence[str]
+) -> list[list[str]]:
+    """For each transform, the columns of its input that neither it nor any
+    transform after it needs.
+
+    A column is needed by a transform that reads or writes it (writing it
+    in its original position), and by the output if nothing drops it.
+    """
+    return _dead_columns(*_trace(transforms, columns))
+
+
+def drop_dead_columns(
+    transforms: Sequence[Any], columns: Sequence[str]
+) -> list[Any]:
+    """`transforms` on input `columns`, dropping each column that is dropped
+    eventually right after the last transform that needs it.
+
+    Every frame in between is narrower, so later sorts, copies and
+    concatenations move less data. See `dead_columns`.
+    """
+    from .general import ColumnsDropTransform
+
+    trace, output = _trace(transforms, columns)
+    planned: list[Any] = []
+    dropped: set[str] = set()
+    for transform, (_, lineage), dead in zip(
+        transforms, trace, _dead_columns(trace, output)
+    ):
+        # columns the transform drops itself are left to it
+        drop = [
+            column
+            for column in dead
+            if column not in dropped and column not in lineage.drops
+        ]
+        if drop:
+            log.debug("Dropping %s before %s", drop, transform)
+            planned.append(ColumnsDropTransform(drop, reset_index=False))
+        planned.append(transform)
+        dropped.update(dead)
+        dropped.difference_update(lineage.writes)
+    return planned
+
+
+__all__ = [
+    "Lineage",
+    "column_lineage",
+    "dead_columns",
+    "drop_dead_columns",
+]
@@ -0,0 +1,247 @@
+import os
+import pickle
+from collections import deque
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from src.utils.general import (
+    Predicate,
+    categorize,
+    iter_dataframe_batches,
+    read_dataframe,
+)
+from src.utils.logging import logging
+
+from .base import BaseTransform
+from .copies import CopyReport, apply_in_pipeline, copy_on_write, detach
+
+log = logging.getLogger(__name__)
+
+
+def is_row_local(transform: Any) -> bool:
+    return isinstance(transform, BaseTransform) and transform.row_local
+
+
+def segment_transforms(transforms: Sequence[Any]) -> list[list[Any]]:
+    """Split `transforms` into maximal runs of row-local transforms and
+    the barrier transforms between them, each in a run of its own."""
+    segments: list[list[Any]] = []
+    for transform in transforms:
+        if (
+            segments
+            and is_row_local(transform)
+            and is_row_local(segments[-1][-1])
+        ):
+            segments[-1].append(transform)
+        else:
+            segments.append([transform])
+    return segments
+
+
+def apply_segment(transforms: Sequence[Any], data: pd.DataFrame) -> Any:
+    for transform in transforms:
+        data = transform(data)
+    return data
+
+
+def concat_batches(batches: list[pd.DataFrame], renumber: bool) -> pd.DataFrame:
+    """Concatenate transformed batches into the frame that transforming
+    them at once gives.
+
+    Each batch keeps the index labels of its input rows unless a
+    transform renumbered them from 0. With `renumber`, the input labels
+    were increasing, so any other order means the batches were
+    renumbered, and the whole frame would have been too.
+    """
+    data = pd.concat(batches)
+    if renumber and not (
+        data.index.is_monotonic_increasing and data.index.is_unique
+    ):
+        data = data.reset_index(drop=True)
+    return data
+
+
+def number_batches(
+    batches: Iterable[pd.DataFrame],
+) -> Iterator[pd.DataFrame]:
+    """Label the rows of consecutive batches as the rows of one frame."""
+    start = 0
+    for batch in batches:
+        batch.index = pd.RangeIndex(start, start + len(batch))
+        start += len(batch)
+        yield batch
+
+
+class ParallelExecutor:
+    """Runs the row-local transforms of a pipeline on a process pool.
+
+    A pipeline is cut into maximal segments of row-local transforms and
+    the barrier transforms between them (sorts, group cumulatives,
+    scalers, functions, anything not `row_local`). The input of a segment
+    is split into batches of `batch_rows` rows that `workers` processes
+    transform independently, with at most `max_pending` batches in flight
+    to bound memory. Barriers run on the whole frame in this process, and
+    so do segments that cannot be sent to other processes (e.g. that hold
+    lambdas), or of input that fits a single batch.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        batch_rows: int = 1 << 16,
+        max_pending: int | None = None,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_rows = batch_rows
+        self.max_pending = max_pending or 2 * self.workers
+
+    def map(
+        self,
+        transforms: Sequence[Any],
+        batches: Iterable[pd.DataFrame],
+        pool: ProcessPoolExecutor | None = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Apply row-local `transforms` to each batch, in order.
+
+        Without `pool`, the batches are transformed in this process.
+        """
+        if pool is None:
+            for batch in batches:
+                yield apply_segment(transforms, batch)
+            return
+        pending: deque[Future] = deque()
+        for batch in batches:
+            if len(pending) >= self.max_pending:
+                yield pending.popleft().result()
+            pending.append(pool.submit(apply_segment, transforms, batch))
+        while pending:
+            yield pending.popleft().result()
+
+    def picklable(self, transforms: Sequence[Any]) -> bool:
+        try:
+            pickle.dumps(list(transforms))
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            log.warning("Running %s in process: %s", transforms, e)
+            return False
+        return True
+
+    def _apply_segment(
+        self,
+        data: pd.DataFrame,
+        segment: list[Any],
+        pool: ProcessPoolExecutor,
+        source: pd.DataFrame | None,
+        report: CopyReport | None,
+    ) -> Any:
+        if (
+            not is_row_local(segment[0])
+            or len(data) <= self.batch_rows
+            # see `concat_batches`
+            or not data.index.is_monotonic_increasing
+            or not data.index.is_unique
+            or not self.picklable(segment)
+        ):
+            return apply_in_pipeline(segment, data, source, report)
+        batches = (
+            data.iloc[start : start + self.batch_rows]
+            for start in range(0, len(data), self.batch_rows)
+        )
+        return concat_batches(list(self.map(segment, batches, pool)), True)
+
+    def run(
+        self,
+        data: pd.DataFrame,
+        transforms: Sequence[Any],
+        source: pd.DataFrame | None,
+        report: CopyReport | None = None,
+    ) -> Any:
+        """`apply_in_pipeline`, with row-local segments in parallel."""
+        segments = segment_transforms(transforms)
+        if self.workers <= 1 or not any(
+            is_row_local(segment[0]) for segment in segments
+        ):
+            return apply_in_pipeline(transforms, data, source, report)
+        with ProcessPoolExecutor(self.workers) as pool:
+            for segment in segments:
+                data = self._apply_segment(data, segment, pool, source, report)
+        return data
+
+    def apply(
+        self,
+        data: pd.DataFrame,
+        transforms: Sequence[Any],
+        report: CopyReport | None = None,
+        owned: bool = False,
+    ) -> Any:
+        """Apply `transforms` to `data`, like `run_transforms`."""
+        source = None if owned else data
+        with copy_on_write():
+            data = self.run(data, transforms, source, report)
+            return detach(data, source, report)
+
+    def apply_file(
+        self,
+        file: str | Path,
+        transforms: Sequence[Any],
+        columns: list[str] | None = None,
+        filters: Sequence[Predicate] | None = None,
+        dtypes: Mapping[str, str] | None = None,
+    ) -> Any:
+        """Read `file` and apply `transforms` to it, see `read_dataframe`.
+
+        A leading row-local segment is applied to the batches of the file
+        as they are read, so the raw file is never in memory as a whole.
+        """
+        segments = segment_transforms(transforms)
+        if not segments or not is_row_local(segments[0][0]):
+            data = read_dataframe(file, columns, filters, dtypes=dtypes)
+            # nothing else holds the frame read, no need to detach from it
+            return self.apply(data, transforms, owned=True)
+
+        leading = segments[0]
+        batches = number_batches(
+            iter_dataframe_batches(
+                file, self.batch_rows, columns, filters, dtypes
+            )
+        )
+        if self.workers > 1 and self.picklable(leading):
+            with ProcessPoolExecutor(self.workers) as pool:
+                outputs = list(self.map(leading, batches, pool))
+        else:
+            outputs = list(self.map(leading, batches))
+        log.info(
+            "Streamed %s through %d row-local transforms in %d batches",
+            file,
+            len(leading),
+            len(outputs),
+        )
+        if not outputs:
+            data = read_dataframe(file, columns, filters, dtypes=dtypes)
+            return self.apply(data, transforms, owned=True)
+        # batches of categoricals may each have their own categories
+        data = categorize(concat_batches(outputs, renumber=True), dtypes)
+        return self.apply(data, transforms[len(leading) :], owned=True)
+
+    def __fingerprint__(self) -> None:
+        # how transforms are run does not change their result
+        return None
+
+    def __repr__(self) -> str:
+        return (
+            f"ParallelExecutor(workers={self.workers}, "
+            f"batch_rows={self.batch_rows})"
+        )
+
+
+__all__ = [
+    "is_row_local",
+    "segment_transforms",
+    "apply_segment",
+    "concat_batches",
+    "number_batches",
+    "ParallelExecutor",
+]
@@ -0,0 +1,82 @@
+from collections.abc import Sequence
+
+import pandas as pd
+
+from src.helpers.config import Config
+from src.helpers.definitions import SamplingMethod
+from src.utils.general import Predicate
+from src.utils.sampling import (
+    FirstSampler,
+    Sampler,
+    StratifiedSampler,
+    UniformSampler,
+)
+
+from .base import BaseTransform
+from .general import PassThroughTransform, RowFilterTransform
+from .lineage import Lineage
+
+
+class SampleTransform(BaseTransform):
+    """Keep the rows that `sampler` selects, see `src.utils.sampling`.
+
+    When only row-local filters come before it, the sampler runs while the
+    file is read instead, see `BaseFeatureEngineering.input_sampler`.
+    """
+
+    copy_mode = "view"
+
+    def __init__(self, sampler: Sampler):
+        self.sampler = sampler
+
+    def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
+        return self.sampler.sample(data)
+
+    def lineage(self, columns: Sequence[str]) -> Lineage:
+        return Lineage(reads=frozenset(self.sampler.columns))
+
+    def __repr__(self) -> str:
+        return f"SampleTransform(sampler={self.sampler})"
+
+
+def sampling_transform(config: Config, default: BaseTransform) -> BaseTransform:
+    """The sampling stage set by `config.sampling`, else `default`.
+
+    "first" and "range" select by `column`, the time column by default,
+    and "stratified" by the bins of `column` between `edges`, the target
+    by default.
+    """
+    sampling = config.sampling
+    if sampling is None:
+        return default
+    method = sampling.method
+    if method == SamplingMethod.ALL:
+        return PassThroughTransform()
+    if method == SamplingMethod.RANGE:
+        column = sampling.column or config.dataset.time_column
+        predicates: list[Predicate] = []
+        if sampling.start is not None:
+            predicates.append((column, ">=", sampling.start))
+        if sampling.end is not None:
+            predicates.append((column, "<", sampling.end))
+        return RowFilterTransform(predicates)
+    if sampling.n is None:
+        raise ValueError(f"Sampling method {method} requires `n`")
+    if method == SamplingMethod.FIRST:
+        column = sampling.column or config.dataset.time_column
+        return SampleTransform(FirstSampler(column, sampling.n))
+    if method == SamplingMethod.UNIFORM:
+        return SampleTransform(UniformSampler(sampling.n, sampling.seed))
+    if method == SamplingMethod.STRATIFIED:
+        return SampleTransform(
+            StratifiedSampler(
+                sampling.column or config.dataset.target,
+                sampling.n,
+                sampling.edges,
+                sampling.seed,
+            )
+        )
+    raise ValueError(f"Unknown sampling method: {method}")
+
+
+__all__ = ["SampleTransform", "sampling_transform"]
@@ -0,0 +1,99 @@
+import json
+import os
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+
+class RunningMoments:
+    """Count, mean and variance of `columns`, updated one row batch at a
+    time in a single pass.
+
+    Batches are merged into the running statistics as in Welford's
+    algorithm (generalized to batches by Chan et al.), which, unlike
+    accumulating sums of squares, stays accurate for large means. Missing
+    values are ignored, as by `sklearn.preprocessing.StandardScaler`.
+    """
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        self.count = np.zeros(len(self.columns))
+        self.mean = np.zeros(len(self.columns))
+        self.m2 = np.zeros(len(self.columns))
+
+    def update(self, values: Any) -> None:
+        """Add a batch of rows of the `columns`, in that order."""
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0)
+        batch_mean = np.where(valid, values, 0).sum(axis=0) / np.maximum(
+            count, 1
+        )
+        batch_m2 = (np.where(valid, values - batch_mean, 0) ** 2).sum(axis=0)
+        total = self.count + count
+        weight = np.divide(
+            count, total, out=np.zeros_like(total), where=total > 0
+        )
+        delta = batch_mean - self.mean
+        self.mean += delta * weight
+        self.m2 += batch_m2 + delta**2 * self.count * weight
+        self.count = total
+
+    @property
+    def var(self) -> np.ndarray:
+        return np.divide(
+            self.m2,
+            self.count,
+            out=np.zeros_like(self.m2),
+            where=self.count > 0,
+        )
+
+    @property
+    def scale(self) -> np.ndarray:
+        """Standard deviations, 1 for constant columns."""
+        scale = np.sqrt(self.var)
+        scale[scale == 0] = 1
+        return scale
+
+    def to_dict(self) -> dict[str, dict[str, float]]:
+        return {
+            column: {"count": count, "mean": mean, "var": var}
+            for column, count, mean, var in zip(
+                self.columns,
+                self.count.tolist(),
+                self.mean.tolist(),
+                self.var.tolist(),
+            )
+        }
+
+    @classmethod
+    def from_dict(
+        cls, statistics: dict[str, dict[str, float]]
+    ) -> "RunningMoments":
+        moments = cls(list(statistics))
+        for i, column in enumerate(moments.columns):
+            moments.count[i] = statistics[column]["count"]
+            moments.mean[i] = statistics[column]["mean"]
+            moments.m2[i] = statistics[column]["var"] * moments.count[i]
+        return moments
+
+    def save(self, path: str | Path) -> None:
+        """Write the statistics to `path` as JSON, replacing it at once so
+        that readers never see a partial file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}")
+        tmp_path.write_text(json.dumps(self.to_dict(), indent=2))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "RunningMoments":
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+    def __repr__(self) -> str:
+        return f"RunningMoments(columns={self.columns})"
+
+
+__all__ = ["RunningMoments"]
@@ -1,4 +1,6 @@
+from .fingerprint import *
 from .general import *
 from .io import *
 from .logging import *
+from .sampling import *
 from .yaml import *
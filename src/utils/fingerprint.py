@@ -0,0 +1,148 @@
+import hashlib
+import types
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# bytes hashed at each end of a file, on top of its size and mtime
+FILE_SAMPLE_BYTES = 1 << 20
+
+
+def hash_parts(*parts: Any) -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = str(part).encode()
+        hasher.update(len(part).to_bytes(8, "little"))
+        hasher.update(part)
+    return hasher.hexdigest()
+
+
+def fingerprint_file(path: str | Path) -> str:
+    """Fingerprint a file by its size, mtime and first/last bytes.
+
+    Hashing only both ends keeps this cheap for multi-GB files while still
+    catching files that are rewritten with the same size and mtime.
+    """
+    path = Path(path)
+    stat = path.stat()
+    with open(path, "rb") as f:
+        head = f.read(FILE_SAMPLE_BYTES)
+        f.seek(max(stat.st_size - FILE_SAMPLE_BYTES, 0))
+        tail = f.read(FILE_SAMPLE_BYTES)
+    return hash_parts(
+        path.resolve(), stat.st_size, stat.st_mtime_ns, head, tail
+    )
+
+
+def _fingerprint_code(code: types.CodeType) -> str:
+    consts = [
+        (
+            _fingerprint_code(const)
+            if isinstance(const, types.CodeType)
+            else repr(const)
+        )
+        for const in code.co_consts
+    ]
+    return hash_parts(code.co_code, code.co_names, code.co_varnames, *consts)
+
+
+def _fingerprint_class(cls: type) -> str:
+    parts: list[Any] = []
+    for klass in cls.__mro__:
+        if klass.__module__ in ("builtins", "abc"):
+            continue
+        parts.append(f"{klass.__module__}.{klass.__qualname__}")
+        for name, member in sorted(vars(klass).items()):
+            if isinstance(member, (staticmethod, classmethod)):
+                member = member.__func__
+            if isinstance(member, property):
+                member = member.fget
+            if isinstance(member, types.FunctionType):
+                parts.extend([name, _fingerprint_code(member.__code__)])
+    return hash_parts(*parts)
+
+
+def fingerprint(obj: Any, _seen: set[int] | None = None) -> str:
+    """Stable fingerprint of a transform, feature engineering or value.
+
+    Unlike `repr` or `id`, this is the same across processes for equal
+    inputs: functions (lambdas included) are hashed by their bytecode,
+    constants and closure values, not by where they are defined, and
+    objects by their class code and attributes. Referenced globals are
+    only hashed by name. Objects can
+    narrow what identifies them by defining `__fingerprint__`, returning
+    the value to fingerprint instead of their attributes.
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return hash_parts("<cycle>")
+
+    if obj is None or isinstance(obj, (bool, int, float, str, bytes, Enum)):
+        return hash_parts(type(obj).__name__, repr(obj))
+    if isinstance(obj, Path):
+        return hash_parts("path", obj)
+    if isinstance(obj, np.ndarray):
+        return hash_parts("ndarray", obj.dtype, obj.shape, obj.tobytes())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return hash_parts(
+            type(obj).__name__,
+            pd.util.hash_pandas_object(obj, index=False).values.tobytes(),
+        )
+    if isinstance(obj, type):
+        return _fingerprint_class(obj)
+
+    seen = seen | {id(obj)}
+    if hasattr(type(obj), "__fingerprint__"):
+        return hash_parts(
+            _fingerprint_class(type(obj)),
+            fingerprint(obj.__fingerprint__(), seen),
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        items = [fingerprint(item, seen) for item in obj]
+        if isinstance(obj, (set, frozenset)):
+            items.sort()
+        return hash_parts(type(obj).__name__, *items)
+    if isinstance(obj, dict):
+        return hash_parts(
+            "dict",
+            *sorted(
+                hash_parts(fingerprint(key, seen), fingerprint(value, seen))
+                for key, value in obj.items()
+            ),
+        )
+    if isinstance(obj, types.MethodType):
+        return hash_parts(
+            "method",
+            fingerprint(obj.__func__, seen),
+            fingerprint(obj.__self__, seen),
+        )
+    if isinstance(obj, types.FunctionType):
+        closure = [
+            fingerprint(cell.cell_contents, seen)
+            for cell in obj.__closure__ or ()
+        ]
+        return hash_parts(
+            "function",
+            _fingerprint_code(obj.__code__),
+            fingerprint(obj.__defaults__, seen),
+            fingerprint(obj.__kwdefaults__, seen),
+            *closure,
+        )
+    if hasattr(obj, "model_dump"):
+        # pydantic models
+        return hash_parts(
+            _fingerprint_class(type(obj)),
+            fingerprint(obj.model_dump(), seen),
+        )
+    if hasattr(obj, "__dict__"):
+        return hash_parts(
+            _fingerprint_class(type(obj)), fingerprint(vars(obj), seen)
+        )
+    return hash_parts(type(obj).__qualname__, repr(obj))
+
+
+__all__ = ["fingerprint", "fingerprint_file", "hash_parts"]
@@ -1,14 +1,37 @@
 import collections.abc
 import math
-from collections.abc import Sequence
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping, Sequence
 from pathlib import Path
-from typing import SupportsFloat, Tuple, TypeAlias, TypeVar
+from typing import Any, SupportsFloat, Tuple, TypeAlias, TypeVar
 
+import numpy as np
 import numpy.typing as npt
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
+from .fingerprint import fingerprint
+from .logging import logging
+from .sampling import Sampler
+
+log = logging.getLogger(__name__)
+
 Number: TypeAlias = SupportsFloat
+# (column, op, value) with op one of "notna", "==", "!=", "<", "<=", ">",
+# ">=": a row is kept when it satisfies all predicates of a list
+Predicate: TypeAlias = Tuple[str, str, Any]
+
+_COMPARISONS = {
+    "==": "__eq__",
+    "!=": "__ne__",
+    "<": "__lt__",
+    "<=": "__le__",
+    ">": "__gt__",
+    ">=": "__ge__",
+}
+
+# bytes of frames that `read_dataframe` keeps for repeated reads
+READ_CACHE_BYTES = 1 << 30
 
 
 def set_seed(random_seed: Number) -> None:
@@ -20,6 +43,34 @@ def set_seed(random_seed: Number) -> None:
 split_dataset = train_test_split
 
 
+def split_indices(
+    n_samples: int,
+    train_ratio: float,
+    shuffle: bool = True,
+    rng: np.random.Generator | np.random.RandomState | None = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Train/test row indices, the same ones `train_test_split` selects.
+
+    Splitting positions instead of data lets callers slice any number of
+    arrays (or keep the indices as views) without copying them here.
+    """
+    n_test = math.ceil((1 - train_ratio) * n_samples)
+    n_train = n_samples - n_test
+    if n_train <= 0:
+        raise ValueError(
+            f"With n_samples={n_samples} and train_ratio={train_ratio}, "
+            "the resulting train set will be empty"
+        )
+
+    if not shuffle:
+        return np.arange(n_train), np.arange(n_train, n_samples)
+
+    if rng is None:
+        rng = np.random.mtrand._rand
+    permutation = rng.permutation(n_samples)
+    return permutation[n_test:], permutation[:n_test]
+
+
 def split_evenly_by_classes(
     X: Sequence[Tuple[npt.ArrayLike, Number, Number]],
     y: Sequence[Number],
@@ -71,25 +122,456 @@ def head(data: T_co | Sequence[T_co]) -> T_co:
     return data
 
 
-def discretize_column(series: pd.Series, n_bins: int = 4) -> pd.Series:
-    # return pd.cut(series, bins=n_bins, labels=list(range(n_bins)))
-    return pd.cut(series, bins=n_bins, labels=False)
-
-
 def append_prev_feature(df: pd.DataFrame, num: int, colname: str) -> None:
     for i in range(1, num + 1):
         df["prev_" + colname + "_" + str(i)] = df[colname].shift(i).values
 
 
-def read_dataframe(file: str | Path | pd.DataFrame) -> pd.DataFrame:
+def group_history_ratios(
+    groups: pd.Series | npt.ArrayLike,
+    events: Sequence[npt.ArrayLike],
+    counts: pd.DataFrame | None = None,
+) -> Tuple[list[Tuple[np.ndarray, np.ndarray]], pd.DataFrame]:
+    """Expanding per-group share of earlier rows with and without an event.
+
+    For every boolean array in `events`, returns for each row the number of
+    earlier rows of the same group in which the event did / did not occur,
+    divided by the number of earlier rows of that group (at least 1). As
+    with dict lookups, `None` is a group of its own, while NaN never equals
+    anything, so rows with a NaN group have no history and both ratios 0.
+
+    `counts` holds, indexed by group, the number of rows ("seen") and of
+    events (one column per event) of batches that came before `groups`.
+    The counts including this batch are returned alongside the ratios, so
+    a stream of batches gives the same ratios as one concatenated batch.
+    """
+    values = np.asarray(groups)
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    missing = pd.isna(values)
+    if values.dtype == object:
+        missing &= values != None  # noqa: E711
+    codes[missing] = -1
+    present = codes[~missing]
+
+    occurred = [
+        np.asarray(event, dtype=bool).astype(np.int64) for event in events
+    ]
+    seen = pd.Series(codes).groupby(codes, sort=False).cumcount().to_numpy()
+    before = [
+        pd.Series(o).groupby(codes, sort=False).cumsum().to_numpy() - o
+        for o in occurred
+    ]
+    batch_counts = pd.DataFrame(
+        np.column_stack(
+            [np.bincount(present, minlength=len(uniques))]
+            + [
+                np.bincount(present, o[~missing], len(uniques)).astype(np.int64)
+                for o in occurred
+            ]
+        ),
+        index=pd.Index(uniques),
+        columns=["seen"] + list(range(len(occurred))),
+    )
+
+    if counts is not None and len(counts) > 0:
+        position = counts.index.get_indexer(uniques)
+        prior = np.where(
+            position[:, None] >= 0,
+            counts.to_numpy(dtype=np.int64)[position],
+            0,
+        )[codes]
+        seen = seen + prior[:, 0]
+        before = [b + prior[:, i + 1] for i, b in enumerate(before)]
+        batch_counts = batch_counts.add(counts, fill_value=0).astype(np.int64)
+
+    total = np.maximum(seen, 1)
+    ratios = []
+    for b in before:
+        positive = b / total
+        negative = (seen - b) / total
+        positive[missing] = 0.0
+        negative[missing] = 0.0
+        ratios.append((positive, negative))
+    return ratios, batch_counts
+
+
+def filter_mask(
+    data: pd.DataFrame, predicates: Sequence[Predicate]
+) -> np.ndarray:
+    """Boolean mask of the rows of `data` that satisfy all `predicates`."""
+    mask = np.ones(len(data), dtype=bool)
+    for column, op, value in predicates:
+        if op == "notna":
+            mask &= data[column].notna().to_numpy()
+        else:
+            compare = getattr(data[column], _COMPARISONS[op])
+            mask &= compare(value).fillna(False).to_numpy(dtype=bool)
+    return mask
+
+
+def filter_expression(predicates: Sequence[Predicate], schema: Any) -> Any:
+    """The pyarrow dataset expression of `predicates` over `schema`.
+
+    Like pandas, "notna" also rejects floating point NaN, and comparisons
+    with a missing value are false.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    expression = None
+    for column, op, value in predicates:
+        field = ds.field(column)
+        if op == "notna":
+            condition = field.is_valid()
+            if pa.types.is_floating(schema.field(column).type):
+                condition &= ~field.is_nan()
+        else:
+            condition = getattr(field, _COMPARISONS[op])(value)
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def parquet_dataset(
+    file: str | Path, dtypes: Mapping[str, str] | None = None
+) -> Any:
+    """A pyarrow dataset of a parquet file.
+
+    String columns that `dtypes` maps to "category" are decoded straight
+    into dictionary arrays, which become pandas categoricals.
+    """
+    import pyarrow.dataset as ds
+
+    categories = [
+        column
+        for column, dtype in (dtypes or {}).items()
+        if dtype == "category"
+    ]
+    return ds.dataset(
+        file,
+        format=ds.ParquetFileFormat(
+            read_options=ds.ParquetReadOptions(dictionary_columns=categories)
+        ),
+    )
+
+
+def cast_table(table: Any, dtypes: Mapping[str, str] | None) -> Any:
+    """Cast the columns of `table` to their numeric type in `dtypes`."""
+    import pyarrow as pa
+
+    for column, dtype in (dtypes or {}).items():
+        if dtype == "category" or column not in table.column_names:
+            continue
+        index = table.column_names.index(column)
+        target = pa.from_numpy_dtype(np.dtype(dtype))
+        if table.schema.field(index).type != target:
+            table = table.set_column(
+                index, column, table.column(index).cast(target)
+            )
+    return table
+
+
+def categorize(
+    data: pd.DataFrame, dtypes: Mapping[str, str] | None
+) -> pd.DataFrame:
+    """Make the "category" columns of `dtypes` categoricals of the sorted
+    values present, so that they behave like the strings they replace,
+    e.g. in the column order of `pd.get_dummies`."""
+    for column, dtype in (dtypes or {}).items():
+        if dtype != "category" or column not in data.columns:
+            continue
+        values = data[column]
+        if not isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype("category")
+        categories = values.cat.categories
+        codes = values.cat.codes.to_numpy()
+        used = np.bincount(codes[codes >= 0], minlength=len(categories)) > 0
+        if used.all() and categories.is_monotonic_increasing:
+            data[column] = values
+            continue
+        present = categories[used]
+        ordered = present.sort_values()
+        # the last entry maps missing values (code -1) to themselves
+        recode = np.full(len(categories) + 1, -1, dtype=codes.dtype)
+        recode[:-1][used] = ordered.get_indexer(present)
+        data[column] = pd.Categorical.from_codes(recode[codes], ordered)
+    return data
+
+
+def to_frame(table: Any, dtypes: Mapping[str, str] | None) -> pd.DataFrame:
+    """Convert a pyarrow table, consuming it, to a frame of `dtypes`."""
+    data = table.to_pandas(split_blocks=True, self_destruct=True)
+    return categorize(data, dtypes)
+
+
+def sample_parquet(
+    file: str | Path,
+    sampler: Sampler,
+    columns: list[str] | None = None,
+    filters: Sequence[Predicate] | None = None,
+    dtypes: Mapping[str, str] | None = None,
+) -> pd.DataFrame:
+    """Sample the rows of a parquet file that satisfy all `filters`.
+
+    The file is scanned one row group at a time, skipping those that
+    `sampler.skip` rules out by their statistics, so that only the sampled
+    rows and one row group are in memory at once.
+    """
+    import pyarrow as pa
+
+    dataset = parquet_dataset(file, dtypes)
+    expression = filter_expression(filters, dataset.schema) if filters else None
+    read = None
+    if columns is not None:
+        read = columns + [c for c in sampler.columns if c not in columns]
+
+    sampler.reset()
+    kept = None
+    skipped = 0
+    for fragment in dataset.get_fragments():
+        for group in fragment.split_by_row_group():
+            if sampler.skip(group.row_groups[0].statistics):
+                skipped += 1
+                continue
+            table = cast_table(
+                group.to_table(columns=read, filter=expression), dtypes
+            )
+            keep = sampler.offer(table.select(sampler.columns).to_pandas())
+            if kept is not None:
+                table = pa.concat_tables([kept, table])
+            kept = table.take(keep)
+    if kept is None:
+        kept = cast_table(dataset.schema.empty_table(), dtypes)
+        if read is not None:
+            kept = kept.select(read)
+    log.info("Sampled %d rows, skipping %d row groups", len(kept), skipped)
+    kept = kept.take(sampler.order())
+    if columns is not None:
+        kept = kept.select(columns)
+    return to_frame(kept, dtypes)
+
+
+def readonly_frame(data: pd.DataFrame) -> pd.DataFrame:
+    """A frame sharing the values of `data` that rejects in-place writes.
+
+    Writing into its values (`loc`, `iloc`, `inplace=True`) raises, while
+    replacing or adding whole columns still works. `data` itself stays
+    writable, so it should not be used afterwards.
+    """
+    columns = {}
+    for i, column in enumerate(data.columns):
+        values = data.iloc[:, i]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            codes.flags.writeable = False
+            columns[i] = pd.Categorical.from_codes(codes, dtype=values.dtype)
+        elif isinstance(values.dtype, np.dtype):
+            array = values.to_numpy()
+            array.flags.writeable = False
+            columns[i] = array
+        else:
+            columns[i] = values.array
+    frozen = pd.DataFrame(columns, index=data.index, copy=False)
+    frozen.columns = data.columns
+    return frozen
+
+
+class FrameCache:
+    """The most recently used frames, taking up at most `max_bytes`.
+
+    Frames are stored read-only (see `readonly_frame`) under a key that
+    starts with the path of the file they were read from and its mtime
+    and size, so a file that changes on disk is read again.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._frames: OrderedDict[tuple, tuple[pd.DataFrame, int]] = (
+            OrderedDict()
+        )
+        self.nbytes = 0
+
+    @staticmethod
+    def key(file: Path, *options: Any) -> tuple:
+        stat = file.stat()
+        return (
+            str(file.resolve()),
+            stat.st_mtime_ns,
+            stat.st_size,
+            fingerprint(list(options)),
+        )
+
+    def get(self, key: tuple) -> pd.DataFrame | None:
+        if key not in self._frames:
+            return None
+        self._frames.move_to_end(key)
+        return self._frames[key][0]
+
+    def put(self, key: tuple, data: pd.DataFrame) -> pd.DataFrame | None:
+        """Store `data`, returning its read-only copy, or None when it
+        does not fit."""
+        for stale in [k for k in self._frames if k[0] == key[0]]:
+            if stale[1:3] != key[1:3]:
+                self._drop(stale)
+        nbytes = int(data.memory_usage(index=True, deep=True).sum())
+        if nbytes > self.max_bytes:
+            return None
+        if key in self._frames:
+            self._drop(key)
+        while self._frames and self.nbytes + nbytes > self.max_bytes:
+            self._drop(next(iter(self._frames)))
+        frozen = readonly_frame(data)
+        self._frames[key] = (frozen, nbytes)
+        self.nbytes += nbytes
+        return frozen
+
+    def _drop(self, key: tuple) -> None:
+        self.nbytes -= self._frames.pop(key)[1]
+
+    def clear(self) -> None:
+        self._frames.clear()
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+
+read_cache = FrameCache(READ_CACHE_BYTES)
+
+
+def read_dataframe(
+    file: str | Path | pd.DataFrame,
+    columns: list[str] | None = None,
+    filters: Sequence[Predicate] | None = None,
+    sampler: Sampler | None = None,
+    dtypes: Mapping[str, str] | None = None,
+    cache: bool = False,
+    readonly: bool = False,
+) -> pd.DataFrame:
+    """Read a parquet or csv file, only `columns` of it if given.
+
+    Parquet files are decoded by pyarrow, row groups in parallel. Only
+    rows satisfying all `filters` are returned: pyarrow skips row groups
+    whose statistics rule them out and drops the remaining mismatches
+    while decoding, so filtered rows never become pandas objects. With a
+    `sampler`, only the rows it samples out of those are returned, see
+    `sample_parquet`. Columns in `dtypes` are read as that numpy dtype or
+    as "category", see `categorize`. Frames are returned as they are.
+
+    With `cache`, for callers reading the same file repeatedly, frames
+    read from files are kept in `read_cache` for the life of the process,
+    and reading the same file the same way again returns a copy of the
+    kept frame. With `readonly`, that is a frame sharing the kept values
+    instead, see `readonly_frame`, which callers that modify it in place
+    must copy first, so only callers that do pay for a copy.
+    """
     if isinstance(file, pd.DataFrame):
+        if filters:
+            file = file[filter_mask(file, filters)]
+        if sampler is not None:
+            file = sampler.sample(file)
         return file
 
+    file = Path(file)
+    if not cache:
+        return _read_file(file, columns, filters, sampler, dtypes)
+    key = read_cache.key(file, columns, filters, sampler, dtypes)
+    data = read_cache.get(key)
+    if data is not None:
+        log.debug("Read %s from the cache", file)
+    else:
+        data = _read_file(file, columns, filters, sampler, dtypes)
+        frozen = read_cache.put(key, data)
+        if frozen is None:
+            return data
+        data = frozen
+    return data.copy(deep=not readonly)
+
+
+def _read_file(
+    file: Path,
+    columns: list[str] | None,
+    filters: Sequence[Predicate] | None,
+    sampler: Sampler | None,
+    dtypes: Mapping[str, str] | None,
+) -> pd.DataFrame:
+    if file.suffix == ".parquet":
+        if sampler is not None:
+            return sample_parquet(file, sampler, columns, filters, dtypes)
+        dataset = parquet_dataset(file, dtypes)
+        table = dataset.to_table(
+            columns=columns,
+            filter=(
+                filter_expression(filters, dataset.schema) if filters else None
+            ),
+            use_threads=True,
+        )
+        return to_frame(cast_table(table, dtypes), dtypes)
+    elif file.suffix == ".csv":
+        data = pd.read_csv(file, usecols=columns)
+        if dtypes:
+            data = data.astype(
+                {c: t for c, t in dtypes.items() if c in data.columns}
+            )
+        if filters:
+            data = data[filter_mask(data, filters)].reset_index(drop=True)
+        if sampler is not None:
+            data = sampler.sample(data)
+        return categorize(data, dtypes)
+    else:
+        raise ValueError("File must be either a parquet or a csv file")
+
+
+def dataframe_columns(file: str | Path) -> list[str]:
+    """Columns of a parquet or csv file, read from its schema/header."""
+    file = Path(file)
+    if file.suffix == ".parquet":
+        # the schema of the engine that reads the data, see `read_dataframe`
+        import pyarrow.parquet as pq
+
+        schema = pq.read_schema(file)
+        # as read back by pandas, without a stored index
+        index = (schema.pandas_metadata or {}).get("index_columns", [])
+        return [name for name in schema.names if name not in index]
+    elif file.suffix == ".csv":
+        return list(pd.read_csv(file, nrows=0).columns)
+    else:
+        raise ValueError("File must be either a parquet or a csv file")
+
+
+def iter_dataframe_batches(
+    file: str | Path,
+    batch_rows: int = 1 << 16,
+    columns: list[str] | None = None,
+    filters: Sequence[Predicate] | None = None,
+    dtypes: Mapping[str, str] | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Read a parquet or csv file as frames of at most `batch_rows` rows.
+
+    `columns`, `filters` and `dtypes` are applied as by `read_dataframe`,
+    but each batch of categoricals has the categories present in it.
+    """
     file = Path(file)
     if file.suffix == ".parquet":
-        return pd.read_parquet(file, engine="fastparquet")
+        import pyarrow as pa
+
+        dataset = parquet_dataset(file, dtypes)
+        expression = (
+            filter_expression(filters, dataset.schema) if filters else None
+        )
+        for batch in dataset.to_batches(
+            columns=columns, filter=expression, batch_size=batch_rows
+        ):
+            table = cast_table(pa.Table.from_batches([batch]), dtypes)
+            yield to_frame(table, dtypes)
     elif file.suffix == ".csv":
-        return pd.read_csv(file)
+        for data in pd.read_csv(file, usecols=columns, chunksize=batch_rows):
+            if dtypes:
+                data = data.astype(
+                    {c: t for c, t in dtypes.items() if c in data.columns}
+                )
+            if filters:
+                data = data[filter_mask(data, filters)]
+            yield categorize(data.reset_index(drop=True), dtypes)
     else:
         raise ValueError("File must be either a parquet or a csv file")
 
@@ -97,13 +579,28 @@ def read_dataframe(file: str | Path | pd.DataFrame) -> pd.DataFrame:
 __all__ = [
     "set_seed",
     "split_dataset",
+    "split_indices",
     "split_evenly_by_classes",
     "label_transform",
     "custom_round",
     "ceil_up",
     "head",
-    "discretize_column",
     "append_prev_feature",
+    "group_history_ratios",
+    "Predicate",
+    "filter_mask",
+    "filter_expression",
+    "parquet_dataset",
+    "cast_table",
+    "categorize",
+    "to_frame",
+    "sample_parquet",
+    "READ_CACHE_BYTES",
+    "readonly_frame",
+    "FrameCache",
+    "read_cache",
     "read_dataframe",
+    "dataframe_columns",
+    "iter_dataframe_batches",
     # "add_src_to_path",
 ]
@@ -1,6 +1,10 @@
+import os
 import sys
+import tempfile
 from pathlib import Path
-from typing import TextIO
+from typing import Any, TextIO
+
+import pandas as pd
 
 
 class Transcriber:
@@ -64,4 +68,77 @@ class Transcriber:
         return repr(self)
 
 
-__all__ = ["Transcriber"]
+def write_feather(path: str | Path, data: pd.DataFrame) -> Path:
+    """Write `data` as uncompressed feather, atomically.
+
+    The file is written next to `path` and renamed, so concurrent readers
+    never see a partially written file. Uncompressed files can be
+    memory-mapped by `read_feather`.
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        feather.write_feather(
+            pa.Table.from_pandas(data), tmp, compression="uncompressed"
+        )
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+def write_text(path: str | Path, text: str) -> Path:
+    """Write `text` to `path`, atomically like `write_feather`."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as file:
+            file.write(text)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+def write_parquet(path: str | Path, table: Any, **options: Any) -> Path:
+    """Write a pyarrow table as parquet, atomically like `write_feather`.
+
+    `options` are passed on to `pyarrow.parquet.write_table`.
+    """
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp, **options)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+def read_feather(path: str | Path) -> pd.DataFrame:
+    """Read a feather file written by `write_feather`, memory-mapped."""
+    import pyarrow.feather as feather
+
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+
+__all__ = [
+    "Transcriber",
+    "write_feather",
+    "write_text",
+    "write_parquet",
+    "read_feather",
+]
@@ -0,0 +1,248 @@
+import zlib
+from abc import ABCMeta, abstractmethod
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+class Sampler(metaclass=ABCMeta):
+    """Selects rows from a stream of row batches, keeping few candidates.
+
+    Rows are offered batch by batch with `offer`. The sampler keeps a
+    bounded set of candidate rows, always in the order they were offered,
+    and tells the caller which of them to keep so that the caller can hold
+    the candidate rows themselves (as a frame or an Arrow table). `order`
+    finally arranges the candidates into the sample. Selecting only reads
+    `columns`, and `skip` lets a reader pass over a whole row group from
+    its min/max statistics.
+    """
+
+    columns: list[str] = []
+
+    def reset(self) -> None:
+        """Forget all rows offered so far."""
+
+    def skip(self, statistics: Mapping[str, Mapping[str, Any]]) -> bool:
+        """Whether none of the rows with these column statistics (a dict
+        of "min" and "max" per column) can be selected."""
+        return False
+
+    @abstractmethod
+    def offer(self, keys: pd.DataFrame) -> np.ndarray:
+        """Offer the next rows, given by their `columns`.
+
+        Returns the positions, within the current candidates followed by
+        these rows, of the rows that remain candidates.
+        """
+
+    def order(self) -> np.ndarray:
+        """Positions that arrange the candidates into the sample."""
+        return np.arange(self.num_candidates)
+
+    @property
+    @abstractmethod
+    def num_candidates(self) -> int:
+        pass
+
+    def sample(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Sample the rows of a single frame."""
+        self.reset()
+        keep = self.offer(data[self.columns])
+        return data.iloc[keep[self.order()]].reset_index(drop=True)
+
+    def __fingerprint__(self) -> dict[str, Any]:
+        # the parameters, not the state of the current scan
+        return {
+            name: value
+            for name, value in vars(self).items()
+            if not name.startswith("_")
+        }
+
+
+def smallest(values: np.ndarray, k: int) -> np.ndarray:
+    """Mask of the `k` smallest `values`, ties going to earlier positions.
+
+    NaN is larger than any number, as in a sort. This selects the same
+    rows as a stable sort followed by `head(k)`, but in linear time.
+    """
+    if len(values) <= k:
+        return np.ones(len(values), dtype=bool)
+    if k <= 0:
+        return np.zeros(len(values), dtype=bool)
+    threshold = values[np.argpartition(values, k - 1)[k - 1]]
+    if isinstance(threshold, float) and np.isnan(threshold):
+        below = ~np.isnan(values)
+        tied = ~below
+    else:
+        below = values < threshold
+        tied = values == threshold
+    tied_positions = np.flatnonzero(tied)[: k - below.sum()]
+    below[tied_positions] = True
+    return below
+
+
+class SmallestSampler(Sampler):
+    """The `n` rows with the smallest key, ties going to earlier rows."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.reset()
+
+    def reset(self) -> None:
+        self._keys = np.empty(0)
+
+    @abstractmethod
+    def keys(self, rows: pd.DataFrame) -> np.ndarray:
+        """Keys of the offered rows."""
+
+    def offer(self, keys: pd.DataFrame) -> np.ndarray:
+        values = self.keys(keys)
+        if len(self._keys) > 0:
+            values = np.concatenate([self._keys, values])
+        keep = smallest(values, self.n)
+        self._keys = values[keep]
+        return np.flatnonzero(keep)
+
+    @property
+    def threshold(self) -> Any:
+        """Key a row must stay below to become a candidate, if known."""
+        full = 0 < len(self._keys) == self.n
+        if not full or pd.isna(self._keys).any():
+            return None
+        return self._keys.max()
+
+    @property
+    def num_candidates(self) -> int:
+        return len(self._keys)
+
+
+class FirstSampler(SmallestSampler):
+    """The first `n` rows by `column`, like a stable sort and `head(n)`.
+
+    Row groups whose minimum is not below the current `n`-th smallest
+    value are skipped, so on data sorted by `column` a reader stops
+    decoding once it has the first `n` rows.
+    """
+
+    def __init__(self, column: str, n: int):
+        self.columns = [column]
+        super().__init__(n)
+
+    def keys(self, rows: pd.DataFrame) -> np.ndarray:
+        return rows[self.columns[0]].to_numpy()
+
+    def skip(self, statistics: Mapping[str, Mapping[str, Any]]) -> bool:
+        threshold = self.threshold
+        column = statistics.get(self.columns[0])
+        if threshold is None or column is None or "min" not in column:
+            return False
+        return not column["min"] < threshold
+
+    def order(self) -> np.ndarray:
+        return np.argsort(self._keys, kind="stable")
+
+    def __repr__(self) -> str:
+        return f"FirstSampler(column={self.columns[0]}, n={self.n})"
+
+
+class UniformSampler(SmallestSampler):
+    """`n` rows drawn uniformly without replacement, in their order.
+
+    A bottom-k reservoir: every row gets a random key and the `n` rows
+    with the smallest keys are kept. The keys depend only on `seed` and
+    the row position, so the sample does not depend on how rows are
+    batched.
+    """
+
+    def __init__(self, n: int, seed: int = 0):
+        self.seed = seed
+        super().__init__(n)
+
+    def reset(self) -> None:
+        super().reset()
+        self._rng = np.random.default_rng(self.seed)
+
+    def keys(self, rows: pd.DataFrame) -> np.ndarray:
+        return self._rng.random(len(rows))
+
+    def __repr__(self) -> str:
+        return f"UniformSampler(n={self.n}, seed={self.seed})"
+
+
+class StratifiedSampler(Sampler):
+    """Up to `n` uniformly drawn rows per stratum, in their order.
+
+    Strata are the bins of `column` between consecutive `edges` (with
+    `np.digitize` semantics), or its distinct values without `edges`.
+    Each stratum is sampled by its own `UniformSampler` seeded from
+    `seed` and the stratum.
+    """
+
+    def __init__(
+        self,
+        column: str,
+        n: int,
+        edges: Sequence[float] | None = None,
+        seed: int = 0,
+    ):
+        self.columns = [column]
+        self.n = n
+        self.edges = None if edges is None else list(edges)
+        self.seed = seed
+        self.reset()
+
+    def reset(self) -> None:
+        self._samplers: dict[Any, UniformSampler] = {}
+        self._strata = np.empty(0, dtype=object)
+
+    def strata(self, rows: pd.DataFrame) -> np.ndarray:
+        values = rows[self.columns[0]]
+        if self.edges is None:
+            return values.to_numpy(dtype=object)
+        return np.digitize(values.to_numpy(dtype=float), self.edges).astype(
+            object
+        )
+
+    def offer(self, keys: pd.DataFrame) -> np.ndarray:
+        strata = np.concatenate([self._strata, self.strata(keys)])
+        candidates = len(self._strata)
+        keep = np.zeros(len(strata), dtype=bool)
+        # missing values (code -1) form a stratum of their own
+        codes, uniques = pd.factorize(strata)
+        for code in np.unique(codes):
+            stratum = None if code < 0 else uniques[code]
+            positions = np.flatnonzero(codes == code)
+            if stratum not in self._samplers:
+                seed = zlib.crc32(f"{self.seed}:{stratum}".encode())
+                self._samplers[stratum] = UniformSampler(self.n, seed)
+            sampler = self._samplers[stratum]
+            before = positions[positions < candidates]
+            offered = positions[positions >= candidates]
+            # candidates of the stratum stay in order, so `before` lines
+            # up with the sampler's own candidates
+            kept = sampler.offer(keys.iloc[offered - candidates])
+            keep[np.concatenate([before, offered])[kept]] = True
+        self._strata = strata[keep]
+        return np.flatnonzero(keep)
+
+    @property
+    def num_candidates(self) -> int:
+        return len(self._strata)
+
+    def __repr__(self) -> str:
+        return (
+            f"StratifiedSampler(column={self.columns[0]}, n={self.n}, "
+            f"edges={self.edges}, seed={self.seed})"
+        )
+
+
+__all__ = [
+    "Sampler",
+    "smallest",
+    "SmallestSampler",
+    "FirstSampler",
+    "UniformSampler",
+    "StratifiedSampler",
+]
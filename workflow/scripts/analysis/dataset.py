@@ -14,6 +14,7 @@ import src.transforms.alibaba_eighteen as transforms
 #     AlibabaSchedulerDatasetGenerator,
 # )
 from src.helpers.definitions import Snakemake
+from src.utils.general import read_dataframe
 from src.utils.logging import logging, setup_logging
 
 if TYPE_CHECKING:
@@ -33,7 +34,7 @@ def cpu_util_percent(target: str):
 
 
 def get_dataset(input_path: Path, n_labels: int, targets: list[str]):
-    data = pd.read_parquet(input_path)
+    data = read_dataframe(input_path)
 
     _transforms = [
         transforms.CleanDataTransform(exclude=targets),
@@ -2,7 +2,7 @@ from collections.abc import Sequence
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
-from src.utils.general import head, set_seed
+from src.utils.general import head, read_dataframe, set_seed
 
 if TYPE_CHECKING:
     snakemake: Any = None
@@ -71,7 +71,7 @@ def get_specialized_dd_config(cfg: dict, method: str):
 def main():
     set_seed(snakemake.config.get("seed", 0))
     input_path = Path(str(snakemake.input))
-    orig_data = pd.read_csv(input_path)
+    orig_data = read_dataframe(input_path, readonly=True)
     dataset_config = snakemake.params.dataset_config
     dd_config = get_specialized_dd_config(dataset_config, snakemake.params.method)
 
@@ -8,7 +8,11 @@ import pandas as pd
 from src.dataset.generator import DistributionColumnBasedGenerator
 from src.drift_detection.voting import get_offline_voting_drift_detector
 from src.helpers.config import Config, assert_config_params
-from src.helpers.dataset import create_avalanche_classification_datasets
+from src.helpers.dataset import (
+    create_classification_benchmark,
+    generate_classification_datasets,
+    get_generator_kwargs,
+)
 from src.helpers.definitions import DD_DIST_COLUMN, DD_ID, Dataset, Snakemake
 from src.helpers.features import get_features
 from src.helpers.scenario import train_classification_scenario
@@ -70,6 +74,7 @@ def get_dataset(config: Config, input_path: Path):
         dd_transformer,
         pos=DD_ID,
         sections=["preprocess"],
+        reads=[config.dataset.target],
     )
 
     match config.dataset.name:
@@ -89,6 +94,7 @@ def get_dataset(config: Config, input_path: Path):
                 dist_col=DD_DIST_COLUMN,
                 feature_engineering=feature_engineering,
                 train_ratio=config.train_ratio,
+                **get_generator_kwargs(config),
             )
         case Dataset.AZURE:
             from src.dataset.azure.vmcpu import (
@@ -106,6 +112,7 @@ def get_dataset(config: Config, input_path: Path):
                 dist_col=DD_DIST_COLUMN,
                 feature_engineering=feature_engineering,
                 train_ratio=config.train_ratio,
+                **get_generator_kwargs(config),
             )
         case Dataset.GOOGLE:
             from src.dataset.google.scheduler2 import (
@@ -123,19 +130,14 @@ def get_dataset(config: Config, input_path: Path):
                 dist_col=DD_DIST_COLUMN,
                 feature_engineering=feature_engineering,
                 train_ratio=config.train_ratio,
+                **get_generator_kwargs(config),
             )
         case _:
             raise ValueError(f"Unknown dataset: {config.dataset.name}")
 
     log.info("%s", feature_engineering)
 
-    dataset = generator()
-    if len(dataset) == 0:
-        raise ValueError("Dataset is empty")
-    return (
-        create_avalanche_classification_datasets(dataset),
-        dataset[0].train.input_size,
-    )
+    return generate_classification_datasets(generator, config)
 
 
 def assert_training(config: Config):
@@ -144,13 +146,8 @@ def assert_training(config: Config):
     ), "Drift detection must be specified in config"
 
 
-def get_benchmark(dataset: Sequence[Any]):
-    from avalanche.benchmarks.generators import dataset_benchmark
-
-    train_subsets = [subset.train for subset in dataset]
-    test_subsets = [subset.test for subset in dataset]
-    benchmark = dataset_benchmark(train_subsets, test_subsets)
-    return benchmark
+def get_benchmark(dataset: Any):
+    return create_classification_benchmark(dataset)
 
 
 def main():
@@ -7,8 +7,9 @@ from typing import TYPE_CHECKING, Any
 from src.dataset.generator import SplitChunkGenerator
 from src.helpers.config import Config, assert_config_params
 from src.helpers.dataset import (
-    AvalancheClassificationDatasetAccessor,
-    create_avalanche_classification_datasets,
+    create_classification_benchmark,
+    generate_classification_datasets,
+    get_generator_kwargs,
 )
 from src.helpers.definitions import Dataset, Snakemake
 from src.helpers.features import get_features
@@ -41,6 +42,7 @@ def get_dataset(config: Config, input_path: Path):
                 n_split=config.scenario.num_split,  # type: ignore
                 feature_engineering=feature_engineering,
                 train_ratio=config.train_ratio,
+                **get_generator_kwargs(config),
             )
         case Dataset.AZURE:
             from src.dataset.azure.vmcpu import (
@@ -58,6 +60,7 @@ def get_dataset(config: Config, input_path: Path):
                 n_split=config.scenario.num_split,  # type: ignore
                 feature_engineering=feature_engineering,
                 train_ratio=config.train_ratio,
+                **get_generator_kwargs(config),
             )
         case "google":
             from src.dataset.google.scheduler2 import (
@@ -75,29 +78,17 @@ def get_dataset(config: Config, input_path: Path):
                 n_split=config.scenario.num_split,  # type: ignore
                 feature_engineering=feature_engineering,
                 train_ratio=config.train_ratio,
+                **get_generator_kwargs(config),
             )
         case _:
             raise ValueError(f"Unknown dataset: {config.dataset.name}")
 
     log.info("%s", feature_engineering)
-    dataset = generator()
-    if len(dataset) == 0:
-        raise ValueError("Dataset is empty")
-    return (
-        create_avalanche_classification_datasets(dataset),
-        dataset[0].train.input_size,
-    )
-
+    return generate_classification_datasets(generator, config)
 
-def get_benchmark(
-    dataset: list[AvalancheClassificationDatasetAccessor],
-):
-    from avalanche.benchmarks.generators import dataset_benchmark
 
-    train_subsets: list[Any] = [subset.train for subset in dataset]
-    test_subsets: list[Any] = [subset.test for subset in dataset]
-    benchmark = dataset_benchmark(train_subsets, test_subsets)
-    return benchmark
+def get_benchmark(dataset: Any):
+    return create_classification_benchmark(dataset)
 
 
 def main():
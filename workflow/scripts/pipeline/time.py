@@ -1,4 +1,3 @@
-from collections.abc import Sequence
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
@@ -7,11 +6,19 @@ import pandas as pd
 
 from src.dataset.generator import DistributionColumnBasedGenerator
 from src.helpers.config import Config, assert_config_params
-from src.helpers.dataset import create_avalanche_classification_datasets
+from src.helpers.dataset import (
+    create_classification_benchmark,
+    generate_classification_datasets,
+    get_generator_kwargs,
+)
 from src.helpers.definitions import DD_DIST_COLUMN, DD_ID, Dataset, Snakemake
 from src.helpers.features import get_features
 from src.helpers.scenario import train_classification_scenario
-from src.transforms.general import add_transform_to_feature_engineering
+from src.transforms.general import (
+    RowFilterTransform,
+    add_transform_to_feature_engineering,
+)
+from src.utils.general import Predicate
 from src.utils.logging import logging, setup_logging
 
 if TYPE_CHECKING:
@@ -22,9 +29,8 @@ setup_logging(snakemake.log[0])
 log = logging.getLogger(__name__)
 
 
-def add_dist_label_time(data: pd.DataFrame, config: Config):
+def bucket_width(config: Config) -> int:
     repeat_every = config.scenario.repeat_every
-    time_col = config.dataset.time_column
     # TODO: Convert repeat_every (second) to the correct unit in each dataset
     match config.dataset.name:
         case Dataset.ALIBABA:
@@ -36,12 +42,35 @@ def add_dist_label_time(data: pd.DataFrame, config: Config):
             repeat_every *= 1000000
         case _:
             raise NotImplementedError("Implement time conversion")
-    data[DD_DIST_COLUMN] = data[time_col] // repeat_every   
+    return repeat_every
+
+
+def add_dist_label_time(data: pd.DataFrame, config: Config):
+    time_col = config.dataset.time_column
+    data[DD_DIST_COLUMN] = data[time_col] // bucket_width(config)
     distribution_counts = data.groupby(DD_DIST_COLUMN).size()
     print(distribution_counts)
     return data
 
 
+def time_range_filter(config: Config) -> list[Predicate]:
+    """Rows of the buckets `first_bucket` to `last_bucket` (inclusive).
+
+    Both are optional scenario options. On data ingested sorted by time,
+    only the row groups overlapping these buckets are read.
+    """
+    time_col = config.dataset.time_column
+    width = bucket_width(config)
+    first_bucket = getattr(config.scenario, "first_bucket", None)
+    last_bucket = getattr(config.scenario, "last_bucket", None)
+    predicates: list[Predicate] = []
+    if first_bucket is not None:
+        predicates.append((time_col, ">=", first_bucket * width))
+    if last_bucket is not None:
+        predicates.append((time_col, "<", (last_bucket + 1) * width))
+    return predicates
+
+
 def dist_time_transform(config: Config):
     def transform(data: pd.DataFrame) -> pd.DataFrame:
         data = add_dist_label_time(data, config)  # type: ignore
@@ -58,7 +87,18 @@ def get_dataset(config: Config, input_path: Path):
         dist_time_transformer,
         pos=2,
         sections=["preprocess"],
+        reads=[config.dataset.time_column],
     )
+    time_filter = time_range_filter(config)
+    if time_filter:
+        log.info("Reading only the time buckets matching %s", time_filter)
+        feature_engineering = add_transform_to_feature_engineering(
+            feature_engineering,
+            RowFilterTransform(time_filter),
+            pos=0,
+            sections=["preprocess"],
+            reads=[config.dataset.time_column],
+        )
 
     match config.dataset.name:
         case Dataset.ALIBABA:
@@ -77,6 +117,7 @@ def get_dataset(config: Config, input_path: Path):
                 dist_col=DD_DIST_COLUMN,
                 feature_engineering=feature_engineering,
                 train_ratio=config.train_ratio,
+                **get_generator_kwargs(config),
             )
         case Dataset.AZURE:
             from src.dataset.azure.vmcpu import (
@@ -94,6 +135,7 @@ def get_dataset(config: Config, input_path: Path):
                 dist_col=DD_DIST_COLUMN,
                 feature_engineering=feature_engineering,
                 train_ratio=config.train_ratio,
+                **get_generator_kwargs(config),
             )
         case Dataset.GOOGLE:
             from src.dataset.google.scheduler2 import (
@@ -111,26 +153,16 @@ def get_dataset(config: Config, input_path: Path):
                 dist_col=DD_DIST_COLUMN,
                 feature_engineering=feature_engineering,
                 train_ratio=config.train_ratio,
+                **get_generator_kwargs(config),
             )
         case _:
             raise ValueError(f"Unknown dataset: {config.dataset.name}")
 
-    dataset = generator()
-    if len(dataset) == 0:
-        raise ValueError("Dataset is empty")
-    return (
-        create_avalanche_classification_datasets(dataset),
-        dataset[0].train.input_size,
-    )
-
+    return generate_classification_datasets(generator, config)
 
-def get_benchmark(dataset: Sequence[Any]):
-    from avalanche.benchmarks.generators import dataset_benchmark
 
-    train_subsets = [subset.train for subset in dataset]
-    test_subsets = [subset.test for subset in dataset]
-    benchmark = dataset_benchmark(train_subsets, test_subsets)
-    return benchmark
+def get_benchmark(dataset: Any):
+    return create_classification_benchmark(dataset)
 
 
 def main():